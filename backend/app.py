@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flasgger import Swagger, swag_from
 import os
@@ -9,20 +9,28 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-from ml.video_to_text.scene_detect import scene_detect
+from ml.video_to_text.scene_detect import scene_detect, scene_detect_ranges
 from metadata_db.db_search_data import select_query
+from search.ranking import rank_results, importance_weights
+from search.aggregation import aggregate_moments, aggregate_videos, GROUP_BY, GROUP_MOMENT, GROUP_VIDEO, POOLINGS
+from pipeline.fan_out import run_concurrently, submit_background, run_with_deadline
+from pipeline.engine import Pipeline, Stage
+from pipeline.stage_cache import StageCache
+from ingest.video_ingest import spool_upload
+from clients.service_client import ServiceClient, create_service_clients
+from translation.translator import create_translator
+from jobs.job_manager import JobManager, JobStore, JobQueueFull, STATUS_QUEUED, STATUS_DONE, STATUS_FAILED
 
-import requests
 import json
 import logging
-import hashlib
+import time
 
 # Flask 앱 설정
 app = Flask(__name__)
 CORS(app, resources={
     r"/*": {
         "origins": "*",
-        "methods": ["POST", "OPTIONS"],
+        "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type", "Authorization"]
     }
 })
@@ -153,6 +161,49 @@ API_ENDPOINTS = {
     'llm': "http://10.28.224.27:30896"
 }
 
+# 서비스별 (연결, 읽기) 타임아웃 (초). 캡션/STT는 영상 길이에 비례해 오래 걸림
+SERVICE_TIMEOUTS = {
+    'video': (5, float(os.environ.get("VIDEO_READ_TIMEOUT", 1800))),
+    'stt': (5, float(os.environ.get("STT_READ_TIMEOUT", 1800))),
+    'vectordb': (5, float(os.environ.get("VECTORDB_READ_TIMEOUT", 300))),
+    'llm': (5, float(os.environ.get("LLM_READ_TIMEOUT", 300)))
+}
+
+# 업로드된 비디오 저장 경로 (파일명은 내용의 SHA-256 해시)
+UPLOAD_DIR = '/data/ephemeral/home/new-data/'
+
+# 부분 구간 처리 시 요청 구간 앞뒤로 추가 분석할 시간 (초)
+SCENE_RANGE_MARGIN = 2.0
+STT_RANGE_MARGIN = 1.0
+
+# 검색 요청 전체 제한 시간 (초). 쿼리 분석은 검색에 쓸 시간을 MIN_RETRIEVAL_BUDGET 만큼 남기도록 제한
+SEARCH_DEADLINE = float(os.environ.get("SEARCH_DEADLINE", 10.0))
+MIN_RETRIEVAL_BUDGET = 1.0
+
+# 벡터 DB 컬렉션 이름 (비디오 캡션 / STT 캡션)
+VIDEO_COLLECTION = "movie_clips"
+AUDIO_COLLECTION = "audio_clips"
+
+# 컬렉션별 벡터 DB 검색 방식 (dense / lexical / hybrid). 대사 검색은 BM25와 결합하여 그대로 입력한 대사를 잘 찾도록 함
+SEARCH_MODES = {
+    VIDEO_COLLECTION: os.environ.get("VIDEO_SEARCH_MODE", "dense"),
+    AUDIO_COLLECTION: os.environ.get("AUDIO_SEARCH_MODE", "hybrid")
+}
+
+# 벡터 검색 결과를 벡터 DB 서버에서 cross-encoder로 재순위화할지 여부 (요청의 "rerank"로 변경 가능)
+# 제한 시간을 넘기면 벡터 DB 서버가 기존 순서를 그대로 반환
+SEARCH_RERANK = os.environ.get("SEARCH_RERANK", "false").lower() == "true"
+SEARCH_RERANK_BUDGET = float(os.environ.get("SEARCH_RERANK_BUDGET", 0.3))
+
+# 0보다 크면 벡터 DB 서버가 영상 요약 컬렉션에서 가까운 영상을 이 수만큼 먼저 고른 뒤 그 영상의 구간만 검색
+SEARCH_COARSE_VIDEOS = int(os.environ.get("SEARCH_COARSE_VIDEOS", 0))
+
+# 서비스별 HTTP 클라이언트 (커넥션 풀링 / 타임아웃 / 재시도 / 지연 시간 로깅)
+service_clients = create_service_clients(API_ENDPOINTS, SERVICE_TIMEOUTS)
+
+# 번역기 (영상 단위 배치 번역 + 번역 캐시, TRANSLATION_BACKEND 환경 변수로 백엔드 선택)
+translator = create_translator(llm_client=service_clients['llm'])
+
 # 유틸리티 함수
 def translate_text(text: str) -> str:
     """텍스트 번역 함수
@@ -163,134 +214,571 @@ def translate_text(text: str) -> str:
     Returns:
         str: 번역된 한국어 텍스트. 오류 발생시 원본 텍스트 반환
     """
-    DEEPL_API_KEY = "e002ea00-6062-41c7-8382-2e2bb6039b24:fx"  # DeepL API 키를 여기에 입력하세요
-    DEEPL_API_URL = "https://api-free.deepl.com/v2/translate"  # 무료 API의 경우. Pro 버전은 다른 URL 사용
-    
     if not text or not isinstance(text, str):
         return ""
-        
+    return translator.translate(text)
+
+def translate_segments(segments: list):
+    """세그먼트들의 caption_eng를 한 번에 배치 번역하여 caption_kor에 채움
+
+    Args:
+        segments (list): caption_eng 키를 가진 세그먼트 딕셔너리 리스트 (제자리에서 수정)
+    """
+    translations = translator.translate_many([segment["caption_eng"] for segment in segments])
+    for segment, caption_kor in zip(segments, translations):
+        segment["caption_kor"] = caption_kor
+
+def find_video_on_server(client: ServiceClient, sha256: str, file_name: str) -> str:
+    """서버에 같은 해시의 비디오가 이미 있으면 그 경로를, 없거나 확인할 수 없으면 None을 반환"""
     try:
-        response = requests.post(
-            DEEPL_API_URL,
-            headers={"Authorization": f"DeepL-Auth-Key {DEEPL_API_KEY}"},
-            data={
-                "text": text,
-                "source_lang": "EN",  # 영어에서
-                "target_lang": "KO"   # 한국어로
-            }
+        response = client.post(
+            "/has_video",
+            json={"sha256": sha256, "extension": os.path.splitext(file_name)[1]},
+            idempotent=True,
+            timeout=(5, 10)
         )
         response.raise_for_status()
-        
-        translated_text = response.json()["translations"][0]["text"]
-        return translated_text
-            
+        result = response.json()
+        return result["video_path"] if result.get("exists") else None
     except Exception as e:
-        logger.error(f"DeepL 번역 중 오류 발생: {str(e)}")
-        return text
-
-def get_file_hash(video_file):
-    """파일 내용을 SHA-256 해시로 변환"""
-    hasher = hashlib.sha256()
-    video_file.seek(0)  # 파일 포인터를 처음으로 이동
-    while chunk := video_file.read(8192):  # 8KB씩 읽기
-        hasher.update(chunk)
-    video_file.seek(0)  # 다시 처음으로 이동 (중요!)
-    return hasher.hexdigest()
-
-def upload_video_to_server(server_url: str, video_file_path: str, file_name: str) -> str:
+        logger.warning(f"{client.name} 서버 비디오 존재 여부 확인 실패, 업로드 진행: {e}")
+        return None
+
+def upload_video_to_server(client: ServiceClient, video_file_path: str, file_name: str, sha256: str = None) -> str:
+    # 서버에 이미 같은 내용의 파일이 있으면 전송 생략
+    if sha256:
+        existing_path = find_video_on_server(client, sha256, file_name)
+        if existing_path:
+            logger.info(f"♻️ {client.name} 서버에 동일한 비디오가 있어 업로드 생략: {existing_path}")
+            return existing_path
+
     try:
-        with open(video_file_path, 'rb') as f:
-            files = {
-                "video": (file_name, f, "video/mp4")  # 파일을 직접 스트리밍 방식으로 전송
-            }
-            data = {
-                "file_name": file_name
-            }
-            response = requests.post(f"{server_url}/upload_video", files=files, data=data)
-            response.raise_for_status()
+        # 파일을 메모리에 올리지 않고 청크 단위로 스트리밍 전송
+        response = client.post_file(
+            "/upload_video",
+            field="video",
+            file_path=video_file_path,
+            file_name=file_name,
+            content_type="video/mp4",
+            fields={"file_name": file_name}
+        )
+        response.raise_for_status()
 
-            result = response.json()
-            return result["video_path"]
+        result = response.json()
+        return result["video_path"]
 
     except Exception as e:
         raise Exception(f"비디오 업로드 실패: {e}")
 
-def process_api_request(api_url: str, video_path: str, timestamps: list) -> dict:
+def spool_uploaded_video(video_file) -> dict:
+    """업로드된 비디오를 해시 이름으로 저장 (GPU 서버 전송은 upload_spooled_video에서 수행)
+
+    Args:
+        video_file (FileStorage): 요청으로 받은 비디오 파일
+
+    Returns:
+        dict: spool_upload 결과 (file_path, file_name, sha256, size, reused)
+
+    Raises:
+        PipelineInputError: 빈 파일이 업로드된 경우
+    """
+    logger.info(f"✅ 업로드된 파일명: {video_file.filename}")
+    try:
+        spooled = spool_upload(video_file, UPLOAD_DIR)
+    except ValueError as e:
+        raise PipelineInputError(str(e))
+    logger.info(f"✅ 파일명 해시: {spooled['file_name']}")
+    return spooled
+
+def upload_spooled_video(spooled: dict) -> tuple:
+    """저장된 비디오를 캡션/STT 서버에 동시에 전송
+
+    Args:
+        spooled (dict): spool_uploaded_video 결과
+
+    Returns:
+        tuple: (STT 서버 경로, 캡션 서버 경로)
+    """
+    uploaded = run_concurrently({
+        "video": lambda: upload_video_to_server(service_clients['video'], spooled["file_path"], spooled["file_name"], spooled["sha256"]),
+        "stt": lambda: upload_video_to_server(service_clients['stt'], spooled["file_path"], spooled["file_name"], spooled["sha256"])
+    })
+    logger.info(f"📤 비디오 업로드 완료 (캡션 서버: {uploaded['video']}, STT 서버: {uploaded['stt']})")
+    return uploaded["stt"], uploaded["video"]
+
+def ingest_uploaded_video(video_file) -> tuple:
+    """업로드된 비디오를 해시 이름으로 저장하고 캡션/STT 서버에 동시에 전송
+
+    Returns:
+        tuple: (STT 서버 경로, 캡션 서버 경로)
+    """
+    return upload_spooled_video(spool_uploaded_video(video_file))
+
+def _resolve_video_paths(params: dict, report) -> tuple:
+    """작업 입력의 비디오 경로 결정 (저장만 된 업로드 파일은 이 단계에서 GPU 서버로 전송)
+
+    Returns:
+        tuple: (STT 서버 경로, 캡션 서버 경로)
+    """
+    if "upload" not in params:
+        return params["video_path_1"], params["video_path_2"]
+    report("upload", "running")
+    try:
+        paths = upload_spooled_video(params["upload"])
+    except Exception as e:
+        report("upload", "failed", error=str(e))
+        raise
+    report("upload", "done")
+    return paths
+
+def process_api_request(client: ServiceClient, video_path: str, timestamps: list) -> dict:
     """API 요청 처리 함수"""
     try:
-        response = requests.post(
-            f"{api_url}/entire_video",
-            json={"video_path": video_path, "timestamps": timestamps}
+        # 서버 측에서 결과를 캐시하므로 재시도해도 안전
+        response = client.post(
+            "/entire_video",
+            json={"video_path": video_path, "timestamps": timestamps},
+            idempotent=True
         )
         response.raise_for_status()
         return response.json()["segments"]
     except Exception as e:
         raise Exception(f"API 요청 실패: {e}")
 
-def text_to_timestamps(model, input_text: str, top_k: int = 3) -> list:
-    """텍스트 기반 타임스탬프 검색 함수"""
+def text_to_timestamps(input_text: str, top_k: int = 3, collection: str = VIDEO_COLLECTION,
+                       video_path: str = None, start: float = None, end: float = None) -> list:
+    """텍스트 기반 타임스탬프 검색 함수
+
+    Args:
+        video_path (str): 지정하면 해당 영상 안에서만 검색
+        start (float), end (float): 지정하면 [start, end] 구간(초)과 겹치는 구간만 검색
+    """
     try:
-        query_embedding = model.encode(input_text, normalize_embeddings=True).tolist()
-        response = requests.post(
-            f"{API_ENDPOINTS['vectordb']}/search",
-            json={
-                'query_embedding': query_embedding,
-                'top_k': top_k
-            }
+        filters = {"video_path": video_path, "start": start, "end": end}
+        grouped = _query_vectordb_multi(
+            {collection: input_text},
+            SERVICE_TIMEOUTS['vectordb'][1],
+            n_results=top_k,
+            filters={key: value for key, value in filters.items() if value is not None}
         )
-        return response.json()['results']
+        return rank_results(grouped.get(collection), None, None)
     except Exception as e:
         raise Exception(f"검색 실패: {e}")
 
-def _save_to_vectordb(translated_data: dict, video_path: str):
-    """벡터 DB 저장 함수"""
+def _save_to_vectordb(translated_data: dict, video_path: str, replace: bool = False):
+    """벡터 DB 저장 함수
+
+    구간 ID는 벡터 DB 서버에서 영상 키(업로드 영상은 파일 SHA-256) + 구간으로 만들므로
+    같은 영상을 다시 처리하면 바뀐 구간만 다시 임베딩됨
+
+    Args:
+        translated_data (dict): {"video_caption", "stt"} 캡션 목록
+        video_path (str): 비디오 경로
+        replace (bool): True이면 이번 결과에 없는 기존 구간을 삭제 (전체 영상을 처리한 경우에만 사용)
+    """
     try:
-        # 비디오 캡션 저장
-        video_segments = []
-        for segment in translated_data.get("video_caption", []):
-            video_id = f"{translated_data['video_id']}_{len(video_segments)}"
-            
-            video_segments.append({
+        video_key = os.path.splitext(os.path.basename(video_path))[0]
+        for path, field, segments in (
+            ("/add_json", "video_caption_eng", translated_data.get("video_caption", [])),
+            ("/add_json_audio", "stt_caption_eng", translated_data.get("stt", []))
+        ):
+            records = [{
                 "segments": {
                     "timestamps": {
                         "start": segment["start_time"],
                         "end": segment["end_time"]
                     },
-                    "video_id": video_id,
-                    "video_caption_eng": segment["caption_eng"]
+                    field: segment["caption_eng"]
                 },
-                "video_path": video_path
-            })
-            
-        if video_segments:
-            requests.post(f"{API_ENDPOINTS['vectordb']}/add_json", 
-                        files={"file": json.dumps(video_segments)})
-
-        # STT 캡션 저장  
-        audio_segments = []
-        for segment in translated_data.get("stt", []):
-            audio_id = f"{translated_data['video_id']}_{len(audio_segments)}"
-            
-            audio_segments.append({
-                "segments": {
-                    "timestamps": {
-                        "start": segment["start_time"],
-                        "end": segment["end_time"]
-                    },
-                    "video_id": audio_id,
-                    "stt_caption_eng": segment["caption_eng"]
-                },
-                "video_path": video_path
-            })
-
-        if audio_segments:
-            requests.post(f"{API_ENDPOINTS['vectordb']}/add_json_audio",
-                        files={"file": json.dumps(audio_segments)})
+                "video_path": video_path,
+                "video_key": video_key
+            } for segment in segments]
+
+            # 전체 영상 처리 결과가 비어 있어도 replace 요청은 보내지 않음 (기존 구간 보존)
+            if records:
+                service_clients['vectordb'].post(
+                    path,
+                    files={"file": json.dumps(records)},
+                    data={"replace": "true" if replace else "false"},
+                    idempotent=True
+                ).raise_for_status()
 
     except Exception as e:
         logger.error(f"벡터 DB 저장 실패: {e}")
         raise
 
+class PipelineInputError(Exception):
+    """파이프라인 입력이 잘못된 경우 발생 (400 응답으로 변환)"""
+
+def _noop_report(stage: str, status: str, **extra):
+    """진행 상황 보고가 필요 없을 때 사용하는 기본 콜백"""
+    pass
+
+def _overlaps(start: float, end: float, timestamps: list) -> bool:
+    """[start, end] 구간이 요청된 타임스탬프 구간 중 하나와 겹치는지 확인"""
+    return any(not (ts["end"] < start or ts["start"] > end) for ts in timestamps)
+
+def _request_stt_segments(video_path: str, ranges: list = None) -> list:
+    """STT 서버에 STT 요청 (실패 시 빈 리스트 반환)
+
+    Args:
+        video_path (str): 비디오 경로
+        ranges (list): [{"start", "end"}] 형태의 구간 목록. 지정하면 해당 구간 오디오만 처리
+    """
+    try:
+        if ranges:
+            stt_response = service_clients['stt'].post(
+                "/partial_video",
+                json={"video_path": video_path, "ranges": ranges, "margin": STT_RANGE_MARGIN},
+                idempotent=True
+            )
+        else:
+            stt_response = service_clients['stt'].post(
+                "/entire_video",
+                json={"video_path": video_path},
+                idempotent=True
+            )
+        stt_response.raise_for_status()
+        return stt_response.json().get('segments', [])
+    except Exception as e:
+        logger.error(f"STT 처리 실패: {e}")
+        return []
+
+def _merge_segments(caption_segments: list, stt_segments: list, timestamps: list = None) -> tuple:
+    """캡셔닝 / STT 서버 응답을 VideoSegment 형식으로 변환
+
+    Args:
+        caption_segments (list): 캡셔닝 서버의 segments
+        stt_segments (list): STT 서버의 segments
+        timestamps (list): 지정하면 이 구간들과 겹치는 세그먼트만 남김
+
+    Returns:
+        tuple: (비디오 캡션 세그먼트 리스트, STT 세그먼트 리스트)
+    """
+    video_segments = []
+    for segment in caption_segments:
+        try:
+            # 'captions' 키에서 캡션 값을 안전하게 가져옴
+            video_caption_en = segment.get("video_caption_en", "")
+            if not video_caption_en:
+                logger.warning(f"caption이 없거나 비어있습니다: {segment}")
+                continue
+
+            start_time = segment["timestamps"]["start"]
+            end_time = segment["timestamps"]["end"]
+            if timestamps and not _overlaps(start_time, end_time, timestamps):
+                continue
+
+            video_segments.append({
+                "start_time": start_time,
+                "end_time": end_time,
+                "caption_eng": video_caption_en
+            })
+        except KeyError as e:
+            logger.error(f"세그먼트 처리 중 키 오류: {e}, 세그먼트: {segment}")
+            continue
+
+    # STT 번역 처리: stt API 반환 결과의 구조에 맞게 수정
+    stt_processed = []
+    for segment in stt_segments:
+        stt_caption = segment.get("stt_caption")
+        if not stt_caption:
+            logger.warning(f"STT segment에 stt_caption이 없습니다: {segment}")
+            continue
+
+        timestamp = segment.get("timestamp", {})
+        start = timestamp.get("start", 0)
+        end = timestamp.get("end", 0)
+        if timestamps and not _overlaps(start, end, timestamps):
+            continue
+
+        stt_processed.append({
+            "caption_eng": stt_caption,
+            "start_time": start,
+            "end_time": end
+        })
+
+    return video_segments, stt_processed
+
+# 파이프라인 단계 함수: 입력 이름을 인자로 받고 {출력 이름: 값}을 반환
+def _stage_scene_detect(video_path: str) -> dict:
+    timestamps = scene_detect(video_path)
+    return {"scenes": [{"start_time": start, "end_time": end} for start, end in timestamps]}
+
+def _stage_scene_detect_ranges(video_path: str, timestamps: list) -> dict:
+    # 요청 구간(+ 여유 구간)에서만 장면 감지
+    detected_timestamps = scene_detect_ranges(
+        video_path, [(ts["start"], ts["end"]) for ts in timestamps], margin=SCENE_RANGE_MARGIN
+    )
+    scenes = [
+        {"start_time": start, "end_time": end}
+        for start, end in detected_timestamps
+        if _overlaps(start, end, timestamps)
+    ]
+    if not scenes:
+        raise PipelineInputError("지정된 타임스탬프 구간 내에서 감지된 장면이 없습니다")
+    return {"scenes": scenes}
+
+def _stage_caption(video_path: str, scenes: list) -> dict:
+    return {"caption_segments": process_api_request(service_clients['video'], video_path, scenes)}
+
+def _stage_stt(video_path: str) -> dict:
+    return {"stt_segments": _request_stt_segments(video_path)}
+
+def _stage_stt_ranges(video_path: str, timestamps: list) -> dict:
+    return {"stt_segments": _request_stt_segments(video_path, ranges=timestamps)}
+
+def _stage_translate(video_caption_eng: list, stt_eng: list) -> dict:
+    # 영상 하나의 캡션/STT 텍스트를 모아서 한 번에 번역
+    video_caption = [dict(segment) for segment in video_caption_eng]
+    stt = [dict(segment) for segment in stt_eng]
+    translate_segments(video_caption + stt)
+    return {"video_caption": video_caption, "stt": stt}
+
+def _stage_save(video_path: str, video_id: str, video_caption: list, stt: list, replace: bool = True) -> dict:
+    try:
+        _save_to_vectordb({"video_id": video_id, "stt": stt, "video_caption": video_caption}, video_path, replace=replace)
+        return {"saved": True}
+    except Exception as e:
+        logger.error(f"vectorDB 저장 실패: {e}")
+        return {"saved": False}
+
+def build_video_pipeline(name: str, translate: bool, ranged: bool) -> Pipeline:
+    """비디오 처리 파이프라인 구성
+
+    scene_detect -> caption 과 stt 는 서로 독립적이므로 동시에 실행되고,
+    merge 단계만 두 결과를 기다림
+
+    Args:
+        name (str): 파이프라인 이름
+        translate (bool): 한국어 번역 단계 포함 여부
+        ranged (bool): 요청된 timestamps 구간만 처리할지 여부
+
+    Returns:
+        Pipeline: 구성된 파이프라인
+    """
+    merged_outputs = ["video_caption_eng", "stt_eng"] if translate else ["video_caption", "stt"]
+
+    def merge(caption_segments, stt_segments, timestamps=None):
+        return dict(zip(merged_outputs, _merge_segments(caption_segments, stt_segments, timestamps)))
+
+    if ranged:
+        stages = [
+            Stage("scene_detect", _stage_scene_detect_ranges, ["video_path", "timestamps"], ["scenes"], cacheable=True),
+            Stage("stt", _stage_stt_ranges, ["video_path", "timestamps"], ["stt_segments"]),
+            Stage("merge", merge, ["caption_segments", "stt_segments", "timestamps"], merged_outputs)
+        ]
+    else:
+        stages = [
+            Stage("scene_detect", _stage_scene_detect, ["video_path"], ["scenes"], cacheable=True),
+            Stage("stt", _stage_stt, ["video_path"], ["stt_segments"]),
+            Stage("merge", merge, ["caption_segments", "stt_segments"], merged_outputs)
+        ]
+    stages.append(Stage("caption", _stage_caption, ["video_path", "scenes"], ["caption_segments"], cacheable=True))
+    if translate:
+        stages.append(Stage("translate", _stage_translate, ["video_caption_eng", "stt_eng"], ["video_caption", "stt"]))
+    def save(video_path, video_id, video_caption, stt):
+        # 일부 구간만 처리한 경우에는 나머지 구간을 지우지 않도록 replace 하지 않음
+        return _stage_save(video_path, video_id, video_caption, stt, replace=not ranged)
+
+    stages.append(Stage("save", save, ["video_path", "video_id", "video_caption", "stt"], ["saved"]))
+    return Pipeline(name, stages, cache=stage_cache)
+
+# 단계 출력 캐시 (같은 입력 + 같은 파일 내용의 scene_detect / caption 결과 재사용, 개수 / 기간 제한)
+stage_cache = StageCache(
+    os.environ.get("STAGE_CACHE_DIR", os.path.join(current_dir, "pipeline", "stage_cache")),
+    max_items=int(os.environ.get("STAGE_CACHE_ITEMS", 10000)),
+    ttl=float(os.environ.get("STAGE_CACHE_TTL", 30 * 24 * 3600))
+)
+
+PIPELINES = {
+    "entire_video": build_video_pipeline("entire_video", translate=True, ranged=False),
+    "video_without_translation": build_video_pipeline("video_without_translation", translate=False, ranged=False),
+    "video_with_timestamps": build_video_pipeline("video_with_timestamps", translate=True, ranged=True)
+}
+
+def run_entire_video(params: dict, report=_noop_report) -> dict:
+    """전체 비디오 처리 파이프라인 실행
+
+    Args:
+        params (dict): video_path 또는 upload(spool_uploaded_video 결과), video_id, translate(번역 여부) 를 담은 입력
+        report (callable): report(stage, status) 형태의 단계별 진행 상황 콜백
+
+    Returns:
+        dict: video_id, stt, video_caption, timings 를 담은 처리 결과
+    """
+    video_path = _resolve_video_paths(params, report)[1] if "upload" in params else params["video_path"]
+    pipeline = PIPELINES["entire_video" if params.get("translate", True) else "video_without_translation"]
+    context, timings = pipeline.run(
+        {"video_path": video_path, "video_id": params.get("video_id")}, report
+    )
+    return {
+        "video_id": params.get("video_id"),
+        "stt": context["stt"],
+        "video_caption": context["video_caption"],
+        "timings": timings
+    }
+
+def run_video_with_timestamps(params: dict, report=_noop_report) -> dict:
+    """타임스탬프 기반 비디오 처리 파이프라인 실행
+
+    Args:
+        params (dict): video_path_1(STT 서버 경로), video_path_2(캡션 서버 경로) 또는
+            upload(spool_uploaded_video 결과), video_id, timestamps 를 담은 입력
+        report (callable): report(stage, status) 형태의 단계별 진행 상황 콜백
+
+    Returns:
+        dict: video_id, stt, video_caption, video_path_1, video_path_2, timings 를 담은 처리 결과
+
+    Raises:
+        PipelineInputError: 지정된 구간 내에서 감지된 장면이 없는 경우
+    """
+    video_path_1, video_path_2 = _resolve_video_paths(params, report)
+    context, timings = PIPELINES["video_with_timestamps"].run({
+        "video_path": video_path_2,
+        "video_id": params.get("video_id"),
+        "timestamps": params["timestamps"]
+    }, report)
+    return {
+        "video_id": params.get("video_id"),
+        "stt": context["stt"],
+        "video_caption": context["video_caption"],
+        "video_path_2": video_path_2,  # 2번 서버 경로
+        "video_path_1": video_path_1,  # 1번 서버 경로 추가
+        "timings": timings
+    }
+
+def stream_entire_video(video_path: str, video_id: str, translate: bool = True):
+    """전체 비디오 처리 결과를 세그먼트가 완성될 때마다 이벤트로 반환하는 제너레이터
+
+    이벤트 종류
+      - {"type": "progress", "stage", "status", "elapsed", ...}: 단계별 진행 상황
+      - {"type": "segment", "source": "video_caption" | "stt", "segment": VideoSegment}
+      - {"type": "done", "video_id", "counts", "elapsed"}
+      - {"type": "error", "error"}
+
+    Args:
+        video_path (str): 비디오 경로
+        video_id (str): 비디오 ID
+        translate (bool): 세그먼트별 한국어 번역 여부
+    """
+    started = time.perf_counter()
+
+    def progress(stage, status, **extra):
+        return {"type": "progress", "stage": stage, "status": status,
+                "elapsed": round(time.perf_counter() - started, 3), **extra}
+
+    try:
+        # STT는 다른 GPU 서버에서 독립적으로 처리되므로 먼저 백그라운드로 시작
+        stt_future = submit_background(lambda: _request_stt_segments(video_path))
+        yield progress("stt", "running")
+
+        # 파이프라인 엔진과 같은 단계 캐시를 사용
+        yield progress("scene_detect", "running")
+        scene_inputs = {"video_path": video_path}
+        cached = stage_cache.get("scene_detect", scene_inputs)
+        if cached is None:
+            cached = _stage_scene_detect(video_path)
+            stage_cache.set("scene_detect", scene_inputs, cached)
+        scenes = cached["scenes"]
+        yield progress("scene_detect", "done", scenes=len(scenes))
+
+        # 캡셔닝 서버가 장면 하나를 끝낼 때마다 번역하여 바로 전달
+        yield progress("caption", "running")
+        response = service_clients['video'].post(
+            "/entire_video_stream",
+            json={"video_path": video_path, "timestamps": scenes},
+            stream=True,
+            idempotent=True
+        )
+        response.raise_for_status()
+
+        video_caption = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "error":
+                raise Exception(f"캡션 생성 실패: {event['error']}")
+            if event["type"] != "segment":
+                continue
+
+            segments, _ = _merge_segments([event["segment"]], [])
+            if translate:
+                translate_segments(segments)
+            for segment in segments:
+                video_caption.append(segment)
+                yield {"type": "segment", "source": "video_caption", "segment": segment}
+        yield progress("caption", "done", count=len(video_caption))
+
+        _, stt = _merge_segments([], stt_future.result())
+        if translate:
+            translate_segments(stt)
+        for segment in stt:
+            yield {"type": "segment", "source": "stt", "segment": segment}
+        yield progress("stt", "done", count=len(stt))
+
+        yield progress("save", "running")
+        saved = _stage_save(video_path, video_id, video_caption, stt)["saved"]
+        yield progress("save", "done" if saved else "failed")
+
+        yield {
+            "type": "done",
+            "video_id": video_id,
+            "counts": {"video_caption": len(video_caption), "stt": len(stt)},
+            "elapsed": round(time.perf_counter() - started, 3)
+        }
+
+    except Exception as e:
+        logger.error(f"스트리밍 처리 중 오류 발생: {e}")
+        yield {"type": "error", "error": f"처리 중 오류 발생: {e}"}
+
+def _format_events(events, stream_format: str):
+    """이벤트를 NDJSON 줄 또는 SSE 메시지로 변환"""
+    for event in events:
+        data = json.dumps(event, ensure_ascii=False)
+        if stream_format == "sse":
+            yield f"event: {event['type']}\ndata: {data}\n\n"
+        else:
+            yield data + "\n"
+
+# 비동기 작업 관리자 (작업 상태는 SQLite에 저장되어 재시작 후에도 유지)
+job_manager = JobManager(
+    JobStore(os.environ.get("JOB_DB_PATH", os.path.join(current_dir, "jobs", "jobs.db"))),
+    max_workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("JOB_MAX_PENDING", 32))
+)
+job_manager.register("entire_video", run_entire_video)
+job_manager.register("video_with_timestamps", run_video_with_timestamps)
+# 끝나지 못한 작업 재개 (gunicorn 등에서도 실행, 디버그 리로더의 감시 프로세스에서는 중복 실행 방지를 위해 건너뜀)
+if not (__name__ == "__main__" and os.environ.get("WERKZEUG_RUN_MAIN") != "true"):
+    job_manager.recover()
+
+def _parse_flag(value, default: bool = False) -> bool:
+    """요청의 참/거짓 값 파싱 (JSON boolean은 그대로, 문자열은 '1' / 'true' / 'yes'만 참)"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes')
+
+def _is_async_request() -> bool:
+    """요청이 비동기 작업 모드(async=true)인지 확인"""
+    return _parse_flag(request.form.get('async'))
+
+def _submit_job(kind: str, params: dict):
+    """작업을 등록하고 작업 ID를 즉시 반환"""
+    try:
+        job_id = job_manager.submit(kind, params)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({
+        "job_id": job_id,
+        "status": STATUS_QUEUED,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result"
+    }), 202
+
 # API 엔드포인트
 @app.route('/process_entire_video', methods=['POST'])
 @swag_from({
@@ -309,6 +797,13 @@ def _save_to_vectordb(translated_data: dict, video_path: str):
             'type': 'string',
             'required': False,
             'description': '처리할 비디오 ID'
+        },
+        {
+            'name': 'async',
+            'in': 'formData',
+            'type': 'boolean',
+            'required': False,
+            'description': 'true인 경우 파일 저장 후 작업 ID를 즉시 반환하고 GPU 서버 전송부터 백그라운드에서 처리 (/jobs/{job_id}로 조회)'
         }
     ],
     'responses': {
@@ -319,7 +814,20 @@ def _save_to_vectordb(translated_data: dict, video_path: str):
                 'properties': {
                     'video_id': {'type': 'string'},
                     'stt': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
-                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}}
+                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
+                    'timings': {'type': 'object', 'description': '단계별 실행 시간(wall_time, 초), 출력 크기(payload_bytes), 캐시 사용 여부(skipped)'}
+                }
+            }
+        },
+        202: {
+            'description': '비동기 작업 등록 성공 (async=true)',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'status': {'type': 'string'},
+                    'status_url': {'type': 'string'},
+                    'result_url': {'type': 'string'}
                 }
             }
         },
@@ -342,75 +850,19 @@ def process_entire_video():
         return jsonify({"error": "비디오 파일 또는 video_id가 필요합니다"}), 400
 
     try:
-        video_path = upload_video_to_server(API_ENDPOINTS['video'], video_file) if video_file else f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
-        timestamps = scene_detect(video_path)
-        formatted_timestamps = [{"start_time": start, "end_time": end} for start, end in timestamps]
-        
-        # 비디오 캡션 처리
-        video_results = process_api_request(API_ENDPOINTS['video'], video_path, formatted_timestamps)
-        
-        # STT 처리
-        stt_segments = []
-        try:
-            stt_response = requests.post(
-                f"{API_ENDPOINTS['stt']}/entire_video",
-                json={"video_path": video_path}
-            )
-            stt_response.raise_for_status()
-            stt_segments = stt_response.json().get('segments', [])
-        except Exception as e:
-            logger.error(f"STT 처리 실패: {e}")
-
-        # 결과 처리
-        video_segments = []
-        for segment in video_results:
-            try:
-                # 'captions' 키에서 캡션 값을 안전하게 가져옴
-                video_caption_en = segment.get("video_caption_en", "")
-                if not video_caption_en:
-                    logger.warning(f"caption이 없거나 비어있습니다: {segment}")
-                    continue
-                    
-                video_segments.append({
-                    "start_time": segment["timestamps"]["start"],
-                    "end_time": segment["timestamps"]["end"],
-                    "caption_eng": video_caption_en,
-                    "caption_kor": translate_text(video_caption_en)
-                })
-            except KeyError as e:
-                logger.error(f"세그먼트 처리 중 키 오류: {e}, 세그먼트: {segment}")
-                continue
-
-        # STT 번역 처리: stt API 반환 결과의 구조에 맞게 수정
-        stt_translated = []
-        for segment in stt_segments:
-            stt_caption = segment.get("stt_caption")
-            if not stt_caption:
-                logger.warning(f"STT segment에 stt_caption이 없습니다: {segment}")
-                continue
-            timestamp = segment.get("timestamp", {})
-            start = timestamp.get("start", 0)
-            end = timestamp.get("end", 0)
-            stt_translated.append({
-                "caption_eng": stt_caption,
-                "caption_kor": translate_text(stt_caption),
-                "start_time": start,
-                "end_time": end
-            })
+        # 비동기 모드에서는 파일 저장까지만 하고 GPU 서버 전송은 작업에서 수행
+        params = {"video_id": video_id, "translate": True}
+        if video_file:
+            params["upload"] = spool_uploaded_video(video_file)
+        else:
+            params["video_path"] = f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
+        if _is_async_request():
+            return _submit_job("entire_video", params)
 
-        result = {
-            "video_id": video_id,
-            "stt": stt_translated,
-            "video_caption": video_segments
-        }
-        
-        try:
-            _save_to_vectordb(result, video_path)
-        except Exception as e:
-            logger.error(f"vectorDB 저장 실패: {e}")
-        
-        return jsonify(result)
+        return jsonify(run_entire_video(params))
 
+    except PipelineInputError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         error_msg = f"처리 중 오류 발생: {e}"
         logger.error(error_msg)
@@ -433,6 +885,13 @@ def process_entire_video():
             'type': 'string',
             'required': False,
             'description': '처리할 비디오 ID'
+        },
+        {
+            'name': 'async',
+            'in': 'formData',
+            'type': 'boolean',
+            'required': False,
+            'description': 'true인 경우 파일 저장 후 작업 ID를 즉시 반환하고 GPU 서버 전송부터 백그라운드에서 처리 (/jobs/{job_id}로 조회)'
         }
     ],
     'responses': {
@@ -443,7 +902,20 @@ def process_entire_video():
                 'properties': {
                     'video_id': {'type': 'string'},
                     'stt': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
-                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}}
+                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
+                    'timings': {'type': 'object', 'description': '단계별 실행 시간(wall_time, 초), 출력 크기(payload_bytes), 캐시 사용 여부(skipped)'}
+                }
+            }
+        },
+        202: {
+            'description': '비동기 작업 등록 성공 (async=true)',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'status': {'type': 'string'},
+                    'status_url': {'type': 'string'},
+                    'result_url': {'type': 'string'}
                 }
             }
         },
@@ -466,72 +938,19 @@ def process_video_without_translation():
         return jsonify({"error": "비디오 파일 또는 video_id가 필요합니다"}), 400
 
     try:
-        video_path = upload_video_to_server(API_ENDPOINTS['video'], video_file) if video_file else f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
-        timestamps = scene_detect(video_path)
-        formatted_timestamps = [{"start_time": start, "end_time": end} for start, end in timestamps]
-        
-        # 비디오 캡션 처리
-        video_results = process_api_request(API_ENDPOINTS['video'], video_path, formatted_timestamps)
-        
-        # STT 처리
-        stt_segments = []
-        try:
-            stt_response = requests.post(
-                f"{API_ENDPOINTS['stt']}/entire_video",
-                json={"video_path": video_path}
-            )
-            stt_response.raise_for_status()
-            stt_segments = stt_response.json().get('segments', [])
-        except Exception as e:
-            logger.error(f"STT 처리 실패: {e}")
-
-        # 결과 처리
-        video_segments = []
-        for segment in video_results:
-            try:
-                video_caption_en = segment.get("video_caption_en", "")
-                if not video_caption_en:
-                    logger.warning(f"caption이 없거나 비어있습니다: {segment}")
-                    continue
-                    
-                video_segments.append({
-                    "start_time": segment["timestamps"]["start"],
-                    "end_time": segment["timestamps"]["end"],
-                    "caption_eng": video_caption_en
-                })
-            except KeyError as e:
-                logger.error(f"세그먼트 처리 중 키 오류: {e}, 세그먼트: {segment}")
-                continue
+        # 비동기 모드에서는 파일 저장까지만 하고 GPU 서버 전송은 작업에서 수행
+        params = {"video_id": video_id, "translate": False}
+        if video_file:
+            params["upload"] = spool_uploaded_video(video_file)
+        else:
+            params["video_path"] = f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
+        if _is_async_request():
+            return _submit_job("entire_video", params)
 
-        # STT 처리
-        stt_processed = []
-        for segment in stt_segments:
-            stt_caption = segment.get("stt_caption")
-            if not stt_caption:
-                logger.warning(f"STT segment에 stt_caption이 없습니다: {segment}")
-                continue
-            timestamp = segment.get("timestamp", {})
-            start = timestamp.get("start", 0)
-            end = timestamp.get("end", 0)
-            stt_processed.append({
-                "caption_eng": stt_caption,
-                "start_time": start,
-                "end_time": end
-            })
-
-        result = {
-            "video_id": video_id,
-            "stt": stt_processed,
-            "video_caption": video_segments
-        }
-        
-        try:
-            _save_to_vectordb(result, video_path)
-        except Exception as e:
-            logger.error(f"vectorDB 저장 실패: {e}")
-        
-        return jsonify(result)
+        return jsonify(run_entire_video(params))
 
+    except PipelineInputError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         error_msg = f"처리 중 오류 발생: {e}"
         logger.error(error_msg)
@@ -567,6 +986,13 @@ def process_video_without_translation():
             - start: 시작 시간(초 단위)
             - end: 종료 시간(초 단위)
             '''
+        },
+        {
+            'name': 'async',
+            'in': 'formData',
+            'type': 'boolean',
+            'required': False,
+            'description': 'true인 경우 파일 저장 후 작업 ID를 즉시 반환하고 GPU 서버 전송부터 백그라운드에서 처리 (/jobs/{job_id}로 조회)'
         }
     ],
     'responses': {
@@ -577,7 +1003,20 @@ def process_video_without_translation():
                 'properties': {
                     'video_id': {'type': 'string'},
                     'stt': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
-                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}}
+                    'video_caption': {'type': 'array', 'items': {'$ref': '#/definitions/VideoSegment'}},
+                    'timings': {'type': 'object', 'description': '단계별 실행 시간(wall_time, 초), 출력 크기(payload_bytes), 캐시 사용 여부(skipped)'}
+                }
+            }
+        },
+        202: {
+            'description': '비동기 작업 등록 성공 (async=true)',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'status': {'type': 'string'},
+                    'status_url': {'type': 'string'},
+                    'result_url': {'type': 'string'}
                 }
             }
         },
@@ -608,125 +1047,226 @@ def process_video_with_timestamps():
         return jsonify({"error": "timestamps가 비어있습니다"}), 400
 
     try:
+        params = {"video_id": video_id, "timestamps": timestamps}
         if video_file:
-            logger.info(f"✅ 업로드된 파일명: {video_file.filename}")
-
-            save_dir = '/data/ephemeral/home/new-data/'
-            os.makedirs(save_dir, exist_ok=True)
-        
-            file_extension = os.path.splitext(video_file.filename)[1]
-            file_name = str(get_file_hash(video_file)) + file_extension
-            logger.info(f"✅ 파일명 해시: {file_name}")
-            file_path = os.path.join(save_dir, file_name)
-        
-            logger.info(f"✅ 파일 저장 경로: {file_path}")
-        
-            with open(file_path, 'wb') as f:
-                f.write(video_file.read())
-        
-            logger.info(f"✅ 파일 저장 완료")   
-        
-         # ✅ 2번 서버에 동영상 저장
-        video_path_2 = upload_video_to_server(API_ENDPOINTS['video'], file_path, file_name) if video_file else f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
-        logger.info(f"📤 2번 서버 비디오 업로드 완료: {video_path_2}")
-
-        # ✅ 1번 서버에도 동일한 동영상 업로드
-        video_path_1 = upload_video_to_server(API_ENDPOINTS['stt'], file_path, file_name) if video_file else f"/data/ephemeral/home/backup/{video_id}.mp4"
-        logger.info(f"📤 1번 서버 비디오 업로드 완료: {video_path_1}")
-
-        detected_timestamps = scene_detect(video_path_2)
-        filtered_timestamps = [
-            {"start_time": start, "end_time": end}
-            for start, end in detected_timestamps
-            for ts in timestamps
-            if not (ts["end"] < start or ts["start"] > end)
-        ]
-
-        if not filtered_timestamps:
-            return jsonify({"error": "지정된 타임스탬프 구간 내에서 감지된 장면이 없습니다"}), 400
-
-        # ✅ 비디오 캡션 처리
-        video_results = process_api_request(API_ENDPOINTS['video'], video_path_2, filtered_timestamps)
-
-        # ✅ STT 처리
-        stt_segments = []
-        try:
-            stt_response = requests.post(
-                f"{API_ENDPOINTS['stt']}/entire_video",
-                json={"video_path": video_path_2}
-            )
-            stt_response.raise_for_status()
-            stt_segments = stt_response.json().get('segments', [])
-        except Exception as e:
-            logger.error(f"STT 처리 실패: {e}")
-
-        # ✅ 비디오 캡션 결과 처리
-        video_segments = []
-        for segment in video_results:
-            try:
-                video_caption_en = segment.get("video_caption_en", "")
-                if not video_caption_en:
-                    logger.warning(f"caption이 없거나 비어있습니다: {segment}")
-                    continue
-
-                start_time = segment["timestamps"]["start"]
-                end_time = segment["timestamps"]["end"]
-
-                for ts in timestamps:
-                    if not (ts["end"] < start_time or ts["start"] > end_time):
-                        video_segments.append({
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "caption_eng": video_caption_en,
-                            "caption_kor": translate_text(video_caption_en)
-                        })
-                        break
-            except KeyError as e:
-                logger.error(f"세그먼트 처리 중 키 오류: {e}, 세그먼트: {segment}")
-                continue
+            # ✅ 해시 계산과 저장을 한 번에 처리 (1번(STT) / 2번(캡션) 서버 동시 업로드는 작업에서 수행)
+            params["upload"] = spool_uploaded_video(video_file)
+        else:
+            params["video_path_2"] = f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
+            params["video_path_1"] = f"/data/ephemeral/home/backup/{video_id}.mp4"
+        if _is_async_request():
+            return _submit_job("video_with_timestamps", params)
+
+        return jsonify(run_video_with_timestamps(params))
+
+    except PipelineInputError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"처리 중 오류 발생: {e}"
+        logger.error(error_msg)
+        return jsonify({"error": error_msg}), 500
 
-        # ✅ STT 번역 처리
-        stt_translated = []
-        for segment in stt_segments:
-            stt_caption = segment.get("stt_caption")
-            if not stt_caption:
-                logger.warning(f"STT segment에 stt_caption이 없습니다: {segment}")
-                continue
 
-            timestamp = segment.get("timestamp", {})
-            start = timestamp.get("start", 0)
-            end = timestamp.get("end", 0)
-
-            for ts in timestamps:
-                if not (ts["end"] < start or ts["start"] > end):
-                    stt_translated.append({
-                        "caption_eng": stt_caption,
-                        "caption_kor": translate_text(stt_caption),
-                        "start_time": start,
-                        "end_time": end
-                    })
-                    break
-
-        result = {
-            "video_id": video_id,
-            "stt": stt_translated,
-            "video_caption": video_segments,
-            "video_path_2": video_path_2,  # 2번 서버 경로
-            "video_path_1": video_path_1   # 1번 서버 경로 추가
+@app.route('/process_entire_video_stream', methods=['POST'])
+@swag_from({
+    'tags': ['비디오 처리'],
+    'produces': ['application/x-ndjson', 'text/event-stream'],
+    'parameters': [
+        {
+            'name': 'video',
+            'in': 'formData',
+            'type': 'file',
+            'required': False,
+            'description': '처리할 비디오 파일'
+        },
+        {
+            'name': 'video_id',
+            'in': 'formData',
+            'type': 'string',
+            'required': False,
+            'description': '처리할 비디오 ID'
+        },
+        {
+            'name': 'format',
+            'in': 'formData',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False,
+            'description': '스트리밍 형식 (ndjson: 줄 단위 JSON, sse: server-sent events). 기본값 ndjson'
+        },
+        {
+            'name': 'translate',
+            'in': 'formData',
+            'type': 'boolean',
+            'required': False,
+            'description': '세그먼트별 한국어 번역 여부. 기본값 true'
         }
+    ],
+    'responses': {
+        200: {
+            'description': 'progress / segment / done / error 이벤트 스트림. segment 이벤트의 segment는 VideoSegment 형식'
+        },
+        400: {
+            'description': '잘못된 요청',
+            'schema': {'$ref': '#/definitions/Error'}
+        },
+        500: {
+            'description': '서버 오류',
+            'schema': {'$ref': '#/definitions/Error'}
+        }
+    }
+})
+def process_entire_video_stream():
+    """전체 비디오 처리 스트리밍 API (완성된 세그먼트부터 순서대로 전달)"""
+    video_file = request.files.get('video')
+    video_id = request.form.get('video_id')
 
-        try:
-            _save_to_vectordb(result, video_path_2)
-        except Exception as e:
-            logger.error(f"vectorDB 저장 실패: {e}")
+    if not video_file and not video_id:
+        return jsonify({"error": "비디오 파일 또는 video_id가 필요합니다"}), 400
 
-        return jsonify(result)
+    stream_format = request.form.get('format', 'ndjson')
+    if stream_format not in ('ndjson', 'sse'):
+        return jsonify({"error": "format은 ndjson 또는 sse여야 합니다"}), 400
+    translate = str(request.form.get('translate', 'true')).lower() not in ('0', 'false', 'no')
 
+    try:
+        video_path = ingest_uploaded_video(video_file)[1] if video_file else f"/data/ephemeral/home/movie_clips/{video_id}.mp4"
+    except PipelineInputError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         error_msg = f"처리 중 오류 발생: {e}"
         logger.error(error_msg)
         return jsonify({"error": error_msg}), 500
 
+    events = stream_entire_video(video_path, video_id, translate)
+    return Response(
+        stream_with_context(_format_events(events, stream_format)),
+        mimetype='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@swag_from({
+    'tags': ['비디오 처리'],
+    'parameters': [
+        {
+            'name': 'job_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': '비동기 작업 ID'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': '작업 상태 조회 성공',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'kind': {'type': 'string'},
+                    'status': {'type': 'string', 'description': 'queued / running / done / failed'},
+                    'stages': {'type': 'object', 'description': '단계별 진행 상황 (scene_detect, caption, stt, translate, save)'},
+                    'error': {'type': 'string'}
+                }
+            }
+        },
+        404: {
+            'description': '존재하지 않는 작업',
+            'schema': {'$ref': '#/definitions/Error'}
+        }
+    }
+})
+def get_job_status(job_id):
+    """비동기 작업 상태 조회 API"""
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "존재하지 않는 작업입니다"}), 404
+
+    return jsonify({
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stages": job["stages"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    })
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+@swag_from({
+    'tags': ['비디오 처리'],
+    'parameters': [
+        {
+            'name': 'job_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': '비동기 작업 ID'
+        }
+    ],
+    'responses': {
+        200: {'description': '작업 완료, 처리 결과 반환'},
+        202: {'description': '작업이 아직 진행 중'},
+        404: {
+            'description': '존재하지 않는 작업',
+            'schema': {'$ref': '#/definitions/Error'}
+        },
+        500: {
+            'description': '작업 실패',
+            'schema': {'$ref': '#/definitions/Error'}
+        }
+    }
+})
+def get_job_result(job_id):
+    """비동기 작업 결과 조회 API"""
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "존재하지 않는 작업입니다"}), 404
+
+    if job["status"] == STATUS_DONE:
+        return jsonify(job["result"])
+    if job["status"] == STATUS_FAILED:
+        return jsonify({"error": f"처리 중 오류 발생: {job['error']}"}), 500
+    return jsonify({"job_id": job_id, "status": job["status"], "stages": job["stages"]}), 202
+
+
+def _query_vectordb_multi(queries: dict, timeout: float, n_results: int = 10, filters: dict = None,
+                          rerank: bool = False, rerank_budget: float = SEARCH_RERANK_BUDGET) -> dict:
+    """
+    벡터 DB의 여러 컬렉션을 한 번의 요청으로 검색 (텍스트는 벡터 DB 서버에서 한 번만 인코딩)
+    :param queries: {컬렉션 이름: 검색 텍스트 또는 텍스트 리스트}
+    :param filters: {"video_path", "video_key", "start", "end"} 검색 필터 (벡터 DB 검색 단계에서 적용)
+    :param rerank: True이면 상위 후보를 cross-encoder로 재순위화 (rerank_budget초 안에 끝나지 않으면 기존 순서)
+    :return: {컬렉션 이름: ChromaDB query 결과} (metadatas / distances만 포함)
+    """
+    response = service_clients['vectordb'].post(
+        "/query_multi",
+        json={
+            "queries": queries,
+            "top_k": n_results,
+            "filters": filters or {},
+            "include": ["metadatas", "distances"],
+            "modes": {name: SEARCH_MODES[name] for name in queries if name in SEARCH_MODES},
+            "rerank": rerank,
+            "rerank_budget": rerank_budget,
+            "coarse_videos": SEARCH_COARSE_VIDEOS
+        },
+        timeout=(min(5, timeout), timeout)
+    )
+    response.raise_for_status()
+    return response.json()['results']
+
+def _analyze_query(query_text: str, timeout: float) -> dict:
+    """LLM 서버에 쿼리 분석 요청"""
+    llm_response = service_clients['llm'].post(
+        "/analyze_query",
+        json={"query_text": query_text},
+        timeout=(min(5, timeout), timeout)
+    )
+    llm_response.raise_for_status()
+    return llm_response.json()['result']
+
 
 @app.route('/search_videos', methods=['POST'])
 @swag_from({
@@ -739,7 +1279,22 @@ def process_video_with_timestamps():
             'schema': {
                 'type': 'object',
                 'properties': {
-                    'text': {'type': 'string', 'description': '검색할 텍스트'}
+                    'text': {'type': 'string', 'description': '검색할 텍스트'},
+                    'timeout': {'type': 'number', 'description': '요청 전체 제한 시간(초). 제한 시간 안에 끝나지 않은 검색은 제외하고 부분 결과 반환'},
+                    'rerank': {'type': 'boolean', 'description': '벡터 검색 상위 후보를 cross-encoder로 재순위화 (기본값은 SEARCH_RERANK 설정)'},
+                    'group_by': {'type': 'string', 'enum': ['segment', 'moment', 'video'], 'default': 'segment',
+                                 'description': 'segment: 구간 단위, moment: 같은 영상의 인접 구간을 장면으로 합침, video: 장면을 영상 단위로 묶음'},
+                    'pooling': {'type': 'string', 'enum': ['max', 'sum'], 'default': 'max',
+                                'description': '장면 / 영상 점수 계산 방식 (max: 가장 높은 점수, sum: 점수 합)'},
+                    'filters': {
+                        'type': 'object',
+                        'description': '벡터 검색 필터 (벡터 DB 검색 단계에서 적용)',
+                        'properties': {
+                            'video_path': {'type': 'string', 'description': '이 영상 안에서만 검색'},
+                            'start': {'type': 'number', 'description': '이 시각(초) 이후에 끝나는 구간만 검색'},
+                            'end': {'type': 'number', 'description': '이 시각(초) 이전에 시작하는 구간만 검색'}
+                        }
+                    }
                 },
                 'required': ['text']
             }
@@ -756,12 +1311,21 @@ def process_video_with_timestamps():
                         'items': {
                             'type': 'object',
                             'properties': {
-                                'id': {'type': 'string'},
-                                'score': {'type': 'number'},
-                                'metadata': {'type': 'object'}
+                                'video_id': {'type': 'string', 'description': '구간 ID (메타데이터 결과와 group_by가 moment / video인 경우는 영상 ID)'},
+                                'score': {'type': 'number', 'description': '가중 Reciprocal Rank Fusion 점수'},
+                                'distance': {'type': 'number', 'description': '벡터 검색 거리 (가장 가까운 값)'},
+                                'sources': {'type': 'array', 'items': {'type': 'string'}, 'description': '구간이 직접 검색된 출처 (video / stt / meta)'},
+                                'metadata': {'type': 'object'},
+                                'start': {'type': 'number', 'description': '장면 시작 시각 (group_by=moment)'},
+                                'end': {'type': 'number', 'description': '장면 종료 시각 (group_by=moment)'},
+                                'segment_ids': {'type': 'array', 'items': {'type': 'string'}, 'description': '장면에 포함된 구간 ID (group_by=moment)'},
+                                'moments': {'type': 'array', 'items': {'type': 'object'}, 'description': '영상 안의 장면 목록 (group_by=video)'}
                             }
                         }
-                    }
+                    },
+                    'partial': {'type': 'boolean', 'description': '일부 검색이 제한 시간을 넘기거나 실패한 경우 true'},
+                    'timed_out': {'type': 'array', 'items': {'type': 'string'}, 'description': '제한 시간을 넘긴 검색 (vector / meta)'},
+                    'failed': {'type': 'array', 'items': {'type': 'string'}, 'description': '실패한 검색 (vector / meta)'}
                 }
             }
         },
@@ -782,251 +1346,91 @@ def search_videos():
         if not data or 'text' not in data or not data['text'].strip():
             return jsonify({"error": "유효한 검색어를 입력해주세요"}), 400
 
+        group_by = data.get('group_by', 'segment')
+        pooling = data.get('pooling', 'max')
+        if group_by not in GROUP_BY or pooling not in POOLINGS:
+            return jsonify({"error": f"group_by는 {list(GROUP_BY)}, pooling은 {list(POOLINGS)} 중 하나여야 합니다"}), 400
+
+        try:
+            deadline = float(data.get('timeout', SEARCH_DEADLINE))
+        except (TypeError, ValueError):
+            deadline = None
+        if deadline is None or not 0 < deadline < float('inf'):
+            return jsonify({"error": "timeout은 0보다 큰 숫자(초)여야 합니다"}), 400
+
+        started = time.perf_counter()
+
         # LLM 서버에 쿼리 분석 요청
+        unique_fields = []
+        query_analysis = None
         try:
-            llm_response = requests.post(
-                f"{API_ENDPOINTS['llm']}/analyze_query",
-                json={"query_text": data['text']}
-            )
-            llm_response.raise_for_status()
-            query_analysis = llm_response.json()['result']
-            print("query_analysis", query_analysis)
-            
-            # 비디오 필드와 중요도 추출
+            query_analysis = _analyze_query(data['text'], max(deadline - MIN_RETRIEVAL_BUDGET, deadline / 2))
+            logger.debug(f"query_analysis: {query_analysis}")
+
+            # 비디오 / STT / 고유 필드 추출
             video_field = query_analysis.get('video_field', '')
-            video_importance = query_analysis.get('video_field_importance', 0)
-            
-            # STT 필드와 중요도 추출  
             stt_fields = query_analysis.get('stt_field', [])
-            stt_importance = query_analysis.get('stt_field_importance', [])
-            
-            # 고유 필드와 중요도 추출
             unique_fields = query_analysis.get('unique_field', [])
-            unique_importance = query_analysis.get('unique_field_importance', [])
-            
-            # 모든 필드가 비어있는 경우 원본 검색어로 검색
-            if not video_field and not stt_fields and not unique_fields:
-                video_response = requests.post(
-                    f"{API_ENDPOINTS['vectordb']}/query",
-                    json={"input_text": data['text']}
-                )
-                stt_response = requests.post(
-                    f"{API_ENDPOINTS['vectordb']}/query_audio", 
-                    json={"input_text": data['text']}
-                )
-                final_results = rank_search_results(
-                    video_response.json() if video_response.status_code == 200 else [],
-                    stt_response.json() if stt_response.status_code == 200 else [],
-                    []
-                )
-                return jsonify({"results": final_results})
-            
-            # 비디오 검색
-            video_results = []
+            analyzed = bool(video_field or stt_fields or unique_fields)
+        except Exception as e:
+            logger.warning(f"쿼리 분석 실패, 원본 텍스트로 검색: {e}")
+            analyzed = False
+
+        # 분석 결과가 나온 뒤의 검색은 서로 독립적이므로 동시에 실행 (요청 제한 시간을 넘기지 않도록 남은 시간만 사용)
+        remaining = deadline - (time.perf_counter() - started)
+        queries = {}
+        if analyzed:
             if video_field:
-                response = requests.post(
-                    f"{API_ENDPOINTS['vectordb']}/query",
-                    json={"input_text": video_field}
-                )
-                if response.status_code == 200:
-                    video_results = response.json()
-
-            # STT 검색
-            stt_results = []
+                queries[VIDEO_COLLECTION] = video_field
             if stt_fields:
-                stt_search_text = ' '.join(stt_fields)
-                response = requests.post(
-                    f"{API_ENDPOINTS['vectordb']}/query_audio",
-                    json={"input_text": stt_search_text}
-                )
-                if response.status_code == 200:
-                    stt_results = response.json()
-            
-            meta_results = []
-            if unique_fields:
-                # unique_fields를 이용하여 메타데이터 검색 수행
-                meta_results = select_query(unique_fields)
-            
-
-            # 검색 결과 순위 매기기
-            final_results = rank_search_results(
-                video_results if video_results else [],
-                stt_results if stt_results else [],
-                meta_results if meta_results else []
-            )
-            
-            return jsonify({"results": final_results})
+                queries[AUDIO_COLLECTION] = ' '.join(stt_fields)
+        else:
+            # 모든 필드가 비어있거나 분석에 실패한 경우 원본 검색어로 검색
+            queries[VIDEO_COLLECTION] = data['text']
+            queries[AUDIO_COLLECTION] = data['text']
+
+        tasks = {}
+        if queries:
+            # 비디오 / STT 컬렉션 검색은 벡터 DB 요청 하나로 처리 (재순위화는 남은 시간의 절반 이내)
+            rerank = _parse_flag(data.get('rerank'), SEARCH_RERANK)
+            tasks["vector"] = lambda: _query_vectordb_multi(queries, remaining, filters=data.get('filters'), rerank=rerank,
+                                                            rerank_budget=min(SEARCH_RERANK_BUDGET, remaining / 2))
+        if unique_fields:
+            # unique_fields를 이용하여 메타데이터 검색 수행
+            tasks["meta"] = lambda: select_query(unique_fields)
+
+        if remaining > 0:
+            results, timed_out, failed = run_with_deadline(tasks, remaining)
+        else:
+            # 제한 시간을 이미 넘긴 경우 검색하지 않고 부분 결과로 응답
+            results, timed_out, failed = {}, list(tasks), {}
+        vector_results = results.get("vector") or {}
+
+        # 검색 결과 순위 매기기 (늦거나 실패한 검색은 빈 결과로 처리, LLM이 평가한 중요도로 가중)
+        final_results = rank_results(
+            vector_results.get(VIDEO_COLLECTION) or [],
+            vector_results.get(AUDIO_COLLECTION) or [],
+            results.get("meta") or [],
+            weights=importance_weights(query_analysis if analyzed else None)
+        )
 
-        except Exception as e:
-            logger.warning(f"쿼리 분석 실패, 원본 텍스트로 검색: {e}")
-            # 실패 시 원본 텍스트로 양쪽 모두 검색
-            video_response = requests.post(
-                f"{API_ENDPOINTS['vectordb']}/query",
-                json={"input_text": data['text']}
-            )
-            stt_response = requests.post(
-                f"{API_ENDPOINTS['vectordb']}/query_audio",
-                json={"input_text": data['text']}
-            )
-            
-            meta_results = []
-            if unique_fields:
-                meta_results = select_query(unique_fields)
-            print("meta_results", meta_results)
-            final_results = rank_search_results(video_response.json() if video_response.status_code == 200 else [], stt_response.json() if stt_response.status_code == 200 else [], meta_results if meta_results else [])
-            return jsonify({"results": final_results})
+        # 인접한 구간을 장면으로 합치거나 영상 단위로 묶어 비슷한 결과가 반복되지 않도록 함
+        if group_by == GROUP_MOMENT:
+            final_results = aggregate_moments(final_results, pooling=pooling)
+        elif group_by == GROUP_VIDEO:
+            final_results = aggregate_videos(final_results, pooling=pooling)
+
+        response = {"results": final_results}
+        if timed_out or failed:
+            response["partial"] = True
+            response["timed_out"] = timed_out
+            response["failed"] = list(failed)
+        return jsonify(response)
 
     except Exception as e:
         error_msg = f"검색 중 오류 발생: {e}"
         logger.error(error_msg)
         return jsonify({"error": error_msg}), 500
 
-def get_base_video_id(video_id):
-    """비디오 ID에서 기본 ID 추출 (숫자 제외)"""
-    import re
-    # 문자열이 아니라면 문자열로 변환을 시도
-    if not isinstance(video_id, str):
-        try:
-            video_id = str(video_id)
-        except Exception:
-            return ""
-    return re.sub(r'_\d+$', '', video_id)
-
-def rank_search_results(video_results, stt_results, meta_results):
-    """검색 결과의 순위를 매기는 함수"""
-    # video_results와 stt_results에서 ID 추출
-    video_ids = set()
-    if video_results and 'ids' in video_results and video_results['ids']:
-        for id_list in video_results['ids']:
-            for id in id_list:
-                video_ids.add(get_base_video_id(id))
-            
-    stt_ids = set()
-    if stt_results and 'ids' in stt_results and stt_results['ids']:
-        for id_list in stt_results['ids']:
-            for id in id_list:
-                stt_ids.add(get_base_video_id(id))
-            
-    meta_ids = set()
-    if meta_results:
-        meta_ids = set(result['id'] for result in meta_results if isinstance(result, dict) and 'id' in result)
-                
-    print("video_ids", video_ids)
-    print("stt_ids", stt_ids)
-    print("meta_ids", meta_ids)
-    
-    ranked_results = []
-    
-    # 3개 모두 있는 경우
-    if video_ids and stt_ids and meta_ids:
-        print("3개 모두 있는 경우")
-        # 1. 3개 모두 겹치는 결과
-        triple_overlap = video_ids & stt_ids & meta_ids
-        # 2. 비디오 + 메타 겹치는 결과 
-        video_meta_overlap = video_ids & meta_ids - triple_overlap
-        # 3. 비디오 + STT 겹치는 결과
-        video_stt_overlap = video_ids & stt_ids - triple_overlap
-        # 4. STT + 메타 겹치는 결과
-        stt_meta_overlap = stt_ids & meta_ids - triple_overlap
-        
-        # 결과 순서대로 추가
-        for video_id in triple_overlap:
-            for i, id_list in enumerate(video_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': video_results['metadatas'][i][j] if video_results['metadatas'] else None
-                        })
-        
-        for video_id in video_meta_overlap | video_stt_overlap:
-            for i, id_list in enumerate(video_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': video_results['metadatas'][i][j] if video_results['metadatas'] else None
-                        })
-                        
-        for video_id in stt_meta_overlap:
-            for i, id_list in enumerate(stt_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': stt_results['metadatas'][i][j] if stt_results['metadatas'] else None
-                        })
-                        
-        # 5. 나머지 메타 결과
-        remaining_meta = meta_ids - triple_overlap - video_meta_overlap - stt_meta_overlap
-        for video_id in remaining_meta:
-            meta_matches = [r for r in meta_results if isinstance(r, dict) and 'id' in r and r['id'] == video_id]
-            if meta_matches:
-                ranked_results.append(meta_matches[0])
-                
-    # 비디오 + 메타만 있는 경우
-    elif video_ids and meta_ids and not stt_ids:
-        print("비디오 + 메타만 있는 경우")
-        overlap = video_ids & meta_ids
-        for video_id in overlap:
-            for i, id_list in enumerate(video_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': video_results['metadatas'][i][j] if video_results['metadatas'] else None
-                        })
-                        
-    # STT + 메타만 있는 경우
-    elif stt_ids and meta_ids and not video_ids:
-        print("STT + 메타만 있는 경우")
-        overlap = stt_ids & meta_ids
-        for video_id in overlap:
-            for i, id_list in enumerate(stt_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': stt_results['metadatas'][i][j] if stt_results['metadatas'] else None
-                        })
-        remaining_meta = [r for r in meta_results if isinstance(r, dict) and 'id' in r and r['id'] not in overlap]
-        ranked_results.extend(remaining_meta[:30])
-        
-    # 비디오 + STT만 있는 경우
-    elif video_ids and stt_ids and not meta_ids:
-        print("비디오 + STT만 있는 경우")
-        overlap = video_ids & stt_ids
-        for video_id in overlap:
-            for i, id_list in enumerate(video_results['ids']):
-                for j, vid in enumerate(id_list):
-                    if get_base_video_id(vid) == video_id:
-                        ranked_results.append({
-                            'video_id': vid,
-                            'metadata': video_results['metadatas'][i][j] if video_results['metadatas'] else None
-                        })
-                        
-    # 하나만 있는 경우
-    else:
-        print("하나만 있는 경우")
-        if video_ids:
-            for i, id_list in enumerate(video_results['ids']):
-                for j, vid in enumerate(id_list):
-                    ranked_results.append({
-                        'video_id': vid,
-                        'metadata': video_results['metadatas'][i][j] if video_results['metadatas'] else None
-                    })
-        elif stt_ids:
-            for i, id_list in enumerate(stt_results['ids']):
-                for j, vid in enumerate(id_list):
-                    ranked_results.append({
-                        'video_id': vid,
-                        'metadata': stt_results['metadatas'][i][j] if stt_results['metadatas'] else None
-                    })
-        elif meta_ids:
-            print("meta_ids만 있는 경우")
-            ranked_results = [meta_results[0]]
-            
-    print("ranked_results 처리 완료")
-    return ranked_results
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=30936, debug=True)
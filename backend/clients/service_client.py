@@ -0,0 +1,156 @@
+import logging
+import os
+import random
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 멱등 요청에서 재시도할 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+class MultipartFileStream:
+    """
+    파일 하나를 multipart/form-data 본문으로 스트리밍 전송하기 위한 이터러블
+    requests의 files= 인자는 본문 전체를 메모리에 만들기 때문에, 대용량 비디오는 이 클래스로 청크 단위 전송
+    """
+
+    def __init__(self, field: str, file_path: str, file_name: str, content_type: str,
+                 fields: dict = None, chunk_size: int = 1024 * 1024):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = b""
+        for name, value in (fields or {}).items():
+            head += (
+                f"--{boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                f"{value}\r\n"
+            ).encode("utf-8")
+        head += (
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{field}\"; filename=\"{file_name}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self.head = head
+        self.tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    def __len__(self):
+        # requests가 Content-Length 헤더를 채울 수 있도록 전체 길이 제공
+        return len(self.head) + os.path.getsize(self.file_path) + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        with open(self.file_path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                yield chunk
+        yield self.tail
+
+
+class ServiceClient:
+    """
+    내부 서비스(GPU 서버, 벡터 DB, LLM 서버) 호출용 HTTP 클라이언트
+      - 엔드포인트별 requests.Session 으로 커넥션 풀링 / keep-alive
+      - 연결 / 읽기 타임아웃 설정
+      - 멱등 요청에 한해 지터(jitter)가 있는 지수 백오프 재시도
+      - 호출별 지연 시간 로깅
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 600.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_size: int = 8
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt: int) -> float:
+        """full jitter 방식의 대기 시간 (초)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, path: str, idempotent: bool = False, timeout=None, **kwargs) -> requests.Response:
+        """
+        서비스에 HTTP 요청을 보냄
+        :param method: HTTP 메서드
+        :param path: base_url 뒤에 붙는 경로 (예: '/entire_video')
+        :param idempotent: True인 경우 연결 오류 / 타임아웃 / 일시적 오류 응답 시 재시도
+        :param timeout: (연결, 읽기) 타임아웃. 지정하지 않으면 클라이언트 기본값 사용
+        :return: requests.Response (상태 코드 검사는 호출하는 쪽에서 수행)
+        """
+        url = f"{self.base_url}{path}"
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.warning(f"🌐 {self.name} {method} {path} 실패 {elapsed_ms:.0f}ms (시도 {attempt + 1}/{attempts}): {e}")
+                if attempt + 1 >= attempts:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"🌐 {self.name} {method} {path} {response.status_code} {elapsed_ms:.0f}ms (시도 {attempt + 1}/{attempts})")
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt + 1 < attempts:
+                # 버리는 응답은 닫아서 연결을 풀에 바로 반환
+                response.close()
+                time.sleep(self._backoff(attempt))
+                continue
+            return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, idempotent=True, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def post_file(self, path: str, field: str, file_path: str, file_name: str,
+                  content_type: str = "application/octet-stream", fields: dict = None, **kwargs) -> requests.Response:
+        """
+        파일을 메모리에 올리지 않고 multipart/form-data로 스트리밍 업로드
+        :param field: 파일 필드 이름 (예: 'video')
+        :param fields: 함께 보낼 일반 form 필드
+        """
+        body = MultipartFileStream(field, file_path, file_name, content_type, fields)
+        headers = kwargs.pop("headers", {})
+        headers["Content-Type"] = body.content_type
+        return self.request("POST", path, data=body, headers=headers, **kwargs)
+
+
+def create_service_clients(endpoints: dict, timeouts: dict = None) -> dict:
+    """
+    엔드포인트 설정으로 서비스별 클라이언트 생성
+    :param endpoints: {서비스 이름: base_url} (예: API_ENDPOINTS)
+    :param timeouts: {서비스 이름: (연결 타임아웃, 읽기 타임아웃)} (초 단위)
+    :return: {서비스 이름: ServiceClient}
+    """
+    timeouts = timeouts or {}
+    clients = {}
+    for name, base_url in endpoints.items():
+        connect_timeout, read_timeout = timeouts.get(name, (5.0, 600.0))
+        clients[name] = ServiceClient(name, base_url, connect_timeout=connect_timeout, read_timeout=read_timeout)
+    return clients
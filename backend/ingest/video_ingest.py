@@ -0,0 +1,60 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1MB 단위로 읽기
+
+
+def spool_upload(video_file, save_dir: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    업로드된 비디오를 한 번만 읽으면서 SHA-256 해시 계산과 디스크 저장을 동시에 수행
+    같은 해시의 파일이 이미 있으면 새로 저장하지 않고 기존 파일을 사용
+
+    :param video_file: werkzeug FileStorage (request.files['video'])
+    :param save_dir: 저장 디렉토리
+    :return: {"file_path", "file_name", "sha256", "size", "reused"}
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    file_extension = os.path.splitext(video_file.filename)[1]
+
+    hasher = hashlib.sha256()
+    size = 0
+    # 같은 디렉토리에 임시 파일로 먼저 기록한 뒤 해시 이름으로 rename (동시 업로드 간 충돌 방지)
+    with tempfile.NamedTemporaryFile(dir=save_dir, suffix=".part", delete=False) as tmp:
+        tmp_path = tmp.name
+        try:
+            while chunk := video_file.stream.read(chunk_size):
+                hasher.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        except Exception:
+            tmp.close()
+            os.remove(tmp_path)
+            raise
+
+    if size == 0:
+        os.remove(tmp_path)
+        raise ValueError("파일이 비어있습니다. 다시 업로드 해주세요.")
+
+    sha256 = hasher.hexdigest()
+    file_name = sha256 + file_extension
+    file_path = os.path.join(save_dir, file_name)
+
+    reused = os.path.exists(file_path)
+    if reused:
+        os.remove(tmp_path)
+        logger.info(f"♻️ 동일한 파일이 이미 존재하여 저장 생략: {file_path}")
+    else:
+        os.replace(tmp_path, file_path)
+        logger.info(f"✅ 파일 저장 완료: {file_path} ({size / (1024 * 1024):.2f}MB)")
+
+    return {
+        "file_path": file_path,
+        "file_name": file_name,
+        "sha256": sha256,
+        "size": size,
+        "reused": reused
+    }
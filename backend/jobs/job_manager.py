@@ -0,0 +1,210 @@
+import fcntl
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태 값
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"  # 단계 출력이 캐시에 있어 실행을 생략한 경우
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업 수가 한도를 넘었을 때 발생"""
+
+
+class JobStore:
+    """SQLite 기반 작업 상태 저장소 (백엔드 재시작 후에도 상태 유지)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_table(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,      -- 작업 ID
+                kind TEXT NOT NULL,       -- 파이프라인 종류 (예: 'entire_video')
+                status TEXT NOT NULL,     -- queued / running / done / failed
+                params TEXT NOT NULL,     -- 파이프라인 입력 (JSON)
+                stages TEXT NOT NULL,     -- 단계별 진행 상황 (JSON)
+                result TEXT,              -- 처리 결과 (JSON)
+                error TEXT,               -- 오류 메시지
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """)
+            conn.commit()
+            conn.close()
+
+    def create(self, kind: str, params: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, stages, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, STATUS_QUEUED, json.dumps(params, ensure_ascii=False), "{}", now, now)
+            )
+            conn.commit()
+            conn.close()
+        return job_id
+
+    def get(self, job_id: str) -> dict:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT id, kind, status, params, stages, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "params": json.loads(row[3]),
+            "stages": json.loads(row[4]),
+            "result": json.loads(row[5]) if row[5] is not None else None,
+            "error": row[6],
+            "created_at": row[7],
+            "updated_at": row[8]
+        }
+
+    def update(self, job_id: str, **fields):
+        """status / result / error 필드 갱신"""
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            conn.commit()
+            conn.close()
+
+    def update_stage(self, job_id: str, stage: str, status: str, **extra):
+        """단계별 진행 상황 기록 (started_at / finished_at 자동 기록)"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.close()
+                return
+            stages = json.loads(row[0])
+            stage_info = stages.get(stage, {})
+            stage_info["status"] = status
+            if status == STATUS_RUNNING:
+                stage_info["started_at"] = now
+            elif status in (STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED):
+                stage_info["finished_at"] = now
+            stage_info.update(extra)
+            stages[stage] = stage_info
+            conn.execute(
+                "UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(stages, ensure_ascii=False), now, job_id)
+            )
+            conn.commit()
+            conn.close()
+
+    def list_unfinished(self) -> list:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            (STATUS_QUEUED, STATUS_RUNNING)
+        ).fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+
+class JobManager:
+    """제한된 크기의 스레드 풀에서 파이프라인 작업을 실행하고 상태를 기록"""
+
+    def __init__(self, store: JobStore, max_workers: int = 2, max_pending: int = 32):
+        self.store = store
+        self.max_pending = max_pending
+        self._handlers = {}
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._recover_lock = None
+
+    def register(self, kind: str, handler):
+        """
+        작업 종류별 실행 함수 등록
+        :param kind: 작업 종류
+        :param handler: handler(params: dict, report) -> dict 형태의 함수
+                        report(stage, status)로 단계별 진행 상황을 보고
+        """
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: dict) -> str:
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류입니다: {kind}")
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"대기 중인 작업이 너무 많습니다 (최대 {self.max_pending}개)")
+            self._pending += 1
+        job_id = self.store.create(kind, params)
+        self._executor.submit(self._run, job_id, kind, params)
+        logger.info(f"📥 작업 등록: {job_id} ({kind})")
+        return job_id
+
+    def recover(self) -> bool:
+        """
+        재시작 전에 끝나지 못한 작업을 다시 실행 대기열에 넣음
+        같은 작업 DB를 쓰는 프로세스가 여러 개여도(gunicorn 워커 등) 파일 잠금을 얻은 프로세스 하나만 재개하며,
+        잠금은 프로세스가 끝날 때까지 유지
+        :return: 작업 재개 여부 (다른 프로세스가 이미 재개했으면 False)
+        """
+        if self._recover_lock is None:
+            lock_file = open(f"{self.store.db_path}.lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                logger.info("다른 프로세스가 작업을 재개하므로 건너뜀")
+                return False
+            self._recover_lock = lock_file
+        for job_id in self.store.list_unfinished():
+            job = self.store.get(job_id)
+            if job["kind"] not in self._handlers:
+                self.store.update(job_id, status=STATUS_FAILED, error="재시작 후 실행할 수 없는 작업입니다")
+                continue
+            with self._pending_lock:
+                self._pending += 1
+            self.store.update(job_id, status=STATUS_QUEUED)
+            self._executor.submit(self._run, job_id, job["kind"], job["params"])
+            logger.info(f"🔁 작업 재개: {job_id} ({job['kind']})")
+        return True
+
+    def _run(self, job_id: str, kind: str, params: dict):
+        def report(stage: str, status: str, **extra):
+            self.store.update_stage(job_id, stage, status, **extra)
+
+        try:
+            self.store.update(job_id, status=STATUS_RUNNING)
+            result = self._handlers[kind](params, report)
+            self.store.update(job_id, status=STATUS_DONE, result=result)
+            logger.info(f"✅ 작업 완료: {job_id}")
+        except Exception as e:
+            logger.error(f"❌ 작업 실패: {job_id} - {e}")
+            self.store.update(job_id, status=STATUS_FAILED, error=str(e))
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+# 파이프라인 단계 실행용 스레드 풀 (단계 내부에서 쓰는 fan_out 풀과 분리하여 교착 상태 방지)
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PIPELINE_WORKERS", 16)),
+    thread_name_prefix="pipeline-stage"
+)
+
+
+def _payload_size(value) -> int:
+    """단계 출력의 JSON 직렬화 크기 (바이트)"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+class Stage:
+    """
+    파이프라인의 한 단계
+    :param name: 단계 이름 (timings / 진행 상황 보고에 사용)
+    :param func: func(**inputs) -> {출력 이름: 값} 형태의 함수
+    :param inputs: 컨텍스트에서 읽을 입력 이름 목록
+    :param outputs: 컨텍스트에 기록할 출력 이름 목록
+    :param cacheable: True인 경우 같은 입력에 대한 출력이 캐시에 있으면 실행을 생략
+    """
+
+    def __init__(self, name: str, func, inputs: list, outputs: list, cacheable: bool = False):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.outputs = outputs
+        self.cacheable = cacheable
+
+
+class Pipeline:
+    """
+    입력/출력이 선언된 단계들을 의존성 순서대로 실행하는 엔진
+      - 입력이 모두 준비된 단계들은 동시에 실행
+      - 캐시 가능한 단계는 같은 입력의 결과가 캐시에 있으면 생략
+      - 단계별 실행 시간과 출력 크기를 timings에 기록
+    """
+
+    def __init__(self, name: str, stages: list, cache=None):
+        self.name = name
+        self.stages = stages
+        self.cache = cache
+
+        produced = set()
+        for stage in stages:
+            duplicated = produced & set(stage.outputs)
+            if duplicated:
+                raise ValueError(f"출력 이름이 중복되었습니다: {duplicated}")
+            produced |= set(stage.outputs)
+
+    def _execute(self, stage: Stage, inputs: dict, report) -> dict:
+        started = time.perf_counter()
+
+        if stage.cacheable and self.cache is not None:
+            cached = self.cache.get(stage.name, inputs)
+            if cached is not None:
+                report(stage.name, "skipped")
+                return {"outputs": cached, "wall_time": time.perf_counter() - started, "skipped": True}
+
+        report(stage.name, "running")
+        try:
+            outputs = stage.func(**inputs)
+        except Exception as e:
+            report(stage.name, "failed", error=str(e))
+            raise
+
+        missing = set(stage.outputs) - set(outputs)
+        if missing:
+            raise ValueError(f"{stage.name} 단계가 출력을 반환하지 않았습니다: {missing}")
+        outputs = {key: outputs[key] for key in stage.outputs}
+
+        if stage.cacheable and self.cache is not None:
+            self.cache.set(stage.name, inputs, outputs)
+        report(stage.name, "done")
+        return {"outputs": outputs, "wall_time": time.perf_counter() - started, "skipped": False}
+
+    def run(self, context: dict, report=None) -> tuple:
+        """
+        파이프라인 실행
+        :param context: 초기 입력 {이름: 값}
+        :param report: report(stage, status, **extra) 형태의 진행 상황 콜백
+        :return: (모든 단계의 출력이 채워진 컨텍스트, 단계별 timings)
+        """
+        report = report or (lambda stage, status, **extra: None)
+        context = dict(context)
+        timings = {}
+        pending = list(self.stages)
+        running = {}
+        started = time.perf_counter()
+
+        while pending or running:
+            # 입력이 모두 준비된 단계를 실행
+            for stage in [s for s in pending if all(name in context for name in s.inputs)]:
+                pending.remove(stage)
+                inputs = {name: context[name] for name in stage.inputs}
+                running[_executor.submit(self._execute, stage, inputs, report)] = stage
+
+            if not running:
+                missing = {name for stage in pending for name in stage.inputs if name not in context}
+                raise ValueError(f"{self.name} 파이프라인의 입력이 부족합니다: {missing}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    executed = future.result()
+                except Exception:
+                    # 실행 중인 다른 단계가 끝날 때까지 기다린 뒤 예외 전달
+                    wait(running)
+                    raise
+                context.update(executed["outputs"])
+                timings[stage.name] = {
+                    "wall_time": round(executed["wall_time"], 4),
+                    "payload_bytes": _payload_size(executed["outputs"]),
+                    "skipped": executed["skipped"]
+                }
+
+        timings["total"] = {"wall_time": round(time.perf_counter() - started, 4)}
+        logger.info(f"⏱️ {self.name} 파이프라인 완료: {timings}")
+        return context, timings
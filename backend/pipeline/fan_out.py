@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# GPU 서버 호출처럼 I/O 대기가 대부분인 작업을 동시에 실행하기 위한 공용 스레드 풀
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("FAN_OUT_WORKERS", 16)),
+    thread_name_prefix="fan-out"
+)
+
+# run_with_deadline 작업용 작업 이름(백엔드)별 스레드 풀
+# 제한 시간을 넘겨 버려진 호출은 계속 실행되므로, 느린 백엔드가 다른 백엔드나 공용 풀의 스레드를 차지하지 않도록 분리
+DEADLINE_POOL_WORKERS = int(os.environ.get("DEADLINE_POOL_WORKERS", 4))
+_deadline_pools = {}
+_deadline_pools_lock = threading.Lock()
+
+
+def run_concurrently(tasks: dict) -> dict:
+    """
+    서로 의존성이 없는 작업들을 동시에 실행하고 모두 끝날 때까지 기다림
+    :param tasks: {작업 이름: 인자 없는 함수} 형태의 딕셔너리
+    :return: {작업 이름: 함수 반환값} 형태의 딕셔너리
+             작업 중 하나라도 예외가 발생하면 모든 작업이 끝난 뒤 첫 번째 예외를 다시 발생시킴
+    """
+    started = time.perf_counter()
+    futures = {name: _executor.submit(func) for name, func in tasks.items()}
+
+    results = {}
+    first_error = None
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logger.error(f"병렬 작업 실패: {name} - {e}")
+            if first_error is None:
+                first_error = e
+
+    logger.info(f"⏱️ 병렬 작업 완료 ({', '.join(tasks)}): {time.perf_counter() - started:.2f}s")
+    if first_error is not None:
+        raise first_error
+    return results
+
+
+def submit_background(func):
+    """
+    작업 하나를 공용 스레드 풀에서 백그라운드로 시작
+    :param func: 인자 없는 함수
+    :return: concurrent.futures.Future
+    """
+    return _executor.submit(func)
+
+
+def _deadline_pool(name: str) -> tuple:
+    """작업 이름별 (스레드 풀, 실행 중인 작업 수 제한 세마포어)"""
+    with _deadline_pools_lock:
+        if name not in _deadline_pools:
+            _deadline_pools[name] = (
+                ThreadPoolExecutor(max_workers=DEADLINE_POOL_WORKERS, thread_name_prefix=f"deadline-{name}"),
+                threading.BoundedSemaphore(DEADLINE_POOL_WORKERS)
+            )
+        return _deadline_pools[name]
+
+
+def _submit_bounded(name: str, func):
+    """
+    작업 이름별 풀에 작업 제출 (이전 요청의 작업이 풀을 모두 차지하고 있으면 기다리지 않고 None 반환)
+    """
+    pool, slots = _deadline_pool(name)
+    if not slots.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            return func()
+        finally:
+            slots.release()
+
+    return pool.submit(run)
+
+
+def run_with_deadline(tasks: dict, timeout: float) -> tuple:
+    """
+    작업들을 동시에 실행하고 제한 시간까지 끝난 결과만 반환 (느린 작업은 기다리지 않음)
+    작업은 이름별로 분리된 크기 제한 풀에서 실행되며, 해당 풀이 이전 작업으로 가득 차 있으면 바로 실패 처리
+    :param tasks: {작업 이름: 인자 없는 함수} 형태의 딕셔너리
+    :param timeout: 제한 시간 (초)
+    :return: (완료된 결과 {작업 이름: 반환값}, 시간 초과된 작업 이름 리스트, 실패한 작업 {작업 이름: 오류 메시지})
+    """
+    started = time.perf_counter()
+    results = {}
+    timed_out = []
+    failed = {}
+    futures = {}
+    for name, func in tasks.items():
+        future = _submit_bounded(name, func)
+        if future is None:
+            logger.warning(f"⏱️ 동시 실행 한도({DEADLINE_POOL_WORKERS}) 초과로 작업 생략: {name}")
+            failed[name] = "동시 실행 한도 초과"
+        else:
+            futures[name] = future
+    wait(futures.values(), timeout=timeout)
+
+    for name, future in futures.items():
+        if not future.done():
+            # 실행 중인 스레드는 중단할 수 없으므로 결과만 버림
+            future.cancel()
+            timed_out.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logger.error(f"병렬 작업 실패: {name} - {e}")
+            failed[name] = str(e)
+
+    elapsed = time.perf_counter() - started
+    if timed_out:
+        logger.warning(f"⏱️ 제한 시간 {timeout:.2f}s 초과로 결과 제외: {', '.join(timed_out)}")
+    logger.info(f"⏱️ 병렬 작업 완료 ({', '.join(tasks)}): {elapsed:.2f}s")
+    return results, timed_out, failed
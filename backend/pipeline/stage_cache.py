@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+_digests = OrderedDict()  # {(경로, inode, 크기, 수정 시각, 변경 시각): SHA-256} 최근 계산한 파일 해시
+_digests_lock = threading.Lock()
+MAX_DIGESTS = 1024
+
+
+def file_fingerprint(path: str):
+    """
+    파일 내용의 SHA-256 (파일이 없으면 None)
+    업로드 파일처럼 이름이 '<sha256>.<확장자>'이면 이름의 해시를 그대로 사용하고,
+    그 외에는 내용을 읽어 계산하되 (inode, 크기, 수정 / 변경 시각)이 같은 동안은 계산 결과를 재사용
+    (변경 시각(ctime)은 cp -p / rsync로도 보존되지 않으므로 같은 크기 / 수정 시각으로 교체된 파일도 다시 계산)
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if re.fullmatch(r"[0-9a-f]{64}", stem):
+        return stem
+
+    key = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    with _digests_lock:
+        if key in _digests:
+            _digests.move_to_end(key)
+            return _digests[key]
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    digest = hasher.hexdigest()
+    with _digests_lock:
+        _digests[key] = digest
+        while len(_digests) > MAX_DIGESTS:
+            _digests.popitem(last=False)
+    return digest
+
+
+class StageCache:
+    """
+    단계 이름 + 입력 해시를 키로 단계 출력을 JSON 파일로 저장하는 캐시
+    '_path'로 끝나는 입력(video_path 등)은 파일 내용의 SHA-256까지 키에 포함하여
+    같은 경로의 파일이 교체되면 이전 출력을 사용하지 않음 (파일이 없으면 캐시하지 않음)
+    max_items개를 넘으면 가장 오래 사용하지 않은 항목부터, ttl초가 지난 항목은 조회 시 삭제
+    """
+
+    def __init__(self, cache_dir: str, max_items: int = 10000, ttl: float = 30 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # {파일 경로: 저장 시각} (사용 순서, 시작 시 기존 파일을 저장 시각 순으로 불러옴)
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        self._entries = OrderedDict((path, created_at) for created_at, path in sorted(entries))
+        self._evict()
+
+    def _path(self, stage_name: str, inputs: dict):
+        files = {}
+        for name, value in inputs.items():
+            if name.endswith("_path"):
+                fingerprint = file_fingerprint(value)
+                if fingerprint is None:
+                    return None
+                files[name] = fingerprint
+        key = hashlib.sha256(
+            json.dumps({"stage": stage_name, "inputs": inputs, "files": files},
+                       sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{stage_name}_{key}.json")
+
+    def _remove(self, path: str):
+        self._entries.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        while len(self._entries) > self.max_items:
+            path, _ = self._entries.popitem(last=False)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, stage_name: str, inputs: dict):
+        path = self._path(stage_name, inputs)
+        if path is None:
+            return None
+        with self._lock:
+            created_at = self._entries.get(path)
+            if created_at is None and os.path.exists(path):
+                # 다른 프로세스가 저장한 항목
+                created_at = self._entries[path] = os.path.getmtime(path)
+            if created_at is None:
+                return None
+            if time.time() - created_at >= self.ttl:
+                self._remove(path)
+                return None
+            self._entries.move_to_end(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"단계 캐시 읽기 실패 ({stage_name}): {e}")
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+    def set(self, stage_name: str, inputs: dict, outputs: dict):
+        path = self._path(stage_name, inputs)
+        if path is None:
+            return
+        # 동시에 같은 키를 쓰는 경우를 대비해 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(outputs, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._entries[path] = time.time()
+            self._entries.move_to_end(path)
+            self._evict()
@@ -0,0 +1,152 @@
+import logging
+
+from search.ranking import base_video_id
+
+logger = logging.getLogger(__name__)
+
+# 결과 묶음 단위
+GROUP_SEGMENT = "segment"
+GROUP_MOMENT = "moment"
+GROUP_VIDEO = "video"
+GROUP_BY = (GROUP_SEGMENT, GROUP_MOMENT, GROUP_VIDEO)
+
+# 점수 합치는 방식
+POOLING_MAX = "max"
+POOLING_SUM = "sum"
+POOLINGS = (POOLING_MAX, POOLING_SUM)
+
+MOMENT_GAP = 2.0  # 이 간격(초) 이하로 떨어진 같은 영상의 구간은 하나의 장면으로 합침
+
+_MOMENT_FIELDS = ("video_id", "video_path", "start", "end", "segment_ids", "segment_scores", "score",
+                  "distance", "sources", "metadata")
+
+
+def _seconds(value):
+    """타임스탬프(초 단위 숫자 또는 'HH:MM:SS.mmm' 문자열)를 초로 변환 (변환할 수 없으면 None)"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str) and ":" in value:
+            seconds = 0.0
+            for part in value.split(":"):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _pool(scores, pooling: str) -> float:
+    return sum(scores) if pooling == POOLING_SUM else max(scores)
+
+
+def _new_moment(video_id, result, start, end) -> dict:
+    metadata = result.get("metadata") or {}
+    return {
+        "video_id": video_id,
+        "video_path": metadata.get("video_path"),
+        "start": start,
+        "end": end,
+        "segment_ids": [result["video_id"]],
+        "segment_scores": [result["score"]],
+        "distance": result.get("distance"),
+        "sources": set(result.get("sources") or []),
+        "metadata": result.get("metadata")
+    }
+
+
+def _extend_moment(moment, result, end):
+    moment["end"] = max(moment["end"], end)
+    moment["segment_ids"].append(result["video_id"])
+    moment["segment_scores"].append(result["score"])
+    moment["sources"].update(result.get("sources") or [])
+    distance = result.get("distance")
+    if distance is not None and (moment["distance"] is None or distance < moment["distance"]):
+        moment["distance"] = distance
+        moment["metadata"] = result.get("metadata")
+
+
+def aggregate_moments(ranked: list, gap: float = MOMENT_GAP, pooling: str = POOLING_MAX) -> list:
+    """
+    rank_results 결과에서 같은 영상의 시간상 인접한(간격 gap초 이하) 구간을 하나의 장면으로 합침
+    구간 정보(start / end)가 없는 결과(메타데이터 검색 결과 등)는 start / end가 None인 장면 하나로 유지
+
+    :param ranked: rank_results 결과 ([{"video_id", "metadata", "distance", "score", "sources"}, ...])
+    :param pooling: 장면 점수 계산 방식 (max: 가장 높은 구간 점수, sum: 구간 점수 합)
+    :return: [{"video_id"(영상 ID), "video_path", "start", "end", "score", "segment_ids", "distance",
+               "sources", "metadata"}, ...] (score 내림차순)
+    """
+    by_video = {}
+    moments = []
+    for result in ranked:
+        metadata = result.get("metadata") or {}
+        start, end = _seconds(metadata.get("start")), _seconds(metadata.get("end"))
+        video_id = base_video_id(result["video_id"])
+        if start is None or end is None:
+            moment = _new_moment(video_id, result, None, None)
+            moment.update({key: value for key, value in result.items() if key not in _MOMENT_FIELDS})
+            moments.append(moment)
+        else:
+            by_video.setdefault(video_id, []).append((start, end, result))
+
+    # 영상별로 시작 시각 순으로 훑으면서 이전 장면과 겹치거나 가까운 구간을 합침
+    for video_id, segments in by_video.items():
+        segments.sort(key=lambda segment: (segment[0], segment[1]))
+        current = None
+        for start, end, result in segments:
+            if current is not None and start <= current["end"] + gap:
+                _extend_moment(current, result, end)
+            else:
+                current = _new_moment(video_id, result, start, end)
+                moments.append(current)
+
+    for moment in moments:
+        moment["score"] = _pool(moment.pop("segment_scores"), pooling)
+        moment["sources"] = sorted(moment["sources"])
+    moments.sort(key=lambda m: (-m["score"], m["distance"] if m["distance"] is not None else float("inf")))
+    return moments
+
+
+def aggregate_videos(ranked: list, gap: float = MOMENT_GAP, pooling: str = POOLING_MAX,
+                     moments_per_video: int = None) -> list:
+    """
+    rank_results 결과를 장면으로 합친 뒤 영상 단위로 묶음
+
+    :param pooling: 영상 점수 계산 방식 (max: 가장 높은 장면 점수, sum: 장면 점수 합)
+    :param moments_per_video: 영상마다 반환할 최대 장면 수 (None이면 전체)
+    :return: [{"video_id", "video_path", "score", "distance", "sources", "moments": [장면, ...]}, ...]
+             (score 내림차순, 장면도 score 내림차순)
+    """
+    videos = {}
+    for moment in aggregate_moments(ranked, gap=gap, pooling=pooling):
+        video = videos.get(moment["video_id"])
+        if video is None:
+            video = videos[moment["video_id"]] = {
+                "video_id": moment["video_id"],
+                "video_path": moment["video_path"],
+                "scores": [],
+                "distance": None,
+                "sources": set(),
+                "moments": []
+            }
+        video["video_path"] = video["video_path"] or moment["video_path"]
+        video["scores"].append(moment["score"])
+        video["sources"].update(moment["sources"])
+        if moment["distance"] is not None and (video["distance"] is None or moment["distance"] < video["distance"]):
+            video["distance"] = moment["distance"]
+        # 구간 정보가 없는 결과(메타데이터 검색 결과 등)는 장면 대신 영상 정보로 반영
+        if moment["start"] is not None:
+            video["moments"].append(moment)
+        else:
+            video.update({key: value for key, value in moment.items() if key not in _MOMENT_FIELDS})
+
+    results = []
+    for video in videos.values():
+        video["score"] = _pool(video.pop("scores"), pooling)
+        video["sources"] = sorted(video["sources"])
+        if moments_per_video is not None:
+            video["moments"] = video["moments"][:moments_per_video]
+        results.append(video)
+    results.sort(key=lambda v: (-v["score"], v["distance"] if v["distance"] is not None else float("inf")))
+    logger.info(f"검색 결과 묶음: 결과 {len(ranked)}개 -> 영상 {len(results)}개")
+    return results
@@ -0,0 +1,156 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# 검색 결과 출처
+SOURCE_VIDEO = "video"
+SOURCE_STT = "stt"
+SOURCE_META = "meta"
+
+RRF_K = 60                   # Reciprocal Rank Fusion 상수 (상위 순위 간 점수 차이를 완만하게 함)
+SAME_VIDEO_FACTOR = 0.5      # 다른 출처에서 같은 영상의 다른 구간이 검색된 경우의 가중 비율
+
+
+@lru_cache(maxsize=65536)
+def base_video_id(video_id) -> str:
+    """구간 ID에서 영상 ID 추출 (예: 'abc_12' / 'abc_1500-4000' -> 'abc', 구간 접미사가 없으면 그대로)"""
+    video_id = str(video_id)
+    head, sep, tail = video_id.rpartition("_")
+    if sep and tail.replace("-", "", 1).isdigit():
+        return head
+    return video_id
+
+
+def importance_weights(query_analysis: dict = None) -> dict:
+    """
+    LLM 쿼리 분석 결과의 중요도(1-5)를 출처별 가중치로 변환
+    분석 결과가 없거나 중요도가 없으면 모든 출처의 가중치는 1
+    """
+    query_analysis = query_analysis or {}
+
+    def weight(key):
+        try:
+            return max(float(query_analysis.get(key, 1)), 0.0)
+        except (TypeError, ValueError):
+            return 1.0
+
+    return {
+        SOURCE_VIDEO: weight("video_field_importance"),
+        SOURCE_STT: weight("stt_field_importance"),
+        SOURCE_META: weight("unique_field_importance")
+    }
+
+
+def build_hit_index(video_results, stt_results, meta_results) -> tuple:
+    """
+    모든 검색 결과를 한 번씩만 순회하여 색인 생성
+    :param video_results: ChromaDB query 결과 ({'ids': [[...]], 'distances': [[...]], 'metadatas': [[...]]})
+    :param stt_results: ChromaDB query 결과
+    :param meta_results: 메타데이터 검색 결과 ([{'id', 'title'}, ...])
+    :return: (구간 색인 {구간 ID: {"base_id", "metadata", "distance", "sources": {출처: 순위}}},
+              영상 색인 {영상 ID: {출처: 가장 높은 순위}},
+              메타데이터 색인 {영상 ID: 메타데이터 검색 결과})
+    """
+    segments = {}
+    videos = {}
+
+    for source, results in ((SOURCE_VIDEO, video_results), (SOURCE_STT, stt_results)):
+        if not results or not isinstance(results, dict) or not results.get("ids"):
+            continue
+        metadatas = results.get("metadatas") or []
+        distances = results.get("distances") or []
+
+        for i, id_list in enumerate(results["ids"]):
+            for rank, segment_id in enumerate(id_list):
+                metadata = metadatas[i][rank] if i < len(metadatas) and metadatas[i] else None
+                distance = distances[i][rank] if i < len(distances) and distances[i] else None
+
+                entry = segments.get(segment_id)
+                if entry is None:
+                    entry = segments[segment_id] = {
+                        "base_id": base_video_id(segment_id),
+                        "metadata": metadata,
+                        "distance": distance,
+                        "sources": {}
+                    }
+                elif entry["metadata"] is None:
+                    entry["metadata"] = metadata
+                if distance is not None and (entry["distance"] is None or distance < entry["distance"]):
+                    entry["distance"] = distance
+                # 여러 쿼리 리스트에 같은 구간이 있으면 가장 높은 순위 사용
+                if rank < entry["sources"].get(source, rank + 1):
+                    entry["sources"][source] = rank
+
+                video_ranks = videos.setdefault(entry["base_id"], {})
+                if rank < video_ranks.get(source, rank + 1):
+                    video_ranks[source] = rank
+
+    meta_hits = {}
+    for rank, result in enumerate(meta_results or []):
+        if not isinstance(result, dict) or "id" not in result or result["id"] in meta_hits:
+            continue
+        meta_hits[result["id"]] = result
+        video_ranks = videos.setdefault(result["id"], {})
+        video_ranks.setdefault(SOURCE_META, rank)
+
+    return segments, videos, meta_hits
+
+
+def rank_results(video_results, stt_results, meta_results, weights: dict = None,
+                 k: int = RRF_K, limit: int = None) -> list:
+    """
+    비디오 / STT / 메타데이터 검색 결과를 가중 Reciprocal Rank Fusion으로 합쳐 하나의 순위로 정렬
+      - 구간이 직접 검색된 출처: weight / (k + 순위 + 1)
+      - 같은 영상의 다른 구간만 검색된 출처: 위 점수 × SAME_VIDEO_FACTOR
+      - 메타데이터 검색은 영상 단위이므로 같은 영상의 모든 구간에 weight / (k + 순위 + 1)
+    구간 결과가 없는 영상의 메타데이터 결과도 같은 점수 기준으로 함께 정렬 (metadata는 None)
+
+    :param weights: {출처: 가중치}, 기본값은 importance_weights()
+    :param limit: 반환할 최대 결과 수 (None이면 전체)
+    :return: [{"video_id", "metadata", "distance", "score", "sources"}, ...] (score 내림차순)
+    """
+    weights = weights or importance_weights()
+    segments, videos, meta_hits = build_hit_index(video_results, stt_results, meta_results)
+
+    ranked = []
+    for segment_id, entry in segments.items():
+        # 구간이 직접 검색된 출처는 구간 자신의 순위, 나머지 출처는 같은 영상의 가장 높은 순위 사용
+        score = sum(weights.get(source, 1.0) / (k + rank + 1) for source, rank in entry["sources"].items())
+        for source, rank in videos[entry["base_id"]].items():
+            if source in entry["sources"]:
+                continue
+            contribution = weights.get(source, 1.0) / (k + rank + 1)
+            if source != SOURCE_META:
+                contribution *= SAME_VIDEO_FACTOR
+            score += contribution
+        ranked.append({
+            "video_id": segment_id,
+            "metadata": entry["metadata"],
+            "distance": entry["distance"],
+            "score": score,
+            "sources": sorted(entry["sources"])
+        })
+
+    # 구간 결과가 없는 영상의 메타데이터 검색 결과
+    matched_videos = {entry["base_id"] for entry in segments.values()}
+    for video_id, result in meta_hits.items():
+        if video_id in matched_videos:
+            continue
+        ranked.append({
+            **result,
+            "video_id": video_id,
+            "metadata": None,
+            "distance": None,
+            "score": weights.get(SOURCE_META, 1.0) / (k + videos[video_id][SOURCE_META] + 1),
+            "sources": [SOURCE_META]
+        })
+
+    # 점수가 같으면 구간 결과를 메타데이터 결과보다, 거리가 가까운 결과를 먼저 배치
+    ranked.sort(key=lambda r: (
+        -r["score"],
+        r["metadata"] is None,
+        r["distance"] if r["distance"] is not None else float("inf")
+    ))
+    logger.info(f"검색 결과 순위 결정: 구간 {len(segments)}개, 영상 {len(videos)}개, 메타데이터 {len(meta_hits)}개")
+    return ranked[:limit] if limit is not None else ranked
@@ -0,0 +1,89 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def text_hash(text: str, source_lang: str = "EN", target_lang: str = "KO") -> str:
+    """번역 캐시 키 생성 (언어쌍 + 원문 텍스트의 SHA-256)"""
+    return hashlib.sha256(f"{source_lang}:{target_lang}:{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """메모리 LRU + SQLite 영구 저장소로 구성된 2단계 번역 캐시"""
+
+    def __init__(self, db_path: str, max_memory_items: int = 10000):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS translations (
+            key TEXT PRIMARY KEY,       -- text_hash() 결과
+            translated TEXT NOT NULL,   -- 번역된 텍스트
+            created_at REAL NOT NULL
+        )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: list) -> dict:
+        """
+        캐시에서 여러 키를 한 번에 조회
+        :param keys: 조회할 키 리스트
+        :return: {키: 번역문} (캐시에 있는 키만 포함)
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+
+        if missing:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, translated FROM translations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, translated in rows:
+                    found[key] = translated
+            conn.close()
+
+            with self._lock:
+                for key in missing:
+                    if key in found:
+                        self._remember(key, found[key])
+        return found
+
+    def set_many(self, items: dict):
+        """{키: 번역문}을 메모리와 SQLite에 저장"""
+        if not items:
+            return
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.executemany(
+            "INSERT OR REPLACE INTO translations (key, translated, created_at) VALUES (?, ?, ?)",
+            [(key, value, now) for key, value in items.items()]
+        )
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
@@ -0,0 +1,136 @@
+import logging
+import os
+
+from clients.service_client import ServiceClient
+from translation.translation_cache import TranslationCache, text_hash
+
+logger = logging.getLogger(__name__)
+
+
+class DeepLBackend:
+    """DeepL API 번역 백엔드 (요청 한 번에 여러 텍스트 번역)"""
+
+    max_batch_size = 50  # DeepL 요청당 최대 text 개수
+
+    def __init__(self, api_key: str, api_url: str = "https://api-free.deepl.com/v2/translate"):
+        self.api_key = api_key
+        self.client = ServiceClient("deepl", api_url, read_timeout=60.0)
+
+    def translate_batch(self, texts: list, source_lang: str, target_lang: str) -> list:
+        data = [("text", text) for text in texts]
+        data += [("source_lang", source_lang), ("target_lang", target_lang)]
+        response = self.client.post(
+            "",
+            headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
+            data=data,
+            idempotent=True
+        )
+        response.raise_for_status()
+        return [item["text"] for item in response.json()["translations"]]
+
+
+class LLMBackend:
+    """LLM 서버(ml/text_to_video/llm_server.py)의 /translate 번역 백엔드"""
+
+    max_batch_size = 16
+
+    def __init__(self, client: ServiceClient):
+        self.client = client
+
+    def translate_batch(self, texts: list, source_lang: str, target_lang: str) -> list:
+        response = self.client.post(
+            "/translate",
+            json={"english_texts": texts},
+            idempotent=True
+        )
+        response.raise_for_status()
+        return response.json()["translations"]
+
+
+class StubBackend:
+    """네트워크 없이 동작하는 오프라인 테스트용 백엔드"""
+
+    max_batch_size = 1000
+
+    def translate_batch(self, texts: list, source_lang: str, target_lang: str) -> list:
+        return [f"[{target_lang}] {text}" for text in texts]
+
+
+class Translator:
+    """영상 단위로 텍스트를 모아 배치 번역하고 결과를 캐시하는 번역기"""
+
+    def __init__(self, backend, cache: TranslationCache = None, source_lang: str = "EN", target_lang: str = "KO"):
+        self.backend = backend
+        self.cache = cache
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+
+    def translate_many(self, texts: list) -> list:
+        """
+        여러 텍스트를 한 번에 번역
+        :param texts: 번역할 영어 텍스트 리스트
+        :return: 입력 순서와 같은 번역 결과 리스트 (번역 실패 시 원문 유지, 실패한 텍스트는 캐시하지 않음)
+        """
+        keys = [text_hash(text, self.source_lang, self.target_lang) for text in texts]
+        translated = self.cache.get_many(list(set(keys))) if self.cache else {}
+
+        # 캐시에 없는 텍스트만 중복 없이 모아서 번역
+        pending = {}
+        for key, text in zip(keys, texts):
+            if text and key not in translated:
+                pending.setdefault(key, text)
+
+        pending_keys = list(pending)
+        batch_size = self.backend.max_batch_size
+        failed = 0
+        for i in range(0, len(pending_keys), batch_size):
+            batch_keys = pending_keys[i:i + batch_size]
+            try:
+                results = self.backend.translate_batch(
+                    [pending[key] for key in batch_keys], self.source_lang, self.target_lang
+                )
+                if len(results) != len(batch_keys):
+                    raise ValueError(f"요청 {len(batch_keys)}개에 번역 결과 {len(results)}개")
+            except Exception as e:
+                logger.error(f"❌ 배치 번역 실패 ({len(batch_keys)}개, 원문 유지): {str(e)}")
+                failed += len(batch_keys)
+                continue
+
+            # 빈 번역은 실패로 보고 캐시하지 않음 (원문 유지, 다음 요청에서 다시 번역)
+            new_items = {key: result for key, result in zip(batch_keys, results) if isinstance(result, str) and result.strip()}
+            failed += len(batch_keys) - len(new_items)
+            translated.update(new_items)
+            if self.cache and new_items:
+                self.cache.set_many(new_items)
+
+        if failed:
+            logger.warning(f"⚠️ 번역 실패 {failed}개는 원문(영어)을 그대로 사용")
+        logger.info(f"🌐 번역 완료: 전체 {len(texts)}개, 새로 번역 {len(pending_keys) - failed}개")
+        return [translated.get(key, text) if text else "" for key, text in zip(keys, texts)]
+
+    def translate(self, text: str) -> str:
+        return self.translate_many([text])[0]
+
+
+def create_translator(llm_client: ServiceClient = None) -> Translator:
+    """
+    환경 변수 설정에 따라 번역기 생성
+      - TRANSLATION_BACKEND: deepl(기본값) / llm / stub
+      - TRANSLATION_CACHE_PATH: 번역 캐시 SQLite 경로
+    """
+    backend_name = os.environ.get("TRANSLATION_BACKEND", "deepl")
+    if backend_name == "llm":
+        backend = LLMBackend(llm_client)
+    elif backend_name == "stub":
+        backend = StubBackend()
+    else:
+        backend = DeepLBackend(
+            api_key=os.environ.get("DEEPL_API_KEY", "e002ea00-6062-41c7-8382-2e2bb6039b24:fx"),
+            api_url=os.environ.get("DEEPL_API_URL", "https://api-free.deepl.com/v2/translate")
+        )
+
+    cache_path = os.environ.get(
+        "TRANSLATION_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "translations.db")
+    )
+    return Translator(backend, TranslationCache(cache_path))
@@ -1,133 +1,336 @@
 from flask import Flask, request, jsonify
-from sentence_transformers import SentenceTransformer
-from chromadb import HttpClient
-import pandas as pd
-from tqdm import tqdm
+from encoder import create_encoder, ENCODER_BACKEND
+from vector_store import create_vector_store
+from embedding_ingest import ingest_captions, iter_caption_rows, iter_json_records, refresh_video_summary, EMBED_BATCH_SIZE
+from embedding_cache import EmbeddingCache
+from lexical_index import BM25Index
+from reranker import Reranker, rerank_results, RERANK_BUDGET, RERANK_TOP_N
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+import atexit
 import os
 
 # Flask 애플리케이션 생성
 app = Flask(__name__)
 
-# ChromaDB 및 모델 초기화
-client = HttpClient(host='localhost', port=8000)
+# 벡터 저장소 및 모델 초기화 (VECTOR_STORE=chroma: ChromaDB 서버, local: 인프로세스 저장소)
+client = create_vector_store()
 
 movie_clips = client.get_or_create_collection(name="movie_clips")
 audio_clips = client.get_or_create_collection(name="audio_clips")
 
-model = SentenceTransformer("sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+# /query_multi에서 검색할 수 있는 컬렉션
+COLLECTIONS = {
+    "movie_clips": movie_clips,
+    "audio_clips": audio_clips
+}
 
-# 비디오 캡션 임베딩 함수
-def json_to_vectorDB(model, json_path, collections): 
-    df = pd.read_json(json_path)
-    ids = []
-    metadatas = []
-    embeddings = []
-
-    for row in tqdm(df.iterrows()):
-        video_path = row[1].video_path
-        
-        timestamp = row[1].segments['timestamps']
-        video_id = row[1].segments['video_id']
-        caption = row[1].segments['video_caption_eng']
-
-        metadata = {
-            "captions": caption,
-            "video_path": video_path,
-            "start": timestamp['start'],
-            "end" : timestamp['end']    
-        }
+# 컬렉션별 영상 요약 컬렉션 (영상의 구간 임베딩 평균, ID는 영상 키). 영상 -> 구간 2단계 검색에 사용
+SUMMARY_COLLECTIONS = {name: client.get_or_create_collection(name=f"{name}_videos") for name in COLLECTIONS}
 
-        embedding = model.encode(caption, normalize_embeddings=True)
+# 검색 결과 재순위화 (cross-encoder, 요청에 "rerank": true를 지정한 경우만 사용)
+reranker = Reranker()
 
-        ids.append(video_id)
-        metadatas.append(metadata)
-        embeddings.append(embedding)
+# 컬렉션별 캡션 BM25 색인 (저장 시 벡터 컬렉션과 함께 갱신)
+LEXICAL_INDEX_DIR = os.environ.get("LEXICAL_INDEX_DIR", "lexical_index")
+os.makedirs(LEXICAL_INDEX_DIR, exist_ok=True)
+LEXICAL_INDEXES = {name: BM25Index(os.path.join(LEXICAL_INDEX_DIR, f"{name}.db")) for name in COLLECTIONS}
 
-    chunk_size = 1024  # 한 번에 처리할 chunk 크기 설정
-    total_chunks = len(embeddings) // chunk_size + 1  # 전체 데이터를 chunk 단위로 나눈 횟수
-    embeddings = [e.tolist() for e in tqdm(embeddings)]  
+# 여러 컬렉션을 동시에 검색하기 위한 스레드 풀
+query_executor = ThreadPoolExecutor(max_workers=len(COLLECTIONS), thread_name_prefix="chroma-query")
 
-    for chunk_idx in tqdm(range(total_chunks)):
-        start_idx = chunk_idx * chunk_size
-        end_idx = (chunk_idx + 1) * chunk_size
+# 인코더 (ENCODER_BACKEND=torch: PyTorch fp32, onnx / onnx-int8: ONNX Runtime, ENCODER_THREADS로 스레드 수 지정)
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+model = create_encoder(MODEL_NAME)
 
-        # chunk 단위로 데이터 자르기
-        chunk_embeddings = embeddings[start_idx:end_idx]
-        chunk_ids = ids[start_idx:end_idx]
-        chunk_metadatas = metadatas[start_idx:end_idx]
+# 검색 쿼리 임베딩 캐시 (EMBED_CACHE_PATH를 지정하면 시작 시 불러오고 종료 시 저장)
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH")
+embedding_cache = EmbeddingCache(f"{MODEL_NAME}:{ENCODER_BACKEND}", max_items=int(os.environ.get("EMBED_CACHE_ITEMS", 10000)))
+if EMBED_CACHE_PATH:
+    embedding_cache.load(EMBED_CACHE_PATH)
+    atexit.register(embedding_cache.save, EMBED_CACHE_PATH)
 
-        # chunk를 answers에 추가
-        collections.add(embeddings=chunk_embeddings, ids=chunk_ids, metadatas=chunk_metadatas)
+# 비디오 캡션 임베딩 함수
+def json_to_vectorDB(model, json_path, collections, batch_size=EMBED_BATCH_SIZE, replace=False):
+    with open(json_path, 'rb') as f:
+        rows = iter_caption_rows(iter_json_records(f), 'video_caption_eng')
+        return ingest_captions(model, rows, collections, batch_size=batch_size, replace=replace,
+                               lexical_index=LEXICAL_INDEXES["movie_clips"], summary_collection=SUMMARY_COLLECTIONS["movie_clips"])
 
 
 # 오디오 캡션 임베딩 함수
-def json_to_vectorDB_audio(model, json_path, collections): 
-    df = pd.read_json(json_path)
-    ids = []
-    metadatas = []
-    embeddings = []
-
-    for row in tqdm(df.iterrows()):
-        video_path = row[1].video_path
-
-        timestamp = row[1].segments['timestamps']
-        video_id = row[1].segments['video_id']
-        caption = row[1].segments['stt_caption_eng']
-
-        metadata = {
-            "captions": caption,
-            "video_path": video_path,
-            "start": timestamp['start'],
-            "end" : timestamp['end']    
-        }
+def json_to_vectorDB_audio(model, json_path, collections, batch_size=EMBED_BATCH_SIZE, replace=False):
+    with open(json_path, 'rb') as f:
+        rows = iter_caption_rows(iter_json_records(f), 'stt_caption_eng')
+        return ingest_captions(model, rows, collections, batch_size=batch_size, replace=replace,
+                               lexical_index=LEXICAL_INDEXES["audio_clips"], summary_collection=SUMMARY_COLLECTIONS["audio_clips"])
+
+
+DEFAULT_INCLUDE = ["metadatas", "distances"]
+ALLOWED_INCLUDE = {"metadatas", "distances", "documents", "embeddings"}
+MAX_TOP_K = 200
+MAX_COARSE_VIDEOS = 1000
+
+# 검색 방식: dense(임베딩), lexical(BM25), hybrid(두 순위를 RRF로 결합)
+SEARCH_MODES = ("dense", "lexical", "hybrid")
+HYBRID_RRF_K = 60
+PHRASE_BOOST = 2.0  # 질의 전체가 연속으로 나타나는 구간의 BM25 순위 가중치
+
+
+def build_where(filters):
+    """
+    검색 필터를 ChromaDB where 조건으로 변환
+    :param filters: {"video_path", "video_key", "start", "end"} 중 일부
+                    start / end를 지정하면 [start, end] 구간과 겹치는 구간만 검색 (초 단위)
+    :return: where 조건 (조건이 없으면 None)
+    """
+    conditions = []
+    for key in ("video_path", "video_key"):
+        value = filters.get(key)
+        if isinstance(value, list):
+            conditions.append({key: {"$in": value}})
+        elif value is not None:
+            conditions.append({key: value})
+    if filters.get('start') is not None:
+        conditions.append({"end": {"$gte": float(filters['start'])}})
+    if filters.get('end') is not None:
+        conditions.append({"start": {"$lte": float(filters['end'])}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def parse_filters(data):
+    """필터는 "filters" 객체 또는 최상위 필드로 받음"""
+    return data.get('filters') or {key: data.get(key) for key in ("video_path", "video_key", "start", "end")}
+
+
+def parse_search_mode(data, default="dense"):
+    """검색 방식 파싱 (잘못된 값은 ValueError)"""
+    mode = data.get('mode', default)
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {list(SEARCH_MODES)}")
+    return mode
+
+
+def parse_coarse_videos(data):
+    """
+    영상 -> 구간 2단계 검색에서 먼저 고를 영상 수 파싱 (0이면 사용하지 않음, 잘못된 값은 ValueError)
+    """
+    coarse_videos = int(data.get('coarse_videos') or 0)
+    if not 0 <= coarse_videos <= MAX_COARSE_VIDEOS:
+        raise ValueError(f"coarse_videos must be between 0 and {MAX_COARSE_VIDEOS}")
+    return coarse_videos
+
+
+def parse_flag(value, default: bool = False) -> bool:
+    """요청의 참/거짓 값 파싱 (JSON boolean은 그대로, 문자열은 "1" / "true" / "yes"만 참)"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
 
-        embedding = model.encode(caption, normalize_embeddings=True)
+def parse_rerank_options(data, include):
+    """
+    재순위화 옵션 파싱 (잘못된 값은 ValueError)
+    :return: (재순위화 여부, 질의당 후보 수, 제한 시간(초))
+    """
+    enabled = parse_flag(data.get('rerank'))
+    if enabled and "metadatas" not in include:
+        raise ValueError("rerank requires metadatas in include")
+    top_n = int(data.get('rerank_top_n', RERANK_TOP_N))
+    budget = float(data.get('rerank_budget', RERANK_BUDGET))
+    if top_n < 1 or budget <= 0:
+        raise ValueError("rerank_top_n and rerank_budget must be positive")
+    return enabled, top_n, budget
+
+
+def parse_query_options(data):
+    """
+    검색 요청의 top_k / include / 필터 옵션 파싱 (잘못된 값은 ValueError)
+    :return: (top_k, where, include)
+    """
+    top_k = int(data.get('top_k', data.get('n_results', 10)))
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise ValueError(f"top_k must be between 1 and {MAX_TOP_K}")
 
-        ids.append(video_id)
-        metadatas.append(metadata)
-        embeddings.append(embedding)
+    include = data.get('include', DEFAULT_INCLUDE)
+    if not isinstance(include, list) or not set(include) <= ALLOWED_INCLUDE:
+        raise ValueError(f"include must be a subset of {sorted(ALLOWED_INCLUDE)}")
 
-    chunk_size = 1024  # 한 번에 처리할 chunk 크기 설정
-    total_chunks = len(embeddings) // chunk_size + 1  # 전체 데이터를 chunk 단위로 나눈 횟수
-    embeddings = [e.tolist() for e in tqdm(embeddings)]  
+    # ChromaDB where 조건을 직접 넘길 수도 있음
+    where = build_where(parse_filters(data))
+    if data.get('where'):
+        where = {"$and": [where, data['where']]} if where else data['where']
+    return top_k, where, include
 
-    for chunk_idx in tqdm(range(total_chunks)):
-        start_idx = chunk_idx * chunk_size
-        end_idx = (chunk_idx + 1) * chunk_size
 
-        # chunk 단위로 데이터 자르기
-        chunk_embeddings = embeddings[start_idx:end_idx]
-        chunk_ids = ids[start_idx:end_idx]
-        chunk_metadatas = metadatas[start_idx:end_idx]
+def fuse_hybrid(collection, dense, lexical_hits, n_results, where=None, include=DEFAULT_INCLUDE):
+    """
+    임베딩 검색 결과와 BM25 검색 결과를 RRF로 결합 (질의 하나 기준)
+    BM25에서만 나온 구간은 컬렉션에서 where 조건을 확인하며 함께 조회하고 거리는 None
+    :param dense: {"ids", "distances", "metadatas", ...} 질의 하나의 결과 (lexical 모드는 None)
+    :param lexical_hits: BM25Index.search 결과
+    :return: 질의 하나의 결과 (ChromaDB query 결과 형식 + "scores")
+    """
+    dense = dense or {"ids": []}
+    scores = defaultdict(float)
+    for rank, id in enumerate(dense["ids"]):
+        scores[id] += 1.0 / (HYBRID_RRF_K + rank + 1)
+    for rank, (id, _, phrase) in enumerate(lexical_hits):
+        scores[id] += (PHRASE_BOOST if phrase else 1.0) / (HYBRID_RRF_K + rank + 1)
+
+    fields = [key for key in include if key != "distances"]
+    rows = {id: {key: dense[key][i] for key in fields} for i, id in enumerate(dense["ids"])}
+    missing = [id for id, _, _ in lexical_hits if id not in rows]
+    if missing:
+        fetched = collection.get(ids=missing, where=where, include=fields)
+        for i, id in enumerate(fetched["ids"]):
+            rows[id] = {key: fetched[key][i] if fetched.get(key) is not None else None for key in fields}
+
+    distances = dict(zip(dense["ids"], dense.get("distances") or []))
+    top = sorted((id for id in scores if id in rows), key=lambda id: -scores[id])[:n_results]
+    result = {"ids": top, "scores": [scores[id] for id in top]}
+    for key in fields:
+        result[key] = [rows[id][key] for id in top]
+    if "distances" in include:
+        result["distances"] = [distances.get(id) for id in top]
+    return result
 
-        # chunk를 answers에 추가
-        collections.add(embeddings=chunk_embeddings, ids=chunk_ids, metadatas=chunk_metadatas)
 
+def coarse_video_keys(name, embedding, num_videos, filters=None):
+    """영상 요약 컬렉션에서 질의 임베딩과 가까운 영상 키 검색 (video_path / video_key 필터만 적용)"""
+    filters = filters or {}
+    where = build_where({key: filters.get(key) for key in ("video_path", "video_key")})
+    found = SUMMARY_COLLECTIONS[name].query(query_embeddings=[embedding], n_results=num_videos, where=where,
+                                           include=["distances"])
+    return found["ids"][0] if found["ids"] else []
 
-def text_to_timestamps(model, input, collections):
-    input_embedding = model.encode(input, normalize_embeddings=True).tolist()
-    result = collections.query(input_embedding, n_results=10)
+
+def search_collection(name, texts, embeddings, n_results=10, where=None, include=DEFAULT_INCLUDE,
+                      mode="dense", filters=None, coarse_videos=0):
+    """
+    컬렉션 하나를 검색 방식에 따라 검색
+    coarse_videos > 0이면 영상 요약 컬렉션에서 가까운 영상을 먼저 고른 뒤 그 영상의 구간만 검색 (lexical 모드 제외)
+    :param embeddings: texts의 임베딩 (lexical 모드는 None)
+    :return: ChromaDB query 결과 형식 (lexical / hybrid는 "scores" 포함)
+    """
+    if coarse_videos and mode != "lexical":
+        # 질의마다 후보 영상이 다르므로 질의별로 검색
+        keys = ["ids", "scores", *include]
+        merged = {key: [] for key in keys}
+        for text, embedding in zip(texts, embeddings):
+            video_keys = coarse_video_keys(name, embedding, coarse_videos, filters)
+            if video_keys:
+                scoped = {"video_key": {"$in": video_keys}}
+                single = search_collection(name, [text], [embedding], n_results=n_results,
+                                           where={"$and": [where, scoped]} if where else scoped, include=include,
+                                           mode=mode, filters={**(filters or {}), "video_key": video_keys})
+            else:
+                single = {}
+            for key in keys:
+                merged[key].append(single[key][0] if single.get(key) is not None else [])
+        if mode == "dense":
+            del merged["scores"]
+        return merged
+
+    collection = COLLECTIONS[name]
+    dense = None
+    if mode != "lexical":
+        dense = collection.query(query_embeddings=embeddings, n_results=n_results, where=where, include=include)
+        if mode == "dense":
+            return dense
+
+    # BM25는 후보를 넉넉히 가져오고 임베딩 검색 범위는 그대로 유지
+    lexical_index = LEXICAL_INDEXES[name]
+    keys = ["ids", "scores", *include]
+    result = {key: [] for key in keys}
+    for i, text in enumerate(texts):
+        single = {key: dense[key][i] for key in ("ids", *include) if dense.get(key) is not None} if dense else None
+        hits = lexical_index.search(text, top_k=n_results, filters=filters)
+        fused = fuse_hybrid(collection, single, hits, n_results, where=where, include=include)
+        for key in keys:
+            result[key].append(fused[key])
     return result
 
 
-@app.route('/add_json', methods=['POST'])
-def add_json_to_db():
+def text_to_timestamps(model, input, name, n_results=10, where=None, include=DEFAULT_INCLUDE,
+                       mode="dense", filters=None, coarse_videos=0):
+    embeddings = None if mode == "lexical" else embedding_cache.encode(model, [input])
+    return search_collection(name, [input], embeddings, n_results=n_results, where=where, include=include,
+                             mode=mode, filters=filters, coarse_videos=coarse_videos)
+
+
+def texts_to_timestamps_multi(model, queries, n_results=10, where=None, include=DEFAULT_INCLUDE,
+                              modes=None, filters=None, coarse_videos=0):
     """
-    JSON 데이터를 받아서 VectorDB에 저장
+    여러 컬렉션에 대한 검색을 한 번의 배치 인코딩으로 처리 (캐시에 있는 텍스트는 인코딩 생략)
+    :param queries: {컬렉션 이름: 검색 텍스트 리스트}
+    :param modes: {컬렉션 이름: 검색 방식} (없으면 dense)
+    :return: {컬렉션 이름: ChromaDB query 결과}
     """
-    try:
-        json_file = request.files['file']
+    modes = modes or {}
+    # 중복 텍스트는 한 번만 인코딩 (lexical 모드 컬렉션의 텍스트는 인코딩하지 않음)
+    unique_texts = list(dict.fromkeys(
+        text for name, texts in queries.items() if modes.get(name, "dense") != "lexical" for text in texts
+    ))
+    embeddings = embedding_cache.encode(model, unique_texts) if unique_texts else []
+    embedding_by_text = dict(zip(unique_texts, embeddings))
+
+    futures = {
+        name: query_executor.submit(
+            search_collection,
+            name,
+            texts,
+            [embedding_by_text[text] for text in texts] if modes.get(name, "dense") != "lexical" else None,
+            n_results=n_results,
+            where=where,
+            include=include,
+            mode=modes.get(name, "dense"),
+            filters=filters,
+            coarse_videos=coarse_videos
+        )
+        for name, texts in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def ingest_request(name, caption_field):
+    """
+    요청 본문을 스트리밍으로 읽어 VectorDB에 upsert (임시 파일 / 전체 로드 없음)
+    multipart 업로드('file' 필드) 또는 JSON 배열 / NDJSON 본문을 그대로 받음
+    replace=true이면 본문에 포함된 영상의 구간 중 본문에 없는 구간을 삭제
+    """
+    if request.mimetype == 'multipart/form-data':
+        json_file = request.files.get('file')
         if not json_file:
             return jsonify({"error": "No file provided"}), 400
+        stream = json_file.stream
+        options = request.form
+    else:
+        stream = request.stream
+        options = request.args
+    batch_size = int(options.get('batch_size', EMBED_BATCH_SIZE))
+    replace = str(options.get('replace', 'false')).lower() == 'true'
 
-        file_path = os.path.join("temp.json")
-        json_file.save(file_path)
+    rows = iter_caption_rows(iter_json_records(stream), caption_field)
+    stats = ingest_captions(model, rows, COLLECTIONS[name], batch_size=batch_size, replace=replace,
+                            lexical_index=LEXICAL_INDEXES[name], summary_collection=SUMMARY_COLLECTIONS[name])
+    return jsonify({"message": "Data added to VectorDB successfully", "stats": stats})
 
-        # JSON 파일 처리
-        json_to_vectorDB(model, file_path, movie_clips)
-        os.remove(file_path)  # 임시 파일 삭제
 
-        return jsonify({"message": "Data added to VectorDB successfully"})
+@app.route('/add_json', methods=['POST'])
+def add_json_to_db():
+    """
+    JSON 데이터를 받아서 VectorDB에 저장
+    """
+    try:
+        return ingest_request('movie_clips', 'video_caption_eng')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -138,18 +341,9 @@ def add_json_to_db_audio():
     JSON 데이터를 받아서 VectorDB에 저장
     """
     try:
-        json_file = request.files['file']
-        if not json_file:
-            return jsonify({"error": "No file provided"}), 400
-
-        file_path = os.path.join("temp.json")
-        json_file.save(file_path)
-
-        # JSON 파일 처리
-        json_to_vectorDB_audio(model, file_path, audio_clips)
-        os.remove(file_path)  # 임시 파일 삭제
-
-        return jsonify({"message": "Data added to VectorDB successfully"})
+        return ingest_request('audio_clips', 'stt_caption_eng')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -157,6 +351,11 @@ def add_json_to_db_audio():
 def query_timestamps():
     """
     텍스트 입력을 받아 타임스탬프를 반환
+    선택: "top_k" (기본 10), "include" (기본 ["metadatas", "distances"]),
+          "video_path" / "video_key" / "start" / "end" 필터 (또는 "filters" 객체), ChromaDB "where" 조건,
+          "mode" ("dense" 기본 / "lexical" / "hybrid"),
+          "rerank" (기본 false) / "rerank_top_n" / "rerank_budget": 상위 후보를 cross-encoder로 재순위화,
+          "coarse_videos" (기본 0): 영상 요약 컬렉션에서 가까운 영상을 이 수만큼 먼저 고른 뒤 그 영상의 구간만 검색
     """
     try:
         data = request.json
@@ -164,10 +363,19 @@ def query_timestamps():
         if not input_text:
             return jsonify({"error": "Input text is required"}), 400
 
-        # 텍스트를 이용하여 타임스탬프 쿼리
-        result = text_to_timestamps(model, input_text, movie_clips)
+        # 텍스트를 이용하여 타임스탬프 쿼리 (필터 / top_k / include는 벡터 저장소 검색에 그대로 전달)
+        top_k, where, include = parse_query_options(data)
+        mode = parse_search_mode(data, default="dense")
+        rerank, rerank_top_n, rerank_budget = parse_rerank_options(data, include)
+        result = text_to_timestamps(model, input_text, "movie_clips", n_results=top_k, where=where, include=include,
+                                    mode=mode, filters=parse_filters(data), coarse_videos=parse_coarse_videos(data))
+        if rerank:
+            result["reranked"] = rerank_results(reranker, {"movie_clips": [input_text]}, {"movie_clips": result},
+                                                top_n=rerank_top_n, budget=rerank_budget)
 
         return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -175,6 +383,11 @@ def query_timestamps():
 def query_timestamps_audio():
     """
     텍스트 입력을 받아 타임스탬프를 반환
+    선택: "top_k" (기본 10), "include" (기본 ["metadatas", "distances"]),
+          "video_path" / "video_key" / "start" / "end" 필터 (또는 "filters" 객체), ChromaDB "where" 조건,
+          "mode" ("hybrid" 기본 / "dense" / "lexical"; 대사를 그대로 입력한 검색은 BM25가 정확도를 보완),
+          "rerank" (기본 false) / "rerank_top_n" / "rerank_budget": 상위 후보를 cross-encoder로 재순위화,
+          "coarse_videos" (기본 0): 영상 요약 컬렉션에서 가까운 영상을 이 수만큼 먼저 고른 뒤 그 영상의 구간만 검색
     """
     try:
         data = request.json
@@ -182,10 +395,168 @@ def query_timestamps_audio():
         if not input_text:
             return jsonify({"error": "Input text is required"}), 400
 
-        # 텍스트를 이용하여 타임스탬프 쿼리
-        result = text_to_timestamps(model, input_text, audio_clips)
+        # 텍스트를 이용하여 타임스탬프 쿼리 (필터 / top_k / include는 벡터 저장소 검색에 그대로 전달)
+        top_k, where, include = parse_query_options(data)
+        mode = parse_search_mode(data, default="hybrid")
+        rerank, rerank_top_n, rerank_budget = parse_rerank_options(data, include)
+        result = text_to_timestamps(model, input_text, "audio_clips", n_results=top_k, where=where, include=include,
+                                    mode=mode, filters=parse_filters(data), coarse_videos=parse_coarse_videos(data))
+        if rerank:
+            result["reranked"] = rerank_results(reranker, {"audio_clips": [input_text]}, {"audio_clips": result},
+                                                top_n=rerank_top_n, budget=rerank_budget)
 
         return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/query_multi', methods=['POST'])
+def query_timestamps_multi():
+    """
+    텍스트를 한 번만 인코딩하여 여러 컬렉션을 동시에 검색
+    요청 형식 (둘 중 하나):
+      - {"texts": [...], "collections": ["movie_clips", "audio_clips"]}: 모든 텍스트로 모든 컬렉션 검색
+      - {"queries": {"movie_clips": "...", "audio_clips": ["...", "..."]}}: 컬렉션별로 다른 텍스트 검색
+    선택: "top_k" (기본 10), "include", 필터 ("video_path" / "video_key" / "start" / "end" / "filters" / "where"),
+          "mode" (모든 컬렉션) 또는 "modes" ({컬렉션 이름: 검색 방식}, 기본 dense),
+          "rerank" (기본 false) / "rerank_top_n" / "rerank_budget": 모든 컬렉션의 상위 후보를 cross-encoder로 한 번에 재순위화,
+          "coarse_videos" (기본 0): 영상 요약 컬렉션에서 가까운 영상을 먼저 고른 뒤 그 영상의 구간만 검색
+    응답 형식: {"results": {컬렉션 이름: ChromaDB query 결과}, "reranked": 재순위화 적용 여부}
+    """
+    try:
+        data = request.json or {}
+        n_results, where, include = parse_query_options(data)
+        mode = parse_search_mode(data)
+        modes = data.get('modes') or {}
+        if not isinstance(modes, dict):
+            return jsonify({"error": "modes must be an object"}), 400
+        modes = {name: parse_search_mode({"mode": modes.get(name, mode)}) for name in COLLECTIONS}
+        rerank, rerank_top_n, rerank_budget = parse_rerank_options(data, include)
+
+        if 'queries' in data:
+            queries = data['queries']
+            if not isinstance(queries, dict):
+                return jsonify({"error": "queries must be an object"}), 400
+        else:
+            texts = data.get('texts')
+            collections = data.get('collections', list(COLLECTIONS))
+            if not isinstance(collections, list):
+                return jsonify({"error": "collections must be a list"}), 400
+            queries = {name: texts for name in collections}
+
+        # 텍스트 하나만 들어온 경우도 리스트로 통일하고 빈 텍스트 제거
+        queries = {
+            name: [text for text in ([texts] if isinstance(texts, str) else (texts or [])) if text]
+            for name, texts in queries.items()
+        }
+        unknown = [name for name in queries if name not in COLLECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown collections: {unknown}"}), 400
+        queries = {name: texts for name, texts in queries.items() if texts}
+        if not queries:
+            return jsonify({"error": "Input text is required"}), 400
+
+        results = texts_to_timestamps_multi(model, queries, n_results=n_results, where=where, include=include,
+                                            modes=modes, filters=parse_filters(data),
+                                            coarse_videos=parse_coarse_videos(data))
+        # 제한 시간을 넘기면 기존 순서를 그대로 반환
+        reranked = rerank and rerank_results(reranker, queries, results, top_n=rerank_top_n, budget=rerank_budget)
+        return jsonify({"results": results, "reranked": reranked})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/lexical_index/rebuild', methods=['POST'])
+def lexical_index_rebuild():
+    """
+    벡터 컬렉션에 저장된 캡션으로 BM25 색인을 다시 채움 (색인 도입 전에 저장된 데이터용)
+    선택: "collections" (기본 전체), "batch_size" (기본 1000)
+    """
+    try:
+        data = request.json or {}
+        names = data.get('collections', list(COLLECTIONS))
+        unknown = [name for name in names if name not in COLLECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown collections: {unknown}"}), 400
+        batch_size = int(data.get('batch_size', 1000))
+
+        counts = {}
+        for name in names:
+            counts[name] = 0
+            offset = 0
+            while True:
+                page = COLLECTIONS[name].get(limit=batch_size, offset=offset, include=["metadatas"])
+                if not page["ids"]:
+                    break
+                LEXICAL_INDEXES[name].upsert(page["ids"], [m.get("captions", "") for m in page["metadatas"]],
+                                             page["metadatas"])
+                counts[name] += len(page["ids"])
+                offset += len(page["ids"])
+        return jsonify({"message": "Lexical index rebuilt", "counts": counts})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/video_summaries/rebuild', methods=['POST'])
+def video_summaries_rebuild():
+    """
+    저장된 구간 임베딩으로 영상 요약 컬렉션(영상별 평균 임베딩)을 다시 계산 (요약 도입 전에 저장된 데이터용)
+    선택: "collections" (기본 전체), "batch_size" (기본 1000)
+    """
+    try:
+        data = request.json or {}
+        names = data.get('collections', list(COLLECTIONS))
+        unknown = [name for name in names if name not in COLLECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown collections: {unknown}"}), 400
+        batch_size = int(data.get('batch_size', 1000))
+
+        counts = {}
+        for name in names:
+            video_keys = set()
+            offset = 0
+            while True:
+                page = COLLECTIONS[name].get(limit=batch_size, offset=offset, include=["metadatas"])
+                if not page["ids"]:
+                    break
+                video_keys.update(m["video_key"] for m in page["metadatas"] if m.get("video_key"))
+                offset += len(page["ids"])
+            for video_key in video_keys:
+                refresh_video_summary(COLLECTIONS[name], SUMMARY_COLLECTIONS[name], video_key)
+            counts[name] = len(video_keys)
+        return jsonify({"message": "Video summaries rebuilt", "counts": counts})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/rerank/stats', methods=['GET'])
+def rerank_stats():
+    """
+    재순위화 모델 준비 상태와 적용 / 생략 횟수 반환
+    """
+    return jsonify(reranker.stats())
+
+
+@app.route('/embedding_cache/stats', methods=['GET'])
+def embedding_cache_stats():
+    """
+    검색 쿼리 임베딩 캐시의 적중률 통계 반환
+    """
+    return jsonify(embedding_cache.stats())
+
+
+@app.route('/embedding_cache/save', methods=['POST'])
+def embedding_cache_save():
+    """
+    검색 쿼리 임베딩 캐시를 EMBED_CACHE_PATH에 저장 (다음 실행 시 미리 채우는 용도)
+    """
+    if not EMBED_CACHE_PATH:
+        return jsonify({"error": "EMBED_CACHE_PATH is not configured"}), 400
+    try:
+        embedding_cache.save(EMBED_CACHE_PATH)
+        return jsonify({"message": "Embedding cache saved", **embedding_cache.stats()})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,108 @@
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키용 텍스트 정규화 (유니코드 정규화 + 공백 정리)
+    인코더가 대소문자를 구분하므로 소문자 변환은 하지 않음
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class EmbeddingCache:
+    """정규화된 쿼리 텍스트 -> 임베딩 LRU 캐시 (선택적으로 파일에서 미리 채움)"""
+
+    def __init__(self, model_name: str, max_items: int = 10000):
+        self.model_name = model_name
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        self._items[key] = embedding
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def encode(self, model, texts: list) -> list:
+        """
+        캐시에 없는 텍스트만 한 번에 인코딩하여 입력 순서대로 임베딩 반환
+        :return: 임베딩(float 리스트) 리스트
+        """
+        keys = [normalize_text(text) for text in texts]
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    found[key] = self._items[key]
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            embeddings = model.encode(missing, normalize_embeddings=True)
+            with self._lock:
+                for key, embedding in zip(missing, embeddings):
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    self._remember(key, embedding)
+                    found[key] = embedding
+
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return [found[key].tolist() for key in keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._items),
+                "max_items": self.max_items
+            }
+
+    def save(self, path: str):
+        """LRU 순서를 유지하여 캐시를 파일에 저장 (다음 실행 시 load로 미리 채움)"""
+        with self._lock:
+            keys = list(self._items)
+            embeddings = np.stack([self._items[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, model=np.array(self.model_name), texts=np.array(keys, dtype=str), embeddings=embeddings)
+        os.replace(tmp_path, path)
+        logger.info(f"임베딩 캐시 저장: {path} ({len(keys)}개)")
+
+    def load(self, path: str) -> int:
+        """
+        저장된 캐시 파일로 미리 채움 (다른 모델로 만든 파일은 무시)
+        :return: 불러온 항목 수
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name:
+                    logger.warning(f"임베딩 캐시 모델이 달라 무시: {path} ({data['model']})")
+                    return 0
+                texts = data["texts"].tolist()
+                embeddings = data["embeddings"].astype(np.float32)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"임베딩 캐시 읽기 실패: {path} - {e}")
+            return 0
+
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                self._remember(text, embedding)
+        logger.info(f"임베딩 캐시 불러옴: {path} ({len(texts)}개)")
+        return len(texts)
@@ -0,0 +1,367 @@
+import codecs
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 인코딩할 캡션 수 (CPU에서는 작게, GPU에서는 크게)
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", 256))
+
+READ_CHUNK_SIZE = 64 * 1024  # 업로드 본문을 읽는 단위 (바이트)
+_SEPARATORS = " \t\r\n,"
+
+
+def iter_json_records(stream, chunk_size: int = READ_CHUNK_SIZE):
+    """
+    JSON 배열 또는 NDJSON 본문을 조금씩 읽으면서 레코드를 하나씩 생성
+    전체 본문을 메모리에 올리지 않으며, 버퍼에는 아직 파싱하지 않은 부분만 남김
+
+    :param stream: read(size)를 제공하는 바이너리(또는 텍스트) 스트림
+    :raises ValueError: JSON 형식이 잘못된 경우
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+    is_array = None
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            text = utf8.decode(b"", final=True)
+        else:
+            text = chunk if isinstance(chunk, str) else utf8.decode(chunk)
+        buffer = buffer[pos:] + text
+        pos = 0
+
+    while True:
+        # 공백 / 구분자 건너뛰기
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            read_more()
+        if pos >= len(buffer):
+            return
+
+        if is_array is None:
+            is_array = buffer[pos] == "["
+            if is_array:
+                pos += 1
+                continue
+        if is_array and buffer[pos] == "]":
+            return
+
+        # 레코드 하나가 완성될 때까지 더 읽기
+        # 버퍼 끝에서 끝난 레코드는 다음 조각에서 이어질 수 있으므로(최상위 숫자 등) 구분자가 올 때까지 더 읽음
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"잘못된 JSON 형식입니다: {e}")
+            read_more()
+        pos = end
+        yield record
+
+
+def _to_millis(value) -> int:
+    """타임스탬프(초 단위 숫자 또는 'HH:MM:SS.mmm' 문자열)를 밀리초 정수로 변환"""
+    if isinstance(value, str) and ":" in value:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + float(part)
+        return int(round(seconds * 1000))
+    return int(round(float(value) * 1000))
+
+
+def video_key_of(record: dict) -> str:
+    """레코드가 속한 영상의 키 (video_key가 없으면 파일 이름; 업로드 영상은 파일 이름이 SHA-256)"""
+    if record.get('video_key'):
+        return str(record['video_key'])
+    return os.path.splitext(os.path.basename(record['video_path']))[0]
+
+
+def segment_id(video_key: str, start, end) -> str:
+    """영상 키 + 구간으로 만든 고정 구간 ID (예: 'abc_1500-4000')"""
+    return f"{video_key}_{_to_millis(start)}-{_to_millis(end)}"
+
+
+def caption_hash(caption: str) -> str:
+    """캡션 변경 여부 확인용 해시"""
+    return hashlib.sha256(caption.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_caption_rows(records, caption_field: str):
+    """
+    캡션 레코드에서 (구간 ID, 캡션, 메타데이터)를 순서대로 생성
+    구간 ID는 영상 키 + 구간으로 만들어 같은 영상을 다시 처리해도 바뀌지 않음
+    :param records: {"video_path", "video_key"(선택), "segments": {"timestamps", 캡션 필드}} 이터러블
+    :param caption_field: 임베딩할 캡션 필드 ('video_caption_eng' / 'stt_caption_eng')
+    """
+    for record in records:
+        video_path = record['video_path']
+        segments = record['segments']
+        timestamp = segments['timestamps']
+        caption = segments[caption_field]
+        video_key = video_key_of(record)
+        yield segment_id(video_key, timestamp['start'], timestamp['end']), caption, {
+            "captions": caption,
+            "video_path": video_path,
+            "video_key": video_key,
+            "text_hash": caption_hash(caption),
+            "start": timestamp['start'],
+            "end": timestamp['end']
+        }
+
+
+def _batches(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def delete_orphans(collection, video_key: str, keep_ids, video_paths=(), with_embeddings: bool = False):
+    """
+    영상의 구간 중 keep_ids에 없는 구간을 한 번의 delete 호출로 삭제
+    고정 구간 ID 도입 전에 저장된 구간('{video_id}_{n}' ID, video_key 메타데이터 없음)은 video_paths로 찾아 함께 삭제
+    :param with_embeddings: True이면 삭제 전에 video_key가 있는 구간의 임베딩을 함께 조회 (영상 요약 갱신용)
+    :return: 삭제한 구간 ID 리스트 (with_embeddings=True이면 (ID 리스트, video_key가 있던 구간의 임베딩 리스트))
+    """
+    keyed = collection.get(where={"video_key": video_key}, include=[])["ids"]
+    existing = dict.fromkeys(keyed)
+    for video_path in video_paths:
+        legacy = collection.get(where={"video_path": video_path}, include=["metadatas"])
+        existing.update(dict.fromkeys(id for id, metadata in zip(legacy["ids"], legacy["metadatas"] or [])
+                                      if not (metadata or {}).get("video_key")))
+    orphans = [id for id in existing if id not in keep_ids]
+    embeddings = []
+    if orphans:
+        if with_embeddings:
+            keyed = set(keyed)
+            keyed_orphans = [id for id in orphans if id in keyed]
+            if keyed_orphans:
+                embeddings = list(collection.get(ids=keyed_orphans, include=["embeddings"])["embeddings"])
+        collection.delete(ids=orphans)
+    return (orphans, embeddings) if with_embeddings else orphans
+
+
+def _write_video_summary(summary_collection, video_key: str, video_path, embedding_sum, count: int):
+    """구간 임베딩 합 / 개수로 정규화된 평균 임베딩을 저장 (합 / 개수는 이후 증분 갱신을 위해 메타데이터에 함께 저장)"""
+    centroid = np.asarray(embedding_sum, dtype=np.float64)
+    centroid = centroid / max(float(np.linalg.norm(centroid)), 1e-12)
+    summary_collection.upsert(ids=[video_key], embeddings=[centroid.astype(np.float32).tolist()], metadatas=[{
+        "video_key": video_key,
+        "video_path": video_path,
+        "segments": count,
+        "embedding_sum": json.dumps(np.asarray(embedding_sum, dtype=np.float64).tolist())
+    }])
+
+
+def refresh_video_summary(collection, summary_collection, video_key: str) -> bool:
+    """
+    영상의 구간 임베딩을 모두 읽어 평균(정규화)을 영상 요약 컬렉션에 저장 (구간이 모두 삭제되었으면 요약도 삭제)
+    :return: 요약이 남아있으면 True
+    """
+    stored = collection.get(where={"video_key": video_key}, include=["embeddings", "metadatas"])
+    if not len(stored["ids"]):
+        summary_collection.delete(ids=[video_key])
+        return False
+    embedding_sum = np.asarray(stored["embeddings"], dtype=np.float64).sum(axis=0)
+    _write_video_summary(summary_collection, video_key, stored["metadatas"][0].get("video_path"),
+                         embedding_sum, len(stored["ids"]))
+    return True
+
+
+def update_video_summaries(collection, summary_collection, deltas: dict, video_keys) -> int:
+    """
+    저장된 임베딩 합 / 개수에 이번 입력에서 추가 / 삭제된 구간의 임베딩만 더하고 빼서 영상 요약을 갱신
+    요약이 없거나 합이 저장되지 않은 이전 형식의 요약만 구간 임베딩 전체로 다시 계산
+    (증분 갱신은 저장 정밀도에 따른 오차가 누적될 수 있으므로 /video_summaries/rebuild로 전체 재계산 가능)
+    :param deltas: {영상 키: [임베딩 합 변화량, 구간 수 변화량, video_path]}
+    :param video_keys: 요약을 갱신할 영상 키 (deltas에 없으면 요약이 없을 때만 새로 계산)
+    :return: 갱신한 요약 수
+    """
+    video_keys = sorted(video_keys)
+    if not video_keys:
+        return 0
+    summaries = summary_collection.get(ids=video_keys, include=["metadatas"])
+    summaries = dict(zip(summaries["ids"], summaries["metadatas"] or []))
+
+    updated = 0
+    for video_key in video_keys:
+        summary = summaries.get(video_key) or {}
+        delta = deltas.get(video_key)
+        if "embedding_sum" not in summary:
+            refresh_video_summary(collection, summary_collection, video_key)
+        elif delta is None:
+            continue
+        else:
+            delta_sum, delta_count, video_path = delta
+            count = int(summary.get("segments", 0)) + delta_count
+            if count <= 0:
+                summary_collection.delete(ids=[video_key])
+            else:
+                embedding_sum = np.asarray(json.loads(summary["embedding_sum"]), dtype=np.float64)
+                if delta_sum is not None:
+                    embedding_sum = embedding_sum + delta_sum
+                _write_video_summary(summary_collection, video_key, video_path or summary.get("video_path"),
+                                     embedding_sum, count)
+        updated += 1
+    return updated
+
+
+def ingest_captions(model, rows, collection, batch_size: int = EMBED_BATCH_SIZE, replace: bool = False,
+                    lexical_index=None, summary_collection=None) -> dict:
+    """
+    캡션을 배치 단위로 인코딩하여 컬렉션에 upsert (같은 데이터를 다시 넣어도 안전)
+      - 캡션 해시가 저장된 값과 같은 구간은 다시 인코딩하지 않음 (메타데이터만 바뀐 경우 메타데이터만 갱신)
+      - 이전 배치를 컬렉션에 저장하는 동안 다음 배치를 인코딩 (저장 대기 중인 배치는 최대 1개)
+      - replace=True이면 입력에 포함된 영상의 구간 중 이번 입력에 없는 구간을 삭제 (video_key가 없는 이전 형식의 같은 video_path 구간 포함)
+      - lexical_index가 있으면 같은 구간을 BM25 색인에도 반영 (색인에 없는 구간은 변경이 없어도 추가)
+      - summary_collection이 있으면 추가 / 변경 / 삭제된 구간의 임베딩만으로 영상 평균 임베딩을 증분 갱신
+        (요약이 없는 영상은 새로 계산)
+
+    :param rows: (구간 ID, 캡션, 메타데이터) 이터러블
+    :param collection: get / upsert / update / delete를 제공하는 컬렉션
+    :param lexical_index: upsert / delete를 제공하는 BM25 색인 (선택)
+    :param summary_collection: 영상별 평균 임베딩을 저장하는 컬렉션 (선택, ID는 영상 키)
+    :return: {"count", "embedded", "unchanged", "metadata_updated", "deleted", "summaries_updated",
+              "encode_time", "write_time", "wall_time", "captions_per_sec"}
+    """
+    started = time.perf_counter()
+    counts = {"count": 0, "embedded": 0, "unchanged": 0, "metadata_updated": 0, "deleted": 0, "summaries_updated": 0}
+    encode_time = 0.0
+    write_time = [0.0]
+    seen_ids = {}  # {영상 키: 이번 입력에 포함된 구간 ID 집합} (replace=True인 경우만 기록)
+    seen_paths = {}  # {영상 키: 이번 입력의 video_path 집합} (replace=True인 경우만 기록)
+    seen_videos = set()
+    deltas = {}  # {영상 키: [임베딩 합 변화량, 구간 수 변화량, video_path]} (영상 요약 증분 갱신용)
+
+    def add_delta(video_key, embeddings, sign, video_path=None):
+        delta = deltas.setdefault(video_key, [None, 0, None])
+        if len(embeddings):
+            change = sign * np.asarray(embeddings, dtype=np.float64).sum(axis=0)
+            delta[0] = change if delta[0] is None else delta[0] + change
+            delta[1] += sign * len(embeddings)
+        if video_path is not None:
+            delta[2] = video_path
+
+    def write(ids, embeddings, metadatas, metadata_only, lexical_rows):
+        write_started = time.perf_counter()
+        if ids:
+            collection.upsert(embeddings=embeddings, ids=ids, metadatas=metadatas)
+        if metadata_only:
+            collection.update(ids=[id for id, _ in metadata_only], metadatas=[m for _, m in metadata_only])
+        if lexical_rows:
+            lexical_index.upsert([row[0] for row in lexical_rows], [row[1] for row in lexical_rows],
+                                 [row[2] for row in lexical_rows])
+        write_time[0] += time.perf_counter() - write_started
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="vectordb-add") as writer:
+        pending = None
+        for batch in _batches(rows, batch_size):
+            # 같은 배치 안의 중복 ID는 마지막 값 사용
+            batch = list({row[0]: row for row in batch}.values())
+            if replace:
+                for id, _, metadata in batch:
+                    seen_ids.setdefault(metadata["video_key"], set()).add(id)
+                    seen_paths.setdefault(metadata["video_key"], set()).add(metadata["video_path"])
+
+            stored = collection.get(ids=[row[0] for row in batch], include=["metadatas"])
+            stored = dict(zip(stored["ids"], stored["metadatas"]))
+
+            changed = []
+            metadata_only = []
+            lexical_rows = []
+            for row in batch:
+                id, _, metadata = row
+                seen_videos.add(metadata["video_key"])
+                previous = stored.get(id)
+                if previous is None or previous.get("text_hash") != metadata["text_hash"]:
+                    changed.append(row)
+                    lexical_rows.append(row)
+                elif previous != metadata:
+                    metadata_only.append((id, metadata))
+                    lexical_rows.append(row)
+                    if summary_collection is not None:
+                        add_delta(metadata["video_key"], [], 1, metadata["video_path"])
+                else:
+                    counts["unchanged"] += 1
+                    if lexical_index is not None and id not in lexical_index:
+                        lexical_rows.append(row)
+            if lexical_index is None:
+                lexical_rows = []
+
+            embeddings = []
+            if changed:
+                encode_started = time.perf_counter()
+                embeddings = model.encode([row[1] for row in changed], batch_size=batch_size,
+                                          normalize_embeddings=True).tolist()
+                encode_time += time.perf_counter() - encode_started
+
+                if summary_collection is not None:
+                    # 내용이 바뀐 구간은 이전 임베딩을 빼고 새 임베딩을 더함
+                    replaced = [row[0] for row in changed if row[0] in stored]
+                    if replaced:
+                        previous = collection.get(ids=replaced, include=["embeddings"])
+                        for id, embedding in zip(previous["ids"], previous["embeddings"]):
+                            if stored[id].get("video_key"):
+                                add_delta(stored[id]["video_key"], [embedding], -1)
+                    for row, embedding in zip(changed, embeddings):
+                        add_delta(row[2]["video_key"], [embedding], 1, row[2]["video_path"])
+
+            # 이전 배치 저장이 끝나야 다음 배치 저장을 시작 (오류는 여기서 전달)
+            if pending is not None:
+                pending.result()
+            pending = writer.submit(write, [row[0] for row in changed], embeddings,
+                                    [row[2] for row in changed], metadata_only, lexical_rows)
+            counts["count"] += len(batch)
+            counts["embedded"] += len(changed)
+            counts["metadata_updated"] += len(metadata_only)
+
+        if pending is not None:
+            pending.result()
+
+    if replace:
+        for video_key, ids in seen_ids.items():
+            orphans, removed = delete_orphans(collection, video_key, ids, sorted(seen_paths[video_key]),
+                                              with_embeddings=True)
+            if orphans and lexical_index is not None:
+                lexical_index.delete(orphans)
+            if removed and summary_collection is not None:
+                add_delta(video_key, removed, -1)
+            counts["deleted"] += len(orphans)
+
+    if summary_collection is not None and seen_videos:
+        # 요약이 아직 없는 영상은 변경이 없어도 새로 계산
+        counts["summaries_updated"] = update_video_summaries(collection, summary_collection, deltas,
+                                                             seen_videos | set(deltas))
+
+    wall_time = time.perf_counter() - started
+    stats = {
+        **counts,
+        "encode_time": round(encode_time, 3),
+        "write_time": round(write_time[0], 3),
+        "wall_time": round(wall_time, 3),
+        "captions_per_sec": round(counts["count"] / wall_time, 1) if wall_time > 0 else 0.0
+    }
+    logger.info(f"벡터 DB 저장 완료: {stats}")
+    return stats
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 인코더 설정
+ENCODER_BACKEND = os.environ.get("ENCODER_BACKEND", "torch")    # torch / onnx / onnx-int8
+ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", 0))      # 0이면 라이브러리 기본값 사용
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", "onnx_models")
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _export_onnx(model_name: str, export_dir: str):
+    """
+    SentenceTransformer의 트랜스포머 부분을 ONNX로 내보내고 동적 int8 양자화 모델도 함께 생성
+    풀링 / 토크나이저 설정은 encoder.json에 저장 (이후에는 PyTorch 모델을 불러오지 않음)
+    """
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from sentence_transformers import SentenceTransformer
+
+    started = time.perf_counter()
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    pooling = model[1]
+    if getattr(pooling, "pooling_mode_mean_tokens", False):
+        pooling_mode = "mean"
+    elif getattr(pooling, "pooling_mode_cls_token", False):
+        pooling_mode = "cls"
+    else:
+        raise ValueError(f"지원하지 않는 풀링 방식입니다: {pooling}")
+
+    os.makedirs(export_dir, exist_ok=True)
+    model.tokenizer.save_pretrained(export_dir)
+    sample = model.tokenizer(["warm up"], return_tensors="pt")
+    fp32_path = os.path.join(export_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_embeddings": {0: "batch", 1: "sequence"}
+            },
+            opset_version=14
+        )
+    quantize_dynamic(fp32_path, os.path.join(export_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+    with open(os.path.join(export_dir, "encoder.json"), "w") as f:
+        json.dump({"model_name": model_name, "pooling": pooling_mode, "max_seq_length": model.max_seq_length}, f)
+    logger.info(f"ONNX 모델 내보내기 완료: {export_dir} ({time.perf_counter() - started:.1f}s)")
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime으로 실행하는 SentenceTransformer 호환 인코더 (encode만 제공)
+    처음 사용할 때 모델을 ONNX로 내보내고 ONNX_MODEL_DIR에 저장하여 재사용
+    """
+
+    def __init__(self, model_name: str, quantized: bool = True, threads: int = ENCODER_THREADS,
+                 model_dir: str = ONNX_MODEL_DIR):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        export_dir = os.path.join(model_dir, model_name.replace("/", "__"))
+        if not os.path.exists(os.path.join(export_dir, "encoder.json")):
+            _export_onnx(model_name, export_dir)
+        with open(os.path.join(export_dir, "encoder.json")) as f:
+            config = json.load(f)
+        self.pooling = config["pooling"]
+        self.max_seq_length = config["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+        model_path = os.path.join(export_dir, "model.int8.onnx" if quantized else "model.onnx")
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        logger.info(f"ONNX 인코더 로드: {model_path} (스레드 {threads or '기본값'})")
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """SentenceTransformer.encode와 같은 형식으로 임베딩 반환 (문자열 하나면 1차원 배열)"""
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        # 길이가 비슷한 문장끼리 묶어 패딩을 줄이고 결과는 입력 순서로 되돌림
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            tokens = self.tokenizer(batch, padding=True, truncation=True, max_length=self.max_seq_length,
+                                    return_tensors="np")
+            mask = tokens["attention_mask"].astype(np.int64)
+            token_embeddings = self.session.run(None, {
+                "input_ids": tokens["input_ids"].astype(np.int64),
+                "attention_mask": mask
+            })[0]
+            if self.pooling == "cls":
+                pooled = token_embeddings[:, 0]
+            else:
+                pooled = (token_embeddings * mask[:, :, None]).sum(axis=1) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+            for i, embedding in zip(order[start:start + batch_size], pooled):
+                embeddings[i] = embedding
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(sentences), -1)
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def create_encoder(model_name: str, backend: str = ENCODER_BACKEND, threads: int = ENCODER_THREADS):
+    """
+    설정(ENCODER_BACKEND)에 맞는 인코더 생성 (모두 SentenceTransformer.encode 호환)
+      - torch: SentenceTransformer (PyTorch fp32)
+      - onnx: ONNX Runtime fp32
+      - onnx-int8: ONNX Runtime + 동적 int8 양자화 (CPU 검색 노드용)
+    """
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformer(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, quantized=backend == "onnx-int8", threads=threads)
+    raise ValueError(f"지원하지 않는 인코더입니다: {backend} ({ENCODER_BACKENDS})")
@@ -0,0 +1,228 @@
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+PHRASE_BONUS = 1e6  # 구절 일치 구간을 BM25 점수와 관계없이 먼저 배치하기 위한 값
+FILTER_FIELDS = ("video_path", "video_key", "start", "end")  # 색인에 함께 저장하는 필터용 메타데이터
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list:
+    """BM25용 토큰화 (유니코드 정규화 + 소문자 + 단어 단위)"""
+    return _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text or "").lower())
+
+
+def _contains_phrase(tokens: list, phrase: list) -> bool:
+    """tokens 안에 phrase가 연속으로 나타나는지 확인"""
+    n = len(phrase)
+    if n == 0 or n > len(tokens):
+        return False
+    first = phrase[0]
+    return any(tokens[i] == first and tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+def _match_filters(metadata: dict, filters: dict) -> bool:
+    """video_path / video_key / start / end 필터 적용 (start / end는 구간이 겹치는지 확인)"""
+    if not filters:
+        return True
+    for key in ("video_path", "video_key"):
+        expected = filters.get(key)
+        if expected is None:
+            continue
+        value = metadata.get(key)
+        if value not in expected if isinstance(expected, list) else value != expected:
+            return False
+    try:
+        if filters.get("start") is not None and not float(metadata.get("end")) >= float(filters["start"]):
+            return False
+        if filters.get("end") is not None and not float(metadata.get("start")) <= float(filters["end"]):
+            return False
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class BM25Index:
+    """
+    캡션 텍스트에 대한 BM25 역색인 (메모리) + SQLite 영구 저장소
+    벡터 컬렉션과 같은 구간 ID를 사용하며 저장 시 함께 갱신
+    색인 안에서는 구간마다 정수 번호를 붙여 점수 계산을 numpy 배열 연산으로 처리
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS docs (
+            id TEXT PRIMARY KEY,    -- 구간 ID (벡터 컬렉션과 동일)
+            text TEXT NOT NULL,     -- 캡션 텍스트
+            metadata TEXT           -- 필터용 메타데이터 (JSON)
+        )
+        """)
+        self._db.commit()
+
+        self._postings = {}                             # {토큰: {구간 번호: 토큰 빈도}}
+        self._num_of = {}                               # {구간 ID: 구간 번호}
+        self._ids = []                                  # 구간 번호 -> 구간 ID (삭제된 번호는 None)
+        self._tokens = []                               # 구간 번호 -> 토큰 리스트
+        self._metadatas = []                            # 구간 번호 -> 메타데이터
+        self._lengths = np.zeros(0, dtype=np.float32)   # 구간 번호 -> 토큰 수
+        self._free = []                                 # 재사용할 삭제된 구간 번호
+        self._total_length = 0
+        for id, text, metadata in self._db.execute("SELECT id, text, metadata FROM docs"):
+            self._add(id, text, json.loads(metadata) if metadata else {})
+        logger.info(f"BM25 색인 불러옴: {db_path} ({len(self)}개)")
+
+    def __len__(self):
+        return len(self._num_of)
+
+    def __contains__(self, id):
+        return id in self._num_of
+
+    def _add(self, id: str, text: str, metadata: dict):
+        tokens = tokenize(text)
+        num = self._num_of.get(id)
+        if num is None:
+            if self._free:
+                num = self._free.pop()
+            else:
+                num = len(self._ids)
+                self._ids.append(None)
+                self._tokens.append(None)
+                self._metadatas.append(None)
+                if num >= len(self._lengths):
+                    self._lengths = np.concatenate([self._lengths, np.zeros(max(num, 1024), dtype=np.float32)])
+            self._num_of[id] = num
+        self._ids[num] = id
+        self._tokens[num] = tokens
+        self._metadatas[num] = metadata
+        self._lengths[num] = len(tokens)
+        self._total_length += len(tokens)
+        for token, count in Counter(tokens).items():
+            self._postings.setdefault(token, {})[num] = count
+
+    def _remove(self, id: str, keep_number: bool = False):
+        num = self._num_of.get(id)
+        if num is None:
+            return
+        tokens = self._tokens[num]
+        self._total_length -= len(tokens)
+        for token in set(tokens):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(num, None)
+                if not postings:
+                    del self._postings[token]
+        if not keep_number:
+            del self._num_of[id]
+            self._ids[num] = self._tokens[num] = self._metadatas[num] = None
+            self._lengths[num] = 0
+            self._free.append(num)
+
+    def upsert(self, ids: list, texts: list, metadatas: list = None):
+        """구간 텍스트 추가 / 갱신"""
+        metadatas = [{key: (metadata or {}).get(key) for key in FILTER_FIELDS} for metadata in (metadatas or [{}] * len(ids))]
+        with self._lock:
+            for id, text, metadata in zip(ids, texts, metadatas):
+                self._remove(id, keep_number=True)
+                self._add(id, text, metadata)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO docs (id, text, metadata) VALUES (?, ?, ?)",
+                [(id, text, json.dumps(metadata, ensure_ascii=False)) for id, text, metadata in zip(ids, texts, metadatas)]
+            )
+            self._db.commit()
+
+    def delete(self, ids: list):
+        with self._lock:
+            for id in ids:
+                self._remove(id)
+            self._db.executemany("DELETE FROM docs WHERE id = ?", [(id,) for id in ids])
+            self._db.commit()
+
+    def _phrase_matches(self, query_tokens: list) -> list:
+        """질의 전체가 연속으로 나타나는 구간 번호 (가장 드문 토큰의 구간부터 교집합을 구한 뒤 확인)"""
+        postings = [self._postings.get(token) for token in set(query_tokens)]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = postings[0].keys()
+        for other in postings[1:]:
+            candidates = [num for num in candidates if num in other]
+        return [num for num in candidates if _contains_phrase(self._tokens[num], query_tokens)]
+
+    def _score(self, query_terms: set, nums: list = None) -> np.ndarray:
+        """
+        구간 번호별 BM25 점수 (nums를 지정하면 해당 구간만 계산)
+        :return: 구간 번호 수 길이의 점수 배열 (질의 토큰이 없는 구간은 0)
+        """
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        num_docs = len(self)
+        average_length = self._total_length / num_docs
+        for token in query_terms:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            if nums is None:
+                docs = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tfs = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            else:
+                docs = [num for num in nums if num in postings]
+                tfs = np.array([postings[num] for num in docs], dtype=np.float32)
+                docs = np.array(docs, dtype=np.int64)
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[docs] / average_length)
+            scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norms)
+        return scores
+
+    def search(self, query: str, top_k: int = 10, filters: dict = None) -> list:
+        """
+        BM25 검색 (질의 전체가 연속으로 나타나는 구간을 먼저 배치)
+        구절이 일치하는 구간이 top_k개 이상이면 해당 구간만 점수를 계산
+        :param filters: {"video_path", "video_key", "start", "end"} 검색 필터
+        :return: [(구간 ID, BM25 점수, 구절 일치 여부), ...] (관련도 순)
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            if len(self) == 0:
+                return []
+
+            # 토큰이 하나뿐인 질의는 구절 일치가 BM25 순위와 같으므로 생략
+            phrase = self._phrase_matches(query_tokens) if len(query_tokens) > 1 else []
+            if filters:
+                phrase = [num for num in phrase if _match_filters(self._metadatas[num], filters)]
+            scores = self._score(set(query_tokens), phrase if len(phrase) >= top_k else None)
+            ranking = scores.astype(np.float64)
+            ranking[phrase] += PHRASE_BONUS
+            candidates = np.nonzero(ranking)[0]
+
+            if filters:
+                # 필터가 있으면 점수 순으로 훑으면서 조건을 만족하는 구간만 선택
+                order = candidates[np.argsort(-ranking[candidates], kind="stable")]
+                selected = []
+                for num in order.tolist():
+                    if _match_filters(self._metadatas[num], filters):
+                        selected.append(num)
+                        if len(selected) == top_k:
+                            break
+            else:
+                if len(candidates) > top_k:
+                    candidates = candidates[np.argpartition(-ranking[candidates], top_k - 1)[:top_k]]
+                selected = candidates[np.argsort(-ranking[candidates], kind="stable")].tolist()
+
+            phrase = set(phrase)
+            return [(self._ids[num], float(scores[num]), num in phrase) for num in selected]
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 재순위화 설정 (한국어 질의도 처리할 수 있는 다국어 cross-encoder)
+RERANK_MODEL = os.environ.get("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+RERANK_BUDGET = float(os.environ.get("RERANK_BUDGET", 0.3))  # 요청당 재순위화 제한 시간 (초)
+RERANK_TOP_N = int(os.environ.get("RERANK_TOP_N", 20))       # 질의당 재순위화할 상위 후보 수
+RERANK_BATCH_SIZE = 64
+
+
+class Reranker:
+    """
+    cross-encoder로 (질의, 캡션) 쌍을 한 번의 배치로 다시 점수화
+    모델은 처음 사용할 때 백그라운드에서 불러오며, 불러오는 중이거나 제한 시간을 넘기면 None을 반환
+    동시에 하나의 배치만 실행하고, 실행 중이면 기다리지 않고 바로 None을 반환
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._loading = False
+        self._lock = threading.Lock()
+        self._busy = threading.Semaphore(1)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rerank")
+        self.applied = 0
+        self.skipped = 0
+
+    def _load(self):
+        from sentence_transformers import CrossEncoder
+        started = time.perf_counter()
+        model = CrossEncoder(self.model_name)
+        model.predict([("warm up", "warm up")])
+        self._model = model
+        logger.info(f"재순위화 모델 로드 완료: {self.model_name} ({time.perf_counter() - started:.1f}s)")
+
+    def ready(self) -> bool:
+        """모델이 준비되었는지 확인 (처음 호출 시 백그라운드 로드 시작)"""
+        if self._model is not None:
+            return True
+        with self._lock:
+            if not self._loading:
+                self._loading = True
+                self._executor.submit(self._load).add_done_callback(self._on_loaded)
+        return False
+
+    def _on_loaded(self, future):
+        if future.exception() is not None:
+            logger.error(f"재순위화 모델 로드 실패: {future.exception()}")
+            with self._lock:
+                self._loading = False
+
+    def _predict(self, pairs):
+        try:
+            return self._model.predict(pairs, batch_size=RERANK_BATCH_SIZE).tolist()
+        finally:
+            self._busy.release()
+
+    def score(self, pairs: list, budget: float = RERANK_BUDGET):
+        """
+        (질의, 캡션) 쌍의 관련도 점수 계산
+        :return: 점수 리스트, 모델이 준비되지 않았거나 실행 중이거나 제한 시간을 넘기면 None
+        """
+        if not pairs or not self.ready() or not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            return None
+        future = self._executor.submit(self._predict, pairs)
+        try:
+            scores = future.result(timeout=budget)
+        except FutureTimeoutError:
+            # 실행 중인 배치는 끝나면 버려지고 다음 요청부터 다시 사용
+            logger.warning(f"재순위화 제한 시간 초과 ({budget}s, {len(pairs)}쌍) - 기존 순서 사용")
+            self.skipped += 1
+            return None
+        self.applied += 1
+        return scores
+
+    def stats(self) -> dict:
+        return {"model": self.model_name, "ready": self._model is not None,
+                "applied": self.applied, "skipped": self.skipped}
+
+
+def rerank_results(reranker: Reranker, queries: dict, results: dict, top_n: int = RERANK_TOP_N,
+                   budget: float = RERANK_BUDGET) -> bool:
+    """
+    컬렉션별 검색 결과의 상위 top_n개를 질의 텍스트와 함께 한 번의 배치로 재순위화 (결과를 그 자리에서 변경)
+    재순위화한 결과에는 "rerank_scores"를 추가하고, 재순위화하지 못하면 기존 순서를 그대로 유지
+    :param queries: {컬렉션 이름: 검색 텍스트 리스트}
+    :param results: {컬렉션 이름: ChromaDB query 결과} (캡션은 metadatas의 "captions")
+    :return: 재순위화 적용 여부
+    """
+    pairs = []
+    spans = []  # (컬렉션 이름, 질의 순번, 후보 수)
+    for name, texts in queries.items():
+        result = results.get(name) or {}
+        metadatas = result.get("metadatas")
+        if not metadatas:
+            continue
+        for i, text in enumerate(texts):
+            candidates = metadatas[i][:top_n]
+            pairs.extend((text, (metadata or {}).get("captions", "")) for metadata in candidates)
+            spans.append((name, i, len(candidates)))
+
+    scores = reranker.score(pairs, budget=budget)
+    if scores is None:
+        return False
+
+    offset = 0
+    for name, i, count in spans:
+        result = results[name]
+        query_scores = scores[offset:offset + count]
+        offset += count
+        order = sorted(range(count), key=lambda j: -query_scores[j])
+        for key, values in result.items():
+            if isinstance(values, list) and i < len(values) and isinstance(values[i], list) and len(values[i]) >= count:
+                values[i] = [values[i][j] for j in order] + values[i][count:]
+        result.setdefault("rerank_scores", [None] * len(queries[name]))[i] = [query_scores[j] for j in order]
+    return True
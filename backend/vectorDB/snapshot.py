@@ -0,0 +1,145 @@
+"""
+벡터 컬렉션 스냅샷 내보내기 / 불러오기
+임베딩을 다시 계산하지 않고 컬렉션을 백업하거나 다른 노드로 옮길 때 사용
+
+스냅샷 구조 (컬렉션마다 디렉토리 하나):
+    <스냅샷 디렉토리>/<컬렉션 이름>/embeddings.npy   float16 / float32 / int8 임베딩 행렬
+                                   /scales.npy       int8 행별 scale (int8인 경우만)
+                                   /metadata.npz     구간 ID, 메타데이터(JSON), 저장 형식
+
+인프로세스 저장소(VECTOR_STORE=local)는 벡터 DB 서버를 멈춘 상태에서 실행
+불러온 뒤 BM25 색인은 벡터 DB 서버의 /lexical_index/rebuild로 다시 생성
+
+사용 예시:
+    python snapshot.py export --dir snapshots/20240101 --dtype int8
+    python snapshot.py import --dir snapshots/20240101 --collections movie_clips audio_clips
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from vector_store import create_vector_store, quantize_int8, dequantize_int8, VECTOR_STORE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DTYPES = ("float32", "float16", "int8")
+SNAPSHOT_BATCH_SIZE = 10000
+DEFAULT_COLLECTIONS = ["movie_clips", "audio_clips", "movie_clips_videos", "audio_clips_videos"]
+
+
+def export_collection(collection, path: str, dtype: str = "float16", batch_size: int = SNAPSHOT_BATCH_SIZE) -> dict:
+    """
+    컬렉션 전체를 batch_size개씩 읽어 스냅샷 디렉토리에 저장 (임베딩 행렬은 메모리에 모두 올리지 않고 파일에 바로 기록)
+    :param dtype: 임베딩 저장 형식 (float32 / float16 / int8)
+    :return: {"count", "dim", "dtype", "bytes", "seconds"}
+    """
+    if dtype not in SNAPSHOT_DTYPES:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {dtype} ({SNAPSHOT_DTYPES})")
+    started = time.perf_counter()
+    total = collection.count()
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    ids, metadatas = [], []
+    embeddings = scales = None
+    offset = 0
+    while offset < total:
+        page = collection.get(limit=batch_size, offset=offset, include=["embeddings", "metadatas"])
+        if not len(page["ids"]):
+            break
+        vectors = np.asarray(page["embeddings"], dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.lib.format.open_memmap(os.path.join(tmp_path, "embeddings.npy"), mode="w+",
+                                                   dtype=np.int8 if dtype == "int8" else dtype,
+                                                   shape=(total, vectors.shape[1]))
+            if dtype == "int8":
+                scales = np.lib.format.open_memmap(os.path.join(tmp_path, "scales.npy"), mode="w+",
+                                                   dtype=np.float32, shape=(total,))
+        # 내보내는 동안 추가된 행은 제외
+        vectors = vectors[:total - offset]
+        end = offset + len(vectors)
+        if dtype == "int8":
+            embeddings[offset:end], scales[offset:end] = quantize_int8(vectors)
+        else:
+            embeddings[offset:end] = vectors
+        ids.extend(page["ids"][:len(vectors)])
+        metadatas.extend(json.dumps(m, ensure_ascii=False) for m in (page["metadatas"] or [None] * len(vectors))[:len(vectors)])
+        offset = end
+
+    dim = embeddings.shape[1] if embeddings is not None else 0
+    for matrix in (embeddings, scales):
+        if matrix is not None:
+            matrix.flush()
+    if embeddings is not None and offset < total:
+        # 내보내는 동안 삭제된 행이 있으면 실제 행 수만큼만 남김
+        np.save(os.path.join(tmp_path, "embeddings.npy"), np.array(embeddings[:offset]))
+        if scales is not None:
+            np.save(os.path.join(tmp_path, "scales.npy"), np.array(scales[:offset]))
+    del embeddings, scales
+    np.savez(os.path.join(tmp_path, "metadata.npz"), ids=np.array(ids, dtype=str),
+             metadatas=np.array(metadatas, dtype=str), dtype=np.array(dtype), dim=np.array(dim))
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    stats = {"count": len(ids), "dim": dim, "dtype": dtype, "bytes": size,
+             "seconds": round(time.perf_counter() - started, 3)}
+    logger.info(f"스냅샷 내보내기 완료: {path} {stats}")
+    return stats
+
+
+def import_collection(collection, path: str, batch_size: int = SNAPSHOT_BATCH_SIZE) -> dict:
+    """
+    스냅샷을 batch_size개씩 컬렉션에 upsert (임베딩 행렬은 메모리 매핑으로 읽음)
+    :return: {"count", "dim", "dtype", "seconds"}
+    """
+    started = time.perf_counter()
+    with np.load(os.path.join(path, "metadata.npz"), allow_pickle=False) as data:
+        ids = data["ids"].tolist()
+        metadatas = data["metadatas"].tolist()
+        dtype = str(data["dtype"])
+        dim = int(data["dim"])
+    if ids:
+        embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        scales = np.load(os.path.join(path, "scales.npy"), mmap_mode="r") if dtype == "int8" else None
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            if scales is not None:
+                vectors = dequantize_int8(embeddings[start:end], scales[start:end])
+            else:
+                vectors = np.asarray(embeddings[start:end], dtype=np.float32)
+            collection.upsert(ids=ids[start:end], embeddings=vectors,
+                              metadatas=[json.loads(m) for m in metadatas[start:end]])
+    stats = {"count": len(ids), "dim": dim, "dtype": dtype, "seconds": round(time.perf_counter() - started, 3)}
+    logger.info(f"스냅샷 불러오기 완료: {path} {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="벡터 컬렉션 스냅샷 내보내기 / 불러오기")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--dir", required=True, help="스냅샷 디렉토리")
+    parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    parser.add_argument("--dtype", choices=SNAPSHOT_DTYPES, default="float16", help="내보낼 임베딩 저장 형식")
+    parser.add_argument("--batch-size", type=int, default=SNAPSHOT_BATCH_SIZE)
+    parser.add_argument("--store", default=VECTOR_STORE, help="벡터 저장소 (chroma / local)")
+    args = parser.parse_args()
+
+    store = create_vector_store(args.store)
+    for name in args.collections:
+        collection_path = os.path.join(args.dir, name)
+        if args.command == "export":
+            print(name, export_collection(store.get_or_create_collection(name), collection_path,
+                                          dtype=args.dtype, batch_size=args.batch_size))
+        elif os.path.exists(collection_path):
+            print(name, import_collection(store.get_or_create_collection(name), collection_path,
+                                          batch_size=args.batch_size))
+        else:
+            print(name, "스냅샷 없음 - 건너뜀")
@@ -0,0 +1,560 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 벡터 저장소 설정
+VECTOR_STORE = os.environ.get("VECTOR_STORE", "chroma")  # chroma / local
+CHROMA_HOST = os.environ.get("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.environ.get("CHROMA_PORT", 8000))
+LOCAL_STORE_DIR = os.environ.get("LOCAL_STORE_DIR", "vector_store")
+LOCAL_STORE_DTYPE = os.environ.get("LOCAL_STORE_DTYPE", "float16")  # 새 컬렉션의 임베딩 저장 형식 (float16 / int8)
+
+IVF_MIN_ROWS = 4096     # 이보다 적으면 IVF 인덱스 없이 전체 검색
+IVF_NPROBE = 8          # 검색 시 살펴볼 클러스터 수
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+COMPACT_MIN_ROWS = 1024  # 삭제된 행이 이 수 이상이고
+COMPACT_RATIO = 0.25     # 전체 행의 이 비율을 넘으면 삭제 후 압축
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple:
+    """
+    행마다 대칭 int8 양자화 (x ≈ q * scale)
+    :return: (int8 행렬, 행별 scale float32 배열)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return np.asarray(quantized, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def _kmeans(vectors: np.ndarray, num_lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """IVF 클러스터 중심 학습 (내적 기반 k-means, 정규화된 임베딩 기준)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), num_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        counts = np.bincount(assignments, minlength=num_lists)
+        order = np.argsort(assignments, kind="stable")
+        sums = np.zeros_like(centroids)
+        non_empty = np.nonzero(counts)[0]
+        sums[non_empty] = np.add.reduceat(vectors[order], np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty])
+        empty = counts == 0
+        # 비어 있는 클러스터는 임의의 벡터로 다시 시작
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        counts[empty] = 1
+        centroids = sums / counts[:, None]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class LocalCollection:
+    """
+    메모리 매핑된 float16(또는 int8) 임베딩 행렬 + IVF 인덱스 + SQLite 메타데이터로 구성된 인프로세스 컬렉션
+    ChromaDB Collection과 같은 add / upsert / update / delete / get / query / count API 제공
+    거리는 ChromaDB 기본값과 같은 제곱 L2 거리
+    int8 컬렉션은 행별 scale로 양자화하여 저장하고, 검색 시 int8 행렬과 쿼리의 내적에 scale을 곱해 계산
+    """
+
+    def __init__(self, name: str, path: str, nprobe: int = IVF_NPROBE, dtype: str = LOCAL_STORE_DTYPE):
+        self.name = name
+        self.path = path
+        self.nprobe = nprobe
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._norms_path = os.path.join(path, "norms.f32")
+        self._scales_path = os.path.join(path, "scales.f32")
+        self._centroids_path = os.path.join(path, "centroids.npy")
+
+        self._db = sqlite3.connect(os.path.join(path, "metadata.db"), timeout=30, check_same_thread=False)
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS rows (
+            row INTEGER PRIMARY KEY,    -- 임베딩 행렬의 행 번호
+            id TEXT UNIQUE NOT NULL,    -- 구간 ID
+            metadata TEXT,              -- 메타데이터 (JSON)
+            list INTEGER NOT NULL       -- IVF 클러스터 번호 (-1: 미배정)
+        )
+        """)
+        self._db.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.commit()
+
+        # 저장 형식은 컬렉션을 처음 만들 때 정하고 이후에는 저장된 값을 사용
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"지원하지 않는 저장 형식입니다: {dtype}")
+        if not self._info("dim"):
+            self._set_info(int8=int(dtype == "int8"))
+            self._db.commit()
+        self.int8 = bool(self._info("int8"))
+        self._vectors_path = os.path.join(path, "vectors.i8" if self.int8 else "vectors.f16")
+        self._load()
+
+    # ---------- 저장 / 로드 ----------
+
+    def _info(self, key: str, default: int = 0) -> int:
+        row = self._db.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_info(self, **values):
+        self._db.executemany("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)", values.items())
+
+    def _load(self):
+        self.dim = self._info("dim")
+        self.size = self._info("size")
+        self.trained_size = self._info("trained_size")
+        self.capacity = self._info("capacity")
+        self._vectors = None
+        self._norms = None
+        self._scales = None
+        if self.dim:
+            self._open_matrix()
+
+        self._ids = [None] * self.capacity
+        self._metadatas = [None] * self.capacity
+        self._row_of = {}
+        self._lists = np.full(self.capacity, -1, dtype=np.int32)
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        for row, id, metadata, list_no in self._db.execute("SELECT row, id, metadata, list FROM rows"):
+            self._ids[row] = id
+            self._metadatas[row] = json.loads(metadata) if metadata else None
+            self._row_of[id] = row
+            self._lists[row] = list_no
+            self._alive[row] = True
+
+        self._centroids = np.load(self._centroids_path) if os.path.exists(self._centroids_path) else None
+        self._inverted = None
+        self._columns = {}
+
+    def _open_matrix(self):
+        dtype = np.int8 if self.int8 else np.float16
+        self._vectors = np.memmap(self._vectors_path, dtype=dtype, mode="r+", shape=(self.capacity, self.dim))
+        self._norms = np.memmap(self._norms_path, dtype=np.float32, mode="r+", shape=(self.capacity,))
+        if self.int8:
+            self._scales = np.memmap(self._scales_path, dtype=np.float32, mode="r+", shape=(self.capacity,))
+
+    def _flush(self):
+        for matrix in (self._vectors, self._norms, self._scales):
+            if matrix is not None:
+                matrix.flush()
+
+    def _embeddings(self, rows) -> np.ndarray:
+        """저장된 행을 float32 임베딩으로 변환"""
+        if self.int8:
+            return dequantize_int8(self._vectors[rows], self._scales[rows])
+        return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        if self.dim and dim != self.dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: {dim} (컬렉션: {self.dim})")
+        if rows <= self.capacity:
+            return
+        self._resize(max(rows, self.capacity * 2, 1024), dim)
+
+    def _resize(self, new_capacity: int, dim: int):
+        """행렬 파일 크기를 바꾸고 다시 매핑 (new_capacity 이전 행의 데이터는 그대로 유지)"""
+        if self._vectors is not None:
+            self._flush()
+            self._vectors = self._norms = self._scales = None
+        files = [(self._vectors_path, dim * (1 if self.int8 else 2)), (self._norms_path, 4)]
+        if self.int8:
+            files.append((self._scales_path, 4))
+        for path, item_size in files:
+            with open(path, "ab") as f:
+                f.truncate(new_capacity * item_size)
+        self.dim = dim
+        self.capacity = new_capacity
+        self._open_matrix()
+        extra = max(new_capacity - len(self._ids), 0)
+        self._ids = self._ids[:new_capacity] + [None] * extra
+        self._metadatas = self._metadatas[:new_capacity] + [None] * extra
+        self._lists = np.concatenate([self._lists[:new_capacity], np.full(extra, -1, dtype=np.int32)])
+        self._alive = np.concatenate([self._alive[:new_capacity], np.zeros(extra, dtype=bool)])
+
+    def _assign(self, embeddings: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.full(len(embeddings), -1, dtype=np.int32)
+        return np.argmax(embeddings @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _write(self, ids, embeddings, metadatas, insert: bool, overwrite: bool):
+        """insert: 새 ID 추가 허용, overwrite: 기존 ID 덮어쓰기 허용"""
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        if metadatas is None:
+            metadatas = [None] * len(ids)
+
+        with self._lock:
+            new_ids = [id for id in dict.fromkeys(ids) if id not in self._row_of] if insert else []
+            if new_ids and embeddings is None:
+                raise ValueError("새 ID를 추가하려면 embeddings가 필요합니다")
+            if new_ids:
+                self._ensure_capacity(self.size + len(new_ids), embeddings.shape[1])
+            elif embeddings is not None and self.dim and embeddings.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원이 다릅니다: {embeddings.shape[1]} (컬렉션: {self.dim})")
+
+            targets = []  # (입력 위치, 행 번호)
+            for i, id in enumerate(ids):
+                row = self._row_of.get(id)
+                if row is None:
+                    if not insert:
+                        continue
+                    row = self.size
+                    self.size += 1
+                    self._row_of[id] = row
+                    self._ids[row] = id
+                    self._alive[row] = True
+                elif not overwrite:
+                    continue
+                targets.append((i, row))
+                if metadatas[i] is not None:
+                    self._metadatas[row] = metadatas[i]
+
+            if targets and embeddings is not None:
+                positions = np.array([i for i, _ in targets])
+                rows = np.array([row for _, row in targets])
+                vectors = embeddings[positions]
+                if self.int8:
+                    self._vectors[rows], self._scales[rows] = quantize_int8(vectors)
+                    stored = self._embeddings(rows)
+                else:
+                    self._vectors[rows] = vectors
+                    stored = np.asarray(self._vectors[rows], dtype=np.float32)
+                # 거리 계산과 같은 값을 쓰도록 저장된(양자화된) 임베딩으로 노름 계산
+                self._norms[rows] = (stored ** 2).sum(axis=1)
+                self._lists[rows] = self._assign(vectors)
+                self._inverted = None
+            db_rows = [(row, ids[i], json.dumps(self._metadatas[row], ensure_ascii=False), int(self._lists[row]))
+                       for i, row in targets]
+
+            self._flush()
+            if targets:
+                self._columns = {}
+            self._db.executemany("INSERT OR REPLACE INTO rows (row, id, metadata, list) VALUES (?, ?, ?, ?)", db_rows)
+            self._set_info(dim=self.dim, size=self.size, capacity=self.capacity)
+            self._db.commit()
+
+            # 인덱스를 만든 뒤 데이터가 두 배 이상 늘어나면 다시 학습
+            alive = len(self._row_of)
+            if alive >= IVF_MIN_ROWS and (self._centroids is None or alive >= 2 * self.trained_size):
+                self.build_index()
+
+    # ---------- ChromaDB 호환 API ----------
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None):
+        """새 ID만 추가 (이미 있는 ID는 ChromaDB와 같이 무시)"""
+        self._write(list(ids), embeddings, metadatas, insert=True, overwrite=False)
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        self._write(list(ids), embeddings, metadatas, insert=True, overwrite=True)
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None):
+        self._write(list(ids), embeddings, metadatas, insert=False, overwrite=True)
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            rows = self._select_rows(ids, where)
+            for row in rows:
+                del self._row_of[self._ids[row]]
+                self._ids[row] = None
+                self._metadatas[row] = None
+                self._lists[row] = -1
+                self._alive[row] = False
+            self._inverted = None
+            self._columns = {}
+            self._db.executemany("DELETE FROM rows WHERE row = ?", [(int(row),) for row in rows])
+            self._db.commit()
+
+            # 삭제된 행이 많이 쌓이면 압축하여 파일 크기와 검색 범위를 줄임
+            dead = self.size - len(self._row_of)
+            if dead >= COMPACT_MIN_ROWS and dead > self.size * COMPACT_RATIO:
+                self.compact()
+
+    def _column(self, key: str, numeric: bool = False) -> np.ndarray:
+        """메타데이터 필드 하나를 배열로 만든 값 (쓰기 후 처음 사용할 때 다시 만듦)"""
+        if (key, numeric) not in self._columns:
+            values = [m.get(key) if m else None for m in self._metadatas[:self.size]]
+            if numeric:
+                column = np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                                   for v in values], dtype=np.float64)
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            self._columns[(key, numeric)] = column
+        return self._columns[(key, numeric)]
+
+    def _where_mask(self, where: dict) -> np.ndarray:
+        """
+        ChromaDB where 조건 중 일부($and / $or / $eq / $ne / $in / $nin / $gt / $gte / $lt / $lte)를
+        메타데이터 열 단위로 적용한 행 마스크
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for key, condition in (where or {}).items():
+            if key == "$and":
+                for c in condition:
+                    mask &= self._where_mask(c)
+            elif key == "$or":
+                matched = np.zeros(self.size, dtype=bool)
+                for c in condition:
+                    matched |= self._where_mask(c)
+                mask &= matched
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, operand in condition.items():
+                    if op in ("$gt", "$gte", "$lt", "$lte"):
+                        column = self._column(key, numeric=True)
+                        with np.errstate(invalid="ignore"):
+                            if op == "$gt":
+                                mask &= column > operand
+                            elif op == "$gte":
+                                mask &= column >= operand
+                            elif op == "$lt":
+                                mask &= column < operand
+                            else:
+                                mask &= column <= operand
+                        continue
+                    column = self._column(key)
+                    if op == "$eq":
+                        mask &= np.fromiter((v == operand for v in column), dtype=bool, count=len(column))
+                    elif op == "$ne":
+                        mask &= np.fromiter((v != operand for v in column), dtype=bool, count=len(column))
+                    elif op in ("$in", "$nin"):
+                        matched = np.fromiter((v in operand for v in column), dtype=bool, count=len(column))
+                        mask &= matched if op == "$in" else ~matched
+                    else:
+                        raise ValueError(f"지원하지 않는 where 연산자입니다: {op}")
+        return mask
+
+    def _allowed(self, where=None) -> np.ndarray:
+        """삭제되지 않았고 where 조건을 만족하는 행 마스크"""
+        allowed = self._alive[:self.size].copy()
+        if where:
+            allowed &= self._where_mask(where)
+        return allowed
+
+    def _select_rows(self, ids=None, where=None) -> list:
+        allowed = self._allowed(where)
+        if ids is not None:
+            return [self._row_of[id] for id in ids if id in self._row_of and allowed[self._row_of[id]]]
+        return np.nonzero(allowed)[0].tolist()
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("metadatas",)):
+        with self._lock:
+            rows = self._select_rows(ids, where)
+            rows = rows[offset or 0:][:limit] if limit is not None else rows[offset or 0:]
+            result = {"ids": [self._ids[row] for row in rows], "metadatas": None, "embeddings": None, "documents": None}
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = self._embeddings(rows).tolist() if rows else []
+            return result
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=("metadatas", "distances"), nprobe: int = None):
+        """
+        임베딩과 가까운 구간 검색
+        IVF 인덱스가 있으면 가까운 nprobe개 클러스터 안에서만 검색하고, 후보가 부족하면 전체 검색
+        where 조건은 거리 계산 전에 적용되며 include에 없는 항목은 응답에서 제외
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        nprobe = nprobe or self.nprobe
+
+        result = {"ids": [], "distances": [], "metadatas": [], "embeddings": [], "documents": None}
+        with self._lock:
+            # where 조건은 인덱스 검색 전에 행 마스크로 적용
+            allowed = self._allowed(where)
+            all_rows = np.nonzero(allowed)[0]
+
+            # 조건을 만족하는 행이 적으면 IVF 없이 해당 행만 전체 검색
+            probes = None
+            if self._centroids is not None and len(all_rows) > IVF_MIN_ROWS:
+                inverted = self._inverted_lists()
+                probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :nprobe]
+
+            for i, query in enumerate(queries):
+                rows = all_rows
+                if probes is not None:
+                    order, starts = inverted
+                    candidates = np.concatenate([order[starts[p]:starts[p + 1]] for p in probes[i]])
+                    candidates = candidates[allowed[candidates]]
+                    # 가까운 클러스터에 후보가 부족하면 전체 검색
+                    if len(candidates) >= n_results:
+                        rows = candidates
+                if len(rows) == 0:
+                    for key in ("ids", "distances", "metadatas", "embeddings"):
+                        result[key].append([])
+                    continue
+
+                rows = np.sort(rows)  # 메모리 매핑 파일을 순서대로 읽도록 정렬
+                distances = self._norms[rows] + float(np.dot(query, query)) - 2.0 * self._dot(rows, query)
+                k = min(n_results, len(rows))
+                top = np.argpartition(distances, k - 1)[:k]
+                top = top[np.argsort(distances[top])]
+                result["ids"].append([self._ids[row] for row in rows[top]])
+                result["distances"].append([max(float(d), 0.0) for d in distances[top]])
+                result["metadatas"].append([self._metadatas[row] for row in rows[top]])
+                if "embeddings" in include:
+                    result["embeddings"].append(self._embeddings(rows[top]).tolist())
+
+        if "embeddings" not in include:
+            result["embeddings"] = None
+        if "distances" not in include:
+            result["distances"] = None
+        if "metadatas" not in include:
+            result["metadatas"] = None
+        return result
+
+    def _dot(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        행들과 쿼리의 내적 (전체에 가까운 행을 읽을 때는 임의 접근 대신 연속 구간을 나눠 읽음)
+        int8 행렬은 양자화된 값과 쿼리의 내적에 행별 scale을 곱함
+        """
+        if len(rows) < self.size // 4:
+            scores = np.asarray(self._vectors[rows], dtype=np.float32) @ query
+            return scores * self._scales[rows] if self.int8 else scores
+        scores = np.empty(self.size, dtype=np.float32)
+        for start in range(0, self.size, 16384):
+            end = min(start + 16384, self.size)
+            scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+        if self.int8:
+            scores *= self._scales[:self.size]
+        return scores[rows]
+
+    # ---------- 압축 / 인덱스 ----------
+
+    def compact(self) -> int:
+        """
+        삭제된 행을 제거하고 남은 행을 순서대로 앞으로 옮김 (행 번호 변경)
+        사용 중인 행이 용량의 1/4 미만이면 행렬 파일도 줄임
+        :return: 제거한 행 수
+        """
+        with self._lock:
+            live = np.nonzero(self._alive[:self.size])[0]
+            removed = self.size - len(live)
+            if removed == 0:
+                return 0
+            new_size = len(live)
+            # live[i] >= i 이고 오름차순이므로 앞에서부터 옮기면 아직 옮기지 않은 행을 덮어쓰지 않음
+            dst = np.nonzero(live != np.arange(new_size))[0]
+            src = live[dst]
+            for start in range(0, len(dst), 65536):
+                d, r = dst[start:start + 65536], src[start:start + 65536]
+                for matrix in (self._vectors, self._norms, self._scales):
+                    if matrix is not None:
+                        matrix[d] = matrix[r]
+            self._flush()
+
+            self._ids = [self._ids[row] for row in live] + [None] * (self.capacity - new_size)
+            self._metadatas = [self._metadatas[row] for row in live] + [None] * (self.capacity - new_size)
+            self._lists = np.concatenate([self._lists[live], np.full(self.capacity - new_size, -1, dtype=np.int32)])
+            self._alive = np.zeros(self.capacity, dtype=bool)
+            self._alive[:new_size] = True
+            self._row_of = {id: row for row, id in enumerate(self._ids[:new_size])}
+            self.size = new_size
+            self._inverted = None
+            self._columns = {}
+
+            self._db.executemany("UPDATE rows SET row = ? WHERE row = ?", zip(dst.tolist(), src.tolist()))
+            if self.dim and self.capacity > 1024 and new_size < self.capacity // 4:
+                self._resize(max(new_size * 2, 1024), self.dim)
+            self._set_info(size=self.size, capacity=self.capacity)
+            self._db.commit()
+            logger.info(f"컬렉션 압축: {self.name} (삭제된 행 {removed}개 제거, 남은 행 {new_size}개)")
+            return removed
+
+    def _inverted_lists(self):
+        """클러스터별 행 번호 목록 (order[starts[c]:starts[c + 1]]가 클러스터 c의 행), 쓰기 후 처음 검색할 때 다시 만듦"""
+        if self._inverted is None:
+            rows = np.nonzero(self._alive[:self.size] & (self._lists[:self.size] >= 0))[0]
+            index = np.argsort(self._lists[rows], kind="stable")
+            starts = np.searchsorted(self._lists[rows][index], np.arange(len(self._centroids) + 1))
+            self._inverted = (rows[index], starts)
+        return self._inverted
+
+    def build_index(self, num_lists: int = None):
+        """삭제된 행을 압축한 뒤 현재 데이터로 IVF 클러스터 중심을 학습하고 모든 행을 다시 배정"""
+        with self._lock:
+            self.compact()
+            rows = np.array(sorted(self._row_of.values()), dtype=np.int64)
+            if len(rows) == 0:
+                return
+            num_lists = num_lists or int(min(max(np.sqrt(len(rows)), 1), 4096))
+            num_lists = min(num_lists, len(rows))
+
+            rng = np.random.default_rng(0)
+            sample_size = min(len(rows), num_lists * KMEANS_SAMPLE_PER_LIST)
+            sample = rows[np.sort(rng.choice(len(rows), sample_size, replace=False))]
+            self._centroids = _kmeans(self._embeddings(sample), num_lists)
+
+            # 메모리 사용량을 제한하기 위해 나눠서 배정
+            for start in range(0, len(rows), 65536):
+                chunk = rows[start:start + 65536]
+                self._lists[chunk] = self._assign(self._embeddings(chunk))
+
+            self._inverted = None
+            np.save(self._centroids_path, self._centroids)
+            self._db.executemany("UPDATE rows SET list = ? WHERE row = ?",
+                                 [(int(self._lists[row]), int(row)) for row in rows])
+            self.trained_size = len(rows)
+            self._set_info(trained_size=self.trained_size)
+            self._db.commit()
+            logger.info(f"IVF 인덱스 생성: {self.name} ({len(rows)}개, 클러스터 {num_lists}개)")
+
+
+class VectorStore(ABC):
+    """벡터 저장소 인터페이스 (컬렉션은 ChromaDB Collection 호환 API 제공)"""
+
+    @abstractmethod
+    def get_or_create_collection(self, name: str):
+        """이름에 해당하는 컬렉션을 반환 (없으면 생성)"""
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB 서버(HttpClient)를 사용하는 저장소"""
+
+    def __init__(self, host: str = CHROMA_HOST, port: int = CHROMA_PORT):
+        from chromadb import HttpClient
+        self.client = HttpClient(host=host, port=port)
+
+    def get_or_create_collection(self, name: str):
+        return self.client.get_or_create_collection(name=name)
+
+
+class LocalVectorStore(VectorStore):
+    """네트워크 없이 프로세스 안에서 동작하는 저장소 (컬렉션별 디렉토리에 저장)"""
+
+    def __init__(self, root_dir: str = LOCAL_STORE_DIR, nprobe: int = IVF_NPROBE, dtype: str = LOCAL_STORE_DTYPE):
+        self.root_dir = root_dir
+        self.nprobe = nprobe
+        self.dtype = dtype
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name: str) -> LocalCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = LocalCollection(name, os.path.join(self.root_dir, name), nprobe=self.nprobe,
+                                                          dtype=self.dtype)
+            return self._collections[name]
+
+
+def create_vector_store(kind: str = VECTOR_STORE) -> VectorStore:
+    """설정(VECTOR_STORE)에 맞는 벡터 저장소 생성"""
+    if kind == "chroma":
+        return ChromaVectorStore()
+    if kind == "local":
+        return LocalVectorStore()
+    raise ValueError(f"지원하지 않는 벡터 저장소입니다: {kind}")
@@ -5,6 +5,8 @@ from flasgger import Swagger
 import google.generativeai as genai
 from typing import List
 import time
+import os
+from query_cache import QueryCache, SingleFlight, query_hash
 
 # Flask 앱 초기화  
 app = Flask(__name__)
@@ -50,6 +52,15 @@ API_KEYS = ['API_KEY']
 # API 키 매니저 초기화
 key_manager = APIKeyManager(API_KEYS)
 
+# 쿼리 분석 결과 캐시 (모델/프롬프트를 바꾸면 QUERY_CACHE_VERSION을 올려 기존 캐시 무효화)
+QUERY_CACHE_VERSION = "gemini-pro:v1"
+query_cache = QueryCache(
+    os.environ.get("QUERY_CACHE_PATH", "query_cache.db"),
+    max_memory_items=int(os.environ.get("QUERY_CACHE_ITEMS", 10000)),
+    ttl=float(os.environ.get("QUERY_CACHE_TTL", 7 * 24 * 3600))
+)
+query_flight = SingleFlight()
+
 def create_prompt(query_text):
     return f"""Query Text에서 다음 세 분야의 정보를 추출하고 중요도를 평가하세요:
 
@@ -138,21 +149,82 @@ def analyze_query(query_text):
         print(f"분석 중 오류 발생: {str(e)}")
         return DEFAULT_RESPONSE
 
-def translate_text(english_text):
-    # 프롬프트 생성 및 모델 입력
-    prompt = create_translation_prompt(english_text)
+def analyze_query_cached(query_text):
+    """
+    캐시를 거쳐 쿼리 분석 (정규화된 쿼리가 같으면 Gemini 호출 없이 재사용)
+    동시에 들어온 같은 쿼리는 하나의 Gemini 호출 결과를 공유
+    :return: (분석 결과, 캐시/공유 결과 여부)
+    """
+    key = query_hash(query_text, QUERY_CACHE_VERSION)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    def compute():
+        result = analyze_query(query_text)
+        # 오류로 기본 응답이 반환된 경우는 캐시하지 않음
+        if result is not None and result is not DEFAULT_RESPONSE:
+            query_cache.set(key, result)
+        return result
+
+    result, shared = query_flight.do(key, compute)
+    return result, shared
+
+def create_batch_translation_prompt(english_texts):
+    numbered = "\n".join(f"[{i}] {' '.join(text.split())}" for i, text in enumerate(english_texts))
+    return f"""Please translate each of the following numbered English texts to Korean:
+
+{numbered}
+
+important:
+- 각 번역을 입력과 같은 번호를 붙여 "[번호] 번역문" 형식으로 한 줄씩 출력할 것
+- 입력 {len(english_texts)}개를 모두 번역하고 다른 설명은 출력하지 않을 것
+- 번역된 텍스트는 한국어로 번역되어야 함
+- 중국어는 절대 쓰지 않아야 하고 최종 출력애 나와서는 안됨"""
+
+def generate_response(prompt, max_new_tokens=1024):
+    # 프롬프트 모델 입력 및 추론
     inputs = tokenizer(prompt, return_tensors="pt", padding=True).to(model.device)
-    
-    # 모델 추론
     outputs = model.generate(
         **inputs,
-        max_new_tokens=1024,
+        max_new_tokens=max_new_tokens,
         temperature=0.7,
         do_sample=True,
         num_beams=1,
         pad_token_id=tokenizer.eos_token_id
     )
-    response = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    # 프롬프트를 제외하고 새로 생성된 부분만 디코딩
+    return tokenizer.decode(outputs[0][inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+def parse_batch_translation(response, count):
+    """
+    "[번호] 번역문" 형식의 응답을 번호별로 파싱
+    :return: 입력 순서의 번역 리스트 (응답에 없거나 비어 있는 번호는 None)
+    """
+    translations = [None] * count
+    for match in re.finditer(r'^\s*\[(\d+)\]\s*(.+?)\s*$', response, re.MULTILINE):
+        index = int(match.group(1))
+        if index < count and translations[index] is None:
+            translations[index] = match.group(2)
+    return translations
+
+def translate_batch(english_texts):
+    """
+    여러 텍스트를 프롬프트 하나로 번역하고, 응답에서 번역을 찾지 못한 텍스트만 하나씩 다시 번역
+    """
+    response = generate_response(create_batch_translation_prompt(english_texts),
+                                 max_new_tokens=256 * len(english_texts))
+    translations = parse_batch_translation(response, len(english_texts))
+
+    missing = [i for i, translation in enumerate(translations) if translation is None]
+    if missing:
+        print(f"배치 번역 응답 파싱 실패 {len(missing)}/{len(english_texts)}개, 개별 번역으로 재시도")
+    for i in missing:
+        translations[i] = translate_text(english_texts[i])
+    return translations
+
+def translate_text(english_text):
+    response = generate_response(create_translation_prompt(english_text))
     print(response)
     # JSON 추출 및 파싱
     json_pattern = r'\{[^{}]*\}'
@@ -226,6 +298,9 @@ def query_analysis():
                   type: integer
                   description: 고유명사 키워드의 중요도 (1-5)
                   example: 3
+            cached:
+              type: boolean
+              description: 캐시 또는 동시 요청의 결과를 재사용했는지 여부
       400:
         description: 잘못된 요청
         schema:
@@ -257,11 +332,56 @@ def query_analysis():
 
     # 쿼리 분석 실행
     try:
-        result = analyze_query(query_text)
-        return jsonify({"result": result}), 200
+        result, cached = analyze_query_cached(query_text)
+        return jsonify({"result": result, "cached": cached}), 200
     except Exception as e:
         return jsonify({"error": f"분석 중 오류 발생: {str(e)}"}), 500
 
+@app.route('/analyze_query/stats', methods=['GET'])
+def query_cache_stats():
+    """
+    쿼리 분석 캐시의 적중/실패 통계를 반환하는 API (캐시 크기 조정용)
+    ---
+    tags:
+      - Query Analysis
+    responses:
+      200:
+        description: 캐시 통계
+        schema:
+          type: object
+          properties:
+            hits:
+              type: integer
+              description: 전체 캐시 적중 수 (memory_hits + disk_hits)
+            memory_hits:
+              type: integer
+              description: 메모리 LRU 적중 수
+            disk_hits:
+              type: integer
+              description: SQLite 적중 수
+            misses:
+              type: integer
+              description: 캐시 실패 수 (만료 포함)
+            expired:
+              type: integer
+              description: TTL 만료로 버려진 항목 수
+            coalesced:
+              type: integer
+              description: 실행 중인 같은 쿼리의 결과를 공유한 요청 수
+            hit_rate:
+              type: number
+              description: 캐시 적중률
+            memory_items:
+              type: integer
+              description: 메모리 LRU에 있는 항목 수
+            disk_items:
+              type: integer
+              description: SQLite에 있는 항목 수
+    """
+    stats = query_cache.stats()
+    stats["coalesced"] = query_flight.coalesced
+    return jsonify(stats), 200
+
 @app.route('/translate', methods=['POST'])
 def translate():
     """
@@ -275,13 +395,17 @@ def translate():
         required: true
         schema:
           type: object
-          required:
-            - english_text
           properties:
             english_text:
               type: string
               description: 번역할 영어 텍스트
               example: "Hello, how are you?"
+            english_texts:
+              type: array
+              items:
+                type: string
+              description: 한 번에 번역할 영어 텍스트 목록 (english_text 대신 사용)
+              example: ["Hello, how are you?", "Nice to meet you."]
     responses:
       200:
         description: 성공적으로 번역 완료
@@ -292,6 +416,11 @@ def translate():
               type: string
               description: 번역된 한국어 텍스트
               example: "안녕하세요, 어떻게 지내세요?"
+            translations:
+              type: array
+              items:
+                type: string
+              description: english_texts 요청 시 입력 순서대로 번역된 한국어 텍스트 목록
       400:
         description: 잘못된 요청
         schema:
@@ -316,6 +445,22 @@ def translate():
     
     data = request.get_json()
     english_text = data.get('english_text')
+    english_texts = data.get('english_texts')
+
+    # 여러 텍스트 배치 번역
+    if english_texts is not None:
+        if not isinstance(english_texts, list):
+            return jsonify({"error": "english_texts는 리스트여야 합니다"}), 400
+        try:
+            # 빈 텍스트를 제외한 나머지를 프롬프트 하나로 번역
+            indices = [i for i, text in enumerate(english_texts) if text]
+            translations = [''] * len(english_texts)
+            if indices:
+                for i, translation in zip(indices, translate_batch([english_texts[i] for i in indices])):
+                    translations[i] = translation
+            return jsonify({"translations": translations}), 200
+        except Exception as e:
+            return jsonify({"error": f"번역 중 오류 발생: {str(e)}"}), 500
     
     if not english_text:
         return jsonify({"error": "english_text가 필요합니다"}), 400
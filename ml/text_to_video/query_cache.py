@@ -0,0 +1,166 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_query(query_text: str) -> str:
+    """캐시 키 비교용 쿼리 정규화 (유니코드 정규화 + 공백 정리 + 소문자)"""
+    text = unicodedata.normalize("NFKC", query_text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def query_hash(query_text: str, namespace: str = "") -> str:
+    """정규화된 쿼리의 SHA-256 (namespace로 모델/프롬프트 버전 구분)"""
+    return hashlib.sha256(f"{namespace}:{normalize_query(query_text)}".encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """메모리 LRU + SQLite 영구 저장소로 구성된 TTL 기반 쿼리 분석 결과 캐시"""
+
+    def __init__(self, db_path: str, max_memory_items: int = 10000, ttl: float = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self.ttl = ttl
+        self._memory = OrderedDict()  # {키: (결과, 저장 시각)}
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0}
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS query_analysis (
+            key TEXT PRIMARY KEY,       -- query_hash() 결과
+            result TEXT NOT NULL,       -- 분석 결과 (JSON)
+            created_at REAL NOT NULL
+        )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key: str, value: dict, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key: str):
+        """
+        캐시 조회 (만료된 항목은 없는 것으로 처리)
+        :return: 분석 결과 dict, 없으면 None
+        """
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                value, created_at = self._memory[key]
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        row = conn.execute(
+            "SELECT result, created_at FROM query_analysis WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and now - row[1] >= self.ttl:
+            conn.execute("DELETE FROM query_analysis WHERE key = ?", (key,))
+            conn.commit()
+            conn.close()
+            self._count("expired")
+            self._count("misses")
+            return None
+        conn.close()
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[1])
+            self._counters["disk_hits"] += 1
+        return value
+
+    def set(self, key: str, value: dict):
+        """분석 결과를 메모리와 SQLite에 저장"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(
+            "INSERT OR REPLACE INTO query_analysis (key, result, created_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now)
+        )
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            self._remember(key, value, now)
+
+    def stats(self) -> dict:
+        """캐시 크기 조정을 위한 적중/실패 통계"""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        disk_items = conn.execute("SELECT COUNT(*) FROM query_analysis").fetchone()[0]
+        conn.close()
+
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "max_memory_items": self.max_memory_items,
+            "disk_items": disk_items,
+            "ttl": self.ttl
+        }
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출을 하나로 합쳐 상위 호출을 한 번만 수행"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # {키: {"event", "result", "error"}}
+        self.coalesced = 0
+
+    def do(self, key: str, func):
+        """
+        같은 키로 실행 중인 호출이 있으면 그 결과를 기다려 공유하고, 없으면 func()를 직접 실행
+        :return: (func 반환값, 다른 호출의 결과를 공유했는지 여부)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = func()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["event"].set()
+        return call["result"], False
@@ -5,8 +5,9 @@ import numpy as np
 import torchvision
 import torchvision.io
 import math
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from scene_detect import scene_detect
+from video_files import find_video_by_hash, save_upload
 import os
 from flasgger import Swagger
 import logging
@@ -103,6 +104,37 @@ def predict(vframes, num_frames=8):
     messages = [{"role": "user", "content": prompt}]
     return generate(messages, images)
 
+def resolve_scenes(video_path, timestamps=None):
+    """
+    요청의 장면 구간과 캐시 파일 경로를 결정
+    :param timestamps: [{"start_time", "end_time"}] 형태의 장면 목록 (없으면 None)
+    :return: (video_id, 장면 (start, end) 리스트 또는 None, 캐시 파일 경로)
+    """
+    video_id = video_path.split('/')[-1].split('.')[0]
+    if timestamps:
+        # 요청된 장면만 캡션 생성 (장면 구간별로 캐시를 분리)
+        scenes = [(ts['start_time'], ts['end_time']) for ts in timestamps]
+        scenes_hash = hashlib.sha256(json.dumps(scenes).encode()).hexdigest()[:16]
+        return video_id, scenes, os.path.join(CACHE_DIR, f"{video_id}_{scenes_hash}.json")
+    return video_id, None, os.path.join(CACHE_DIR, f"{video_id}.json")
+
+def iter_scene_captions(video_path, video_id, scenes):
+    """장면 하나의 캡션이 생성될 때마다 세그먼트를 하나씩 반환하는 제너레이터"""
+    for i, (start, end) in enumerate(scenes):
+        vframes, _, _ = torchvision.io.read_video(
+            filename=video_path, pts_unit='sec', output_format='TCHW', 
+            start_pts=start, end_pts=end
+        )
+        result = predict(vframes)
+        yield {
+            'video_id': f"{video_id}_{i}",
+            'video_caption_en':result,
+            'timestamps':{
+                'start': start,
+                'end': end
+            } 
+        }
+
 @app.route('/entire_video', methods=['POST'])
 def entire_video():
     """
@@ -121,6 +153,16 @@ def entire_video():
             video_path:
               type: string
               description: 분석할 비디오 파일 경로
+            timestamps:
+              type: array
+              description: 캡션을 생성할 장면 구간 목록 (없으면 전체 비디오에서 장면 감지)
+              items:
+                type: object
+                properties:
+                  start_time:
+                    type: number
+                  end_time:
+                    type: number
     responses:
       200:
         description: 비디오 분석 성공
@@ -155,31 +197,17 @@ def entire_video():
         if not video_path:
             return jsonify({"error: missing video_path"}), 400
         
-        video_id = video_path.split('/')[-1].split('.')[0]
-        cache_file = os.path.join(CACHE_DIR, f"{video_id}.json")
+        video_id, scenes, cache_file = resolve_scenes(video_path, request.json.get('timestamps'))
 
         if os.path.exists(cache_file):
             with open(cache_file, 'r') as f:
                 cached_data = json.load(f)
             return jsonify(cached_data)
 
-        res = []
-        scenes = scene_detect(video_path)
+        if scenes is None:
+            scenes = scene_detect(video_path)
         print(scenes)
-        for i, (start, end) in enumerate(scenes):
-            vframes, _, _ = torchvision.io.read_video(
-                filename=video_path, pts_unit='sec', output_format='TCHW', 
-                start_pts=start, end_pts=end
-            )
-            result = predict(vframes)
-            res.append({
-                'video_id': f"{video_id}_{i}",
-                'video_caption_en':result,
-                'timestamps':{
-                    'start': start,
-                    'end': end
-                } 
-            })
+        res = list(iter_scene_captions(video_path, video_id, scenes))
         
         response_data = {
                 'video_path':video_path,
@@ -194,6 +222,76 @@ def entire_video():
     except Exception as e:
         return jsonify({'error' : str(e)}), 500
 
+@app.route('/entire_video_stream', methods=['POST'])
+def entire_video_stream():
+    """
+    장면별 캡션이 생성될 때마다 한 줄씩 반환하는 스트리밍 API (NDJSON)
+    ---
+    tags:
+      - name: 비디오 분석
+        description: 비디오 분석 관련 API
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            video_path:
+              type: string
+              description: 분석할 비디오 파일 경로
+            timestamps:
+              type: array
+              description: 캡션을 생성할 장면 구간 목록 (없으면 전체 비디오에서 장면 감지)
+              items:
+                type: object
+                properties:
+                  start_time:
+                    type: number
+                  end_time:
+                    type: number
+    produces:
+      - application/x-ndjson
+    responses:
+      200:
+        description: |
+          한 줄에 하나의 JSON 객체
+          - {"type": "segment", "segment": {video_id, video_caption_en, timestamps}}
+          - {"type": "done", "count": N}
+          - {"type": "error", "error": "..."}
+      400:
+        description: 잘못된 요청
+    """
+    video_path = request.json.get('video_path')
+    if not video_path:
+        return jsonify({"error": "missing video_path"}), 400
+
+    video_id, scenes, cache_file = resolve_scenes(video_path, request.json.get('timestamps'))
+
+    def generate_lines():
+        try:
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r') as f:
+                    segments = json.load(f)['segments']
+                for segment in segments:
+                    yield json.dumps({"type": "segment", "segment": segment}) + "\n"
+                yield json.dumps({"type": "done", "count": len(segments)}) + "\n"
+                return
+
+            target_scenes = scenes if scenes is not None else scene_detect(video_path)
+            res = []
+            for segment in iter_scene_captions(video_path, video_id, target_scenes):
+                res.append(segment)
+                yield json.dumps({"type": "segment", "segment": segment}) + "\n"
+
+            with open(cache_file, 'w') as f:
+                json.dump({'video_path': video_path, 'segments': res}, f)
+            yield json.dumps({"type": "done", "count": len(res)}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate_lines()), mimetype='application/x-ndjson')
+
 @app.route('/short_video', methods=['POST'])
 def short_video():
     """
@@ -296,12 +394,8 @@ def upload_video():
 
         logger.info(f"💾 파일 저장 경로: {file_path}")
 
-        video_file.seek(0)
-        video_file.save(file_path)
-        
-        file_size = os.path.getsize(file_path)
+        file_size = save_upload(video_file, file_path)
         if file_size == 0:
-          os.remove(file_path)
           return jsonify({"error": "파일이 비어있습니다. 다시 업로드 해주세요."})
 
         logger.info("✅ 파일 저장 완료")
@@ -316,5 +410,49 @@ def upload_video():
         return jsonify({"error": f"파일 업로드 중 오류가 발생했습니다: {str(e)}"}), 500
 
 
+@app.route('/has_video', methods=['POST'])
+def has_video():
+    """
+    같은 내용(SHA-256)의 비디오가 이미 저장되어 있는지 확인하는 API
+    저장되어 있으면 업로드 없이 반환된 video_path를 그대로 사용할 수 있음
+    ---
+    tags:
+      - name: 비디오 업로드
+        description: 비디오 파일 업로드 관련 API
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            sha256:
+              type: string
+              description: 비디오 파일 내용의 SHA-256 해시 (hex)
+            extension:
+              type: string
+              description: 파일 확장자 (예: .mp4)
+    responses:
+      200:
+        description: 확인 성공
+        schema:
+          type: object
+          properties:
+            exists:
+              type: boolean
+            video_path:
+              type: string
+      400:
+        description: 잘못된 요청
+    """
+    sha256 = (request.json or {}).get('sha256')
+    extension = (request.json or {}).get('extension')
+    if not sha256:
+        return jsonify({"error": "sha256이 필요합니다"}), 400
+
+    video_path = find_video_by_hash('/data/ephemeral/home/new-data/', sha256.lower(), extension)
+    return jsonify({"exists": video_path is not None, "video_path": video_path})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=30742)
\ No newline at end of file
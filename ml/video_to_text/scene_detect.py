@@ -1,13 +1,22 @@
 from scenedetect import VideoManager, SceneManager
 from scenedetect.detectors import ContentDetector
 
-def scene_detect(video_path):
+def _to_seconds(timecode):
+    """Convert a FrameTimecode (or a tuple returned by get_duration()) to seconds."""
+    # If timecode is a tuple, use the first element
+    if isinstance(timecode, tuple):
+        timecode = timecode[0]
+    return timecode.get_seconds() if hasattr(timecode, "get_seconds") else timecode
+
+def scene_detect(video_path, start_time=None, end_time=None):
     """
     Detect scenes in the video and return the start and end times of each scene in seconds as floats.
-    If no scenes are detected, returns a single scene covering the entire video.
+    If no scenes are detected, returns a single scene covering the entire video (or the requested window).
     
     Args:
         video_path (str): Path to the video file.
+        start_time (float, optional): Start of the window to analyze in seconds. Defaults to the video start.
+        end_time (float, optional): End of the window to analyze in seconds. Defaults to the video end.
         
     Returns:
         list: A list of tuples containing the start and end times of each scene in seconds.
@@ -22,11 +31,19 @@ def scene_detect(video_path):
     
     # Optionally apply downscale factor for faster processing
     video_manager.set_downscale_factor()
-    video_manager.start()
-    
+
     # Retrieve the total duration of the video
     # (Depending on the version, this may return a FrameTimecode object or a tuple)
-    total_duration = video_manager.get_duration()
+    total_seconds = _to_seconds(video_manager.get_duration())
+
+    # Only decode the requested window instead of the whole video
+    window_start = max(0.0, start_time or 0.0)
+    window_end = min(end_time, total_seconds) if end_time is not None else total_seconds
+    if start_time is not None or end_time is not None:
+        base_timecode = video_manager.get_base_timecode()
+        video_manager.set_duration(start_time=base_timecode + window_start, end_time=base_timecode + window_end)
+
+    video_manager.start()
     
     # Perform scene detection
     scene_manager.detect_scenes(frame_source=video_manager)
@@ -35,25 +52,52 @@ def scene_detect(video_path):
     # Release VideoManager resources
     video_manager.release()
     
-    # If no scenes are detected, return the entire video as a single scene
+    # If no scenes are detected, return the entire video (or window) as a single scene
     if not scene_list:
-        # If total_duration is a tuple, extract the seconds from the first element
-        if isinstance(total_duration, tuple):
-            # Use get_seconds() if the first element is a FrameTimecode object
-            if hasattr(total_duration[0], "get_seconds"):
-                total_seconds = total_duration[0].get_seconds()
-            else:
-                total_seconds = total_duration[0]
-        else:
-            total_seconds = total_duration.get_seconds() if hasattr(total_duration, "get_seconds") else total_duration
-
-        scene_times = [(0.0, total_seconds)]
+        scene_times = [(window_start, window_end)]
     else:
         # Convert the start and end times of each detected scene to seconds as floats
         scene_times = [(start.get_seconds(), end.get_seconds()) for start, end in scene_list]
     
     return scene_times
 
+def merge_ranges(ranges, margin=0.0):
+    """
+    Expand each (start, end) range by `margin` seconds and merge the overlapping ones.
+
+    Args:
+        ranges (list): A list of (start, end) tuples in seconds.
+        margin (float): Seconds added before and after each range.
+
+    Returns:
+        list: Sorted, non-overlapping (start, end) tuples.
+    """
+    merged = []
+    for start, end in sorted((max(0.0, start - margin), end + margin) for start, end in ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def scene_detect_ranges(video_path, ranges, margin=2.0):
+    """
+    Detect scenes only inside the requested time ranges (plus a margin) instead of the whole video.
+
+    Args:
+        video_path (str): Path to the video file.
+        ranges (list): A list of (start, end) tuples in seconds.
+        margin (float): Seconds analyzed before and after each range so that scene boundaries
+                        close to the range edges are still detected.
+
+    Returns:
+        list: A sorted list of unique (start, end) scene tuples in seconds.
+    """
+    scenes = set()
+    for window_start, window_end in merge_ranges(ranges, margin):
+        scenes.update(scene_detect(video_path, window_start, window_end))
+    return sorted(scenes)
+
 # Example usage
 if __name__ == "__main__":
     video_path = '/data/ephemeral/home/data/03NoI9KiZOk.mp4'
@@ -4,9 +4,13 @@ from flasgger import Swagger
 import os
 import uuid
 from whisper import load_model
-from whisper.audio import load_audio
+from whisper.audio import load_audio, SAMPLE_RATE
+import numpy as np
+import subprocess
 import logging
 import hashlib
+from video_files import find_video_by_hash, save_upload
+from scene_detect import merge_ranges
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +30,63 @@ def get_file_hash(video_file):
     video_file.seek(0)  # 다시 처음으로 이동 (중요!)
     return hasher.hexdigest()
 
+def load_audio_range(video_path: str, start: float, end: float, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    비디오의 [start, end) 구간 오디오만 디코딩합니다. (whisper.audio.load_audio와 같은 형식)
+    
+    Args:
+        video_path (str): 비디오 파일 경로
+        start (float): 시작 시간(초)
+        end (float): 종료 시간(초)
+        sr (int): 샘플링 레이트
+        
+    Returns:
+        np.ndarray: -1.0 ~ 1.0 범위의 mono float32 오디오
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-ss", str(start), "-t", str(end - start),
+        "-i", video_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-"
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+def transcribe_audio(audio: np.ndarray, offset: float = 0.0) -> list:
+    """
+    오디오 배열에 STT를 수행합니다. (필터링 전 원본 세그먼트)
+    
+    Args:
+        audio (np.ndarray): 16kHz mono 오디오
+        offset (float): 세그먼트 시간에 더할 시작 시간(초). 잘라낸 구간을 원본 비디오 시간으로 되돌릴 때 사용
+        
+    Returns:
+        list: start_time, end_time, caption 을 담은 세그먼트 리스트
+    """
+    # STT 수행
+    print(f"디버그 - STT 수행 중...")  # 디버그용 출력
+    result = model.transcribe(
+        audio=audio,
+        logprob_threshold=-2.0,
+        no_speech_threshold=0.95,
+        condition_on_previous_text=True,
+        task="transcribe",
+        fp16=False,            
+    )
+    print(f"디버그 - STT 결과: {result}")  # 디버그용 출력
+    # segments 배열 생성
+    segments = []
+    
+    # result의 segments에서 필요한 정보 추출
+    for segment in result["segments"]:
+        segments.append({
+            "start_time": segment["start"] + offset,
+            "end_time": segment["end"] + offset, 
+            "caption": segment["text"]
+        })
+    return segments
+
 def get_stt_caption(video_path: str) -> list:
     """
     비디오의 STT 캡션을 생성합니다.
@@ -38,35 +99,37 @@ def get_stt_caption(video_path: str) -> list:
     """
     try:
         audio = load_audio(video_path)
-
-        # STT 수행
-        print(f"디버그 - STT 수행 중...")  # 디버그용 출력
-        result = model.transcribe(
-            audio=audio,
-            logprob_threshold=-2.0,
-            no_speech_threshold=0.95,
-            condition_on_previous_text=True,
-            task="transcribe",
-            fp16=False,            
-        )
-        print(f"디버그 - STT 결과: {result}")  # 디버그용 출력
-        # segments 배열 생성
-        segments = []
-        
-        # result의 segments에서 필요한 정보 추출
-        for segment in result["segments"]:
-            segments.append({
-                "start_time": segment["start"],
-                "end_time": segment["end"], 
-                "caption": segment["text"]
-            })
-        
+        segments = transcribe_audio(audio)
         segments = filter_captions(segments)
         return segments
             
     except Exception as e:
         print(f"STT 처리 중 오류 발생: {str(e)}")
         return []
+
+def get_stt_caption_ranges(video_path: str, ranges: list) -> list:
+    """
+    비디오의 지정된 구간들만 잘라서 STT 캡션을 생성합니다.
+    
+    Args:
+        video_path (str): 비디오 파일 경로
+        ranges (list): (start, end) 튜플 리스트 (초 단위, 겹치지 않게 정렬된 구간)
+        
+    Returns:
+        list: STT 캡션 정보를 담은 리스트 (시간은 원본 비디오 기준)
+    """
+    try:
+        segments = []
+        for start, end in ranges:
+            audio = load_audio_range(video_path, start, end)
+            if len(audio) == 0:
+                continue
+            segments.extend(transcribe_audio(audio, offset=start))
+        return filter_captions(segments)
+
+    except Exception as e:
+        print(f"STT 처리 중 오류 발생: {str(e)}")
+        return []
       
 def filter_captions(segments: list) -> list:
     """
@@ -259,6 +322,102 @@ def entire_video():
     except Exception as e:
         return jsonify({'error': f"처리 중 오류가 발생했습니다: {str(e)}"}), 500
 
+@app.route('/partial_video', methods=['POST'])
+def partial_video():
+    """
+    비디오의 지정된 구간들만 잘라서 STT 캡션을 생성합니다.
+    처리 비용이 비디오 전체 길이가 아닌 요청 구간 길이에 비례합니다.
+    ---
+    tags:
+      - STT Caption API
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            video_path:
+              type: string
+              description: 비디오 파일의 경로
+            ranges:
+              type: array
+              description: STT를 수행할 구간 목록
+              items:
+                type: object
+                properties:
+                  start:
+                    type: number
+                    description: 시작 시간(초)
+                  end:
+                    type: number
+                    description: 종료 시간(초)
+            margin:
+              type: number
+              description: 각 구간 앞뒤로 추가로 처리할 시간(초), 기본값 1.0
+    responses:
+      200:
+        description: STT 캡션 생성 성공 (/entire_video와 같은 형식)
+      400:
+        description: 잘못된 요청
+      500:
+        description: 서버 오류
+    """
+    try:
+        video_path = request.json.get('video_path')
+        ranges = request.json.get('ranges')
+        margin = float(request.json.get('margin', 1.0))
+        
+        # 입력값 검증
+        if not video_path:
+            return jsonify({"error": "비디오 경로가 누락되었습니다"}), 400
+        if not ranges:
+            return jsonify({"error": "구간(ranges)이 누락되었습니다"}), 400
+        if any(r.get('start') is None or r.get('end') is None or r['start'] >= r['end'] for r in ranges):
+            return jsonify({"error": "구간의 시작/종료 시간이 올바르지 않습니다"}), 400
+
+        # 구간 앞뒤로 여유를 두고 겹치는 구간은 합쳐서 한 번만 처리
+        merged = merge_ranges([(r['start'], r['end']) for r in ranges], margin)
+
+        video_id = video_path.split('/')[-1].split('.')[0]
+        
+        # 캐시 파일 경로 (구간별로 분리)
+        cache_dir = '/data/ephemeral/home/cache/'
+        os.makedirs(cache_dir, exist_ok=True)
+        ranges_hash = hashlib.sha256(json.dumps(merged).encode()).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f'{video_id}_{ranges_hash}_stt_cache.json')
+        
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return jsonify(json.load(f))
+
+        stt_captions = get_stt_caption_ranges(video_path, merged)
+            
+        res = []
+        for i, caption_data in enumerate(stt_captions):
+            res.append({
+                'video_id': f"{video_id}_{i}",
+                'stt_caption': caption_data['caption'],
+                'timestamp': {
+                    'start': caption_data['start_time'],
+                    'end': caption_data['end_time']
+                }
+            })
+
+        result = {
+            'video_path': video_path,
+            'segments': res
+        }
+        
+        # 결과를 캐시에 저장
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+            
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': f"처리 중 오류가 발생했습니다: {str(e)}"}), 500
+
 @app.route('/short_video', methods=['POST'])
 def short_video():
     """
@@ -381,17 +540,14 @@ def upload_video():
         video_file.seek(0)  # 파일 포인터를 다시 처음으로
         
         if file_size == 0:
-          os.remove(file_path)
           return jsonify({"error": "파일이 비어있습니다. 다시 업로드 해주세요."}), 500
         
         # 파일 크기 제한 (예: 500MB)
         if file_size > 500 * 1024 * 1024:
             return jsonify({"error": "파일 크기가 500MB를 초과합니다"}), 400
             
-        video_file.save(file_path)
-        
         # 파일이 실제로 저장되었는지 확인
-        if not os.path.exists(file_path):
+        if not save_upload(video_file, file_path):
             return jsonify({"error": "파일 저장에 실패했습니다"}), 500
             
         logger.info(f"업로드 된 파일 명 : ${file_path}")
@@ -406,5 +562,49 @@ def upload_video():
         print(f"파일 업로드 에러: {str(e)}")
         return jsonify({"error": f"파일 업로드 중 오류가 발생했습니다: {str(e)}"}), 500
 
+@app.route('/has_video', methods=['POST'])
+def has_video():
+    """
+    같은 내용(SHA-256)의 비디오가 이미 저장되어 있는지 확인하는 API
+    저장되어 있으면 업로드 없이 반환된 video_path를 그대로 사용할 수 있음
+    ---
+    tags:
+      - name: 비디오 업로드
+        description: 비디오 파일 업로드 관련 API
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            sha256:
+              type: string
+              description: 비디오 파일 내용의 SHA-256 해시 (hex)
+            extension:
+              type: string
+              description: 파일 확장자 (예: .mp4)
+    responses:
+      200:
+        description: 확인 성공
+        schema:
+          type: object
+          properties:
+            exists:
+              type: boolean
+            video_path:
+              type: string
+      400:
+        description: 잘못된 요청
+    """
+    sha256 = (request.json or {}).get('sha256')
+    extension = (request.json or {}).get('extension')
+    if not sha256:
+        return jsonify({"error": "sha256이 필요합니다"}), 400
+
+    video_path = find_video_by_hash('/data/ephemeral/home/new-data/', sha256.lower(), extension)
+    return jsonify({"exists": video_path is not None, "video_path": video_path})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=30076, debug=True)
\ No newline at end of file
@@ -0,0 +1,42 @@
+import glob
+import os
+import re
+import uuid
+
+PART_SUFFIX = '.part'
+
+
+def find_video_by_hash(save_dir: str, sha256: str, extension: str = None):
+    """저장 디렉토리에서 '<sha256><확장자>' 이름으로 저장된 비디오 경로를 찾음 (없으면 None)"""
+    if not re.fullmatch(r'[0-9a-f]{64}', sha256 or ''):
+        return None
+    if extension:
+        candidates = [os.path.join(save_dir, sha256 + extension)]
+    else:
+        candidates = [path for path in glob.glob(os.path.join(save_dir, sha256 + '.*')) if not path.endswith(PART_SUFFIX)]
+    for path in candidates:
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            return path
+    return None
+
+
+def save_upload(video_file, file_path: str) -> int:
+    """
+    업로드된 파일을 임시 파일('<경로>.<uuid>.part')에 저장한 뒤 최종 경로로 교체
+    저장이 끝나기 전에는 최종 경로에 파일이 없으므로 저장 중이거나 중단된 업로드를 재사용하지 않음
+    :return: 저장된 파일 크기 (0이면 저장하지 않음)
+    """
+    part_path = f"{file_path}.{uuid.uuid4().hex}{PART_SUFFIX}"
+    try:
+        video_file.seek(0)
+        video_file.save(part_path)
+        file_size = os.path.getsize(part_path)
+        if file_size == 0:
+            os.remove(part_path)
+            return 0
+        os.replace(part_path, file_path)
+        return file_size
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
@@ -0,0 +1,114 @@
+"""
+캡션 저장 입력 처리 확인 (backend/vectorDB/embedding_ingest.py)
+  - JSON 배열 / NDJSON 스트리밍 파서 (조각 경계에서 잘린 숫자 / 멀티바이트 문자 포함)
+  - 고정 구간 ID, 영상 요약 증분 갱신
+
+실행 예시:
+    python -m pytest tests/test_embedding_ingest.py -q
+"""
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "vectorDB"))
+
+from embedding_ingest import ingest_captions, iter_caption_rows, iter_json_records, refresh_video_summary
+from vector_store import LocalCollection
+
+RECORDS = [{"id": 1, "caption": "비 오는 날"}, {"id": 2, "caption": "a man walks"}, 12345, [1.5, 2]]
+
+
+def parse(text, chunk_size):
+    return list(iter_json_records(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+def test_json_array(chunk_size):
+    assert parse(json.dumps(RECORDS, ensure_ascii=False), chunk_size) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+def test_ndjson(chunk_size):
+    text = "\n".join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + "\n"
+    assert parse(text, chunk_size) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5])
+def test_top_level_number_split_across_chunks(chunk_size):
+    # 조각 끝에서 끝난 숫자를 그대로 파싱하면 '12345'가 '12' / '345'로 나뉨
+    assert parse("12345 678\n9", chunk_size) == [12345, 678, 9]
+    assert parse("[12345, 678]", chunk_size) == [12345, 678]
+
+
+def test_text_stream_and_empty_body():
+    assert list(iter_json_records(io.StringIO('[{"a": 1}]'), chunk_size=2)) == [{"a": 1}]
+    assert parse("", 4) == []
+    assert parse("[]", 1) == []
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1}, {"a": ', '{"a": 1} {"b"'])
+def test_invalid_json_raises(text):
+    with pytest.raises(ValueError):
+        parse(text, 3)
+
+
+def test_segment_ids_are_stable():
+    record = {"video_path": "/videos/abc.mp4",
+              "segments": {"timestamps": {"start": 1.5, "end": 4.0}, "video_caption_eng": "a man walks"}}
+    (id, caption, metadata), = iter_caption_rows([record], "video_caption_eng")
+    assert id == "abc_1500-4000"
+    assert caption == "a man walks"
+    assert metadata["video_key"] == "abc"
+    assert list(iter_caption_rows([record], "video_caption_eng"))[0][0] == id
+
+
+class HashEncoder:
+    """텍스트마다 고정된 임의 단위 벡터를 반환하는 인코더"""
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True):
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(text.encode("utf-8")[:8].ljust(8, b"\0"), "little")
+            vector = np.random.default_rng(seed).normal(size=16)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def caption_records(captions, video_path="/videos/abc.mp4"):
+    return [{"video_path": video_path,
+             "segments": {"timestamps": {"start": i, "end": i + 1}, "video_caption_eng": caption}}
+            for i, caption in enumerate(captions)]
+
+
+def test_incremental_video_summary_matches_full_refresh(tmp_path):
+    collection = LocalCollection("segments", str(tmp_path / "segments"))
+    summaries = LocalCollection("summaries", str(tmp_path / "summaries"))
+    reference = LocalCollection("reference", str(tmp_path / "reference"))
+
+    def ingest(captions, video_path="/videos/abc.mp4"):
+        return ingest_captions(HashEncoder(), iter_caption_rows(caption_records(captions, video_path), "video_caption_eng"),
+                               collection, batch_size=2, replace=True, summary_collection=summaries)
+
+    assert ingest(["first", "second", "third"])["summaries_updated"] == 1
+    # 구간 하나 변경 + 하나 삭제 + 경로 변경
+    stats = ingest(["first", "changed"], video_path="/videos/moved/abc.mp4")
+    assert stats["deleted"] == 1 and stats["summaries_updated"] == 1
+
+    refresh_video_summary(collection, reference, "abc")
+    incremental = summaries.get(ids=["abc"], include=["embeddings", "metadatas"])
+    full = reference.get(ids=["abc"], include=["embeddings", "metadatas"])
+    assert incremental["metadatas"][0]["segments"] == 2
+    assert incremental["metadatas"][0]["video_path"] == "/videos/moved/abc.mp4"
+    np.testing.assert_allclose(incremental["embeddings"][0], full["embeddings"][0], atol=1e-3)
+
+    # 변경이 없으면 요약을 다시 쓰지 않음
+    assert ingest(["first", "changed"], video_path="/videos/moved/abc.mp4")["summaries_updated"] == 0
+
+    # 구간이 모두 삭제되면 요약도 삭제
+    collection.delete(where={"video_key": "abc"})
+    assert refresh_video_summary(collection, summaries, "abc") is False
+    assert summaries.get(ids=["abc"])["ids"] == []
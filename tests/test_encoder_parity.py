@@ -0,0 +1,60 @@
+"""
+ONNX(fp32 / int8) 쿼리 인코더와 PyTorch 인코더의 임베딩 일치도 확인 (backend/vectorDB/encoder.py)
+torch / onnxruntime / sentence-transformers가 없거나 모델을 받을 수 없으면 건너뜀
+
+실행 예시:
+    python -m pytest tests/test_encoder_parity.py -q
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "vectorDB"))
+
+for module in ("torch", "onnxruntime", "sentence_transformers", "transformers"):
+    pytest.importorskip(module)
+
+from encoder import OnnxEncoder, create_encoder
+
+MODEL_NAME = os.environ.get("PARITY_MODEL", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+QUERIES = [
+    "비 오는 날 우산을 쓰고 걷는 남자",
+    "a woman running on the beach at sunset",
+    "자동차 추격 장면",
+    "I'll be back",
+    "강아지가 공을 가지고 노는 장면"
+]
+# 백엔드별 최소 코사인 유사도 (int8은 양자화 오차 허용)
+MIN_COSINE = {"onnx": 0.999, "onnx-int8": 0.98}
+
+
+@pytest.fixture(scope="module")
+def reference():
+    try:
+        model = create_encoder(MODEL_NAME, backend="torch")
+    except OSError as e:
+        pytest.skip(f"모델을 불러올 수 없습니다: {e}")
+    return model.encode(QUERIES, normalize_embeddings=True)
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("onnx_models"))
+
+
+@pytest.mark.parametrize("backend", sorted(MIN_COSINE))
+def test_onnx_matches_torch(reference, model_dir, backend):
+    encoder = OnnxEncoder(MODEL_NAME, quantized=backend == "onnx-int8", model_dir=model_dir)
+    embeddings = encoder.encode(QUERIES, batch_size=2, normalize_embeddings=True)
+
+    assert embeddings.shape == reference.shape
+    cosines = (embeddings * reference).sum(axis=1)
+    assert cosines.min() >= MIN_COSINE[backend], f"{backend} 코사인 유사도: {np.round(cosines, 4).tolist()}"
+
+
+def test_single_sentence_returns_vector(reference, model_dir):
+    encoder = OnnxEncoder(MODEL_NAME, quantized=True, model_dir=model_dir)
+    embedding = encoder.encode(QUERIES[0], normalize_embeddings=True)
+    assert embedding.shape == reference[0].shape
@@ -0,0 +1,105 @@
+"""
+비동기 작업 저장소 / 실행기 확인 (backend/jobs/job_manager.py)
+  - SQLite 작업 상태 기록, 실패 처리, 대기열 한도, 재시작 후 작업 재개
+
+실행 예시:
+    python -m pytest tests/test_job_manager.py -q
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from jobs.job_manager import (JobManager, JobQueueFull, JobStore, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED,
+                              STATUS_RUNNING)
+
+
+def wait_for(store, job_id, statuses=(STATUS_DONE, STATUS_FAILED), timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"작업이 끝나지 않았습니다: {store.get(job_id)}")
+
+
+def test_store_records_stages(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create("entire_video", {"video_path": "/videos/a.mp4"})
+    store.update_stage(job_id, "upload", STATUS_RUNNING)
+    store.update_stage(job_id, "upload", STATUS_DONE, count=3)
+    store.update(job_id, status=STATUS_DONE, result={"segments": []})
+
+    job = store.get(job_id)
+    assert job["params"] == {"video_path": "/videos/a.mp4"}
+    assert job["result"] == {"segments": []}
+    stage = job["stages"]["upload"]
+    assert stage["status"] == STATUS_DONE and stage["count"] == 3
+    assert stage["finished_at"] >= stage["started_at"]
+    assert store.get("missing") is None
+    assert store.list_unfinished() == []
+
+
+def test_manager_runs_and_fails_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    manager = JobManager(store, max_workers=1)
+
+    def handler(params, report):
+        report("work", STATUS_RUNNING)
+        if params.get("fail"):
+            raise RuntimeError("boom")
+        report("work", STATUS_DONE)
+        return {"value": params["value"] * 2}
+
+    manager.register("double", handler)
+    done = wait_for(store, manager.submit("double", {"value": 21}))
+    assert done["status"] == STATUS_DONE and done["result"] == {"value": 42}
+    assert done["stages"]["work"]["status"] == STATUS_DONE
+
+    failed = wait_for(store, manager.submit("double", {"fail": True}))
+    assert failed["status"] == STATUS_FAILED and failed["error"] == "boom"
+
+    with pytest.raises(ValueError):
+        manager.submit("unknown", {})
+
+
+def test_queue_limit(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    manager = JobManager(store, max_workers=1, max_pending=1)
+    release = threading.Event()
+    manager.register("block", lambda params, report: release.wait(5) and {})
+
+    job_id = manager.submit("block", {})
+    with pytest.raises(JobQueueFull):
+        manager.submit("block", {})
+    release.set()
+    wait_for(store, job_id)
+    wait_for(store, manager.submit("block", {}))
+
+
+def test_recover_resumes_unfinished_jobs_once(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    queued = store.create("double", {"value": 1})
+    running = store.create("double", {"value": 2})
+    store.update(running, status=STATUS_RUNNING)
+    orphan = store.create("removed_kind", {})
+
+    # 재시작한 프로세스 두 개 중 파일 잠금을 얻은 하나만 재개
+    first = JobManager(JobStore(db_path))
+    second = JobManager(JobStore(db_path))
+    for manager in (first, second):
+        manager.register("double", lambda params, report: {"value": params["value"] * 2})
+    assert first.recover() is True
+    assert second.recover() is False
+
+    assert wait_for(store, queued)["result"] == {"value": 2}
+    assert wait_for(store, running)["result"] == {"value": 4}
+    assert store.get(orphan)["status"] == STATUS_FAILED
+    assert store.list_unfinished() == []
+    assert STATUS_QUEUED not in {store.get(job_id)["status"] for job_id in (queued, running, orphan)}
@@ -0,0 +1,66 @@
+"""
+BM25 역색인 확인 (backend/vectorDB/lexical_index.py)
+  - 관련도 순위, 구절 일치 우선, 필터, 삭제, SQLite에서 다시 불러오기
+
+실행 예시:
+    python -m pytest tests/test_lexical_index.py -q
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "vectorDB"))
+
+from lexical_index import BM25Index, tokenize
+
+DOCS = {
+    "a_0-1000": ("I'll be back", {"video_key": "a", "start": 0, "end": 1}),
+    "a_1000-2000": ("be careful, I will come back later", {"video_key": "a", "start": 1, "end": 2}),
+    "b_0-1000": ("back to the future", {"video_key": "b", "start": 0, "end": 1}),
+    "c_0-1000": ("a dog plays with a ball in the park", {"video_key": "c", "start": 0, "end": 1}),
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.upsert(list(DOCS), [text for text, _ in DOCS.values()], [metadata for _, metadata in DOCS.values()])
+    return index
+
+
+def test_tokenize_normalizes():
+    assert tokenize("Ｉ'LL  Be BACK!") == ["i", "ll", "be", "back"]
+
+
+def test_phrase_match_ranks_first(index):
+    results = index.search("I'll be back", top_k=3)
+    assert results[0][0] == "a_0-1000" and results[0][2] is True
+    assert {id for id, _, phrase in results[1:]} <= {"a_1000-2000", "b_0-1000"}
+    assert all(not phrase for _, _, phrase in results[1:])
+
+
+def test_scores_are_descending(index):
+    results = index.search("back", top_k=10)
+    assert {id for id, _, _ in results} == {"a_0-1000", "a_1000-2000", "b_0-1000"}
+    scores = [score for _, score, _ in results]
+    assert scores == sorted(scores, reverse=True) and scores[-1] > 0
+    assert index.search("unknown words", top_k=5) == []
+    assert index.search("!!!", top_k=5) == []
+
+
+def test_filters(index):
+    assert [id for id, _, _ in index.search("back", top_k=10, filters={"video_key": "b"})] == ["b_0-1000"]
+    results = index.search("back", top_k=10, filters={"video_key": ["a"], "start": 1.5})
+    assert [id for id, _, _ in results] == ["a_1000-2000"]
+
+
+def test_update_delete_and_reload(index):
+    index.upsert(["b_0-1000"], ["a cat sleeps"], [DOCS["b_0-1000"][1]])
+    index.delete(["a_1000-2000"])
+    assert len(index) == 3 and "a_1000-2000" not in index
+    assert [id for id, _, _ in index.search("back", top_k=10)] == ["a_0-1000"]
+
+    reloaded = BM25Index(index.db_path)
+    assert len(reloaded) == 3
+    assert [id for id, _, _ in reloaded.search("cat", top_k=10)] == ["b_0-1000"]
@@ -0,0 +1,117 @@
+"""
+파이프라인 엔진과 단계 출력 캐시 확인 (backend/pipeline/engine.py, backend/pipeline/stage_cache.py)
+
+실행 예시:
+    python -m pytest tests/test_pipeline.py -q
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from pipeline.engine import Pipeline, Stage
+from pipeline.stage_cache import StageCache, file_fingerprint
+
+
+def test_stages_run_in_dependency_order_and_in_parallel():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def left(x):
+        barrier.wait()  # right와 동시에 실행되지 않으면 시간 초과
+        return {"left": x + 1}
+
+    def right(x):
+        barrier.wait()
+        return {"right": x * 2}
+
+    pipeline = Pipeline("test", [
+        Stage("merge", lambda left, right: {"total": left + right}, ["left", "right"], ["total"]),
+        Stage("left", left, ["x"], ["left"]),
+        Stage("right", right, ["x"], ["right"]),
+    ])
+    reports = []
+    context, timings = pipeline.run({"x": 3}, report=lambda stage, status, **extra: reports.append((stage, status)))
+    assert context["total"] == 10
+    assert set(timings) == {"left", "right", "merge", "total"}
+    assert reports.index(("merge", "running")) > max(reports.index(("left", "done")), reports.index(("right", "done")))
+
+
+def test_invalid_pipelines():
+    with pytest.raises(ValueError):
+        Pipeline("dup", [Stage("a", dict, [], ["x"]), Stage("b", dict, [], ["x"])])
+    with pytest.raises(ValueError):
+        Pipeline("missing", [Stage("a", lambda y: {"x": y}, ["y"], ["x"])]).run({})
+    with pytest.raises(ValueError):
+        Pipeline("no_output", [Stage("a", lambda: {}, [], ["x"])]).run({})
+
+
+def test_failed_stage_is_reported():
+    def fail(x):
+        raise RuntimeError("boom")
+
+    reports = []
+    with pytest.raises(RuntimeError):
+        Pipeline("fail", [Stage("a", fail, ["x"], ["y"])]).run(
+            {"x": 1}, report=lambda stage, status, **extra: reports.append((stage, status, extra)))
+    assert reports[-1] == ("a", "failed", {"error": "boom"})
+
+
+def test_cacheable_stage_is_skipped(tmp_path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"frames")
+    calls = []
+
+    def detect(video_path):
+        calls.append(video_path)
+        return {"scenes": [[0, 1]]}
+
+    pipeline = Pipeline("cached", [Stage("scene_detect", detect, ["video_path"], ["scenes"], cacheable=True)],
+                        cache=StageCache(str(tmp_path / "cache")))
+    first, _ = pipeline.run({"video_path": str(video_path)})
+    second, timings = pipeline.run({"video_path": str(video_path)})
+    assert first["scenes"] == second["scenes"] == [[0, 1]]
+    assert len(calls) == 1 and timings["scene_detect"]["skipped"] is True
+
+    # 같은 경로의 파일 내용이 바뀌면 다시 실행 (크기 / 수정 시각이 같아도)
+    stat = os.stat(video_path)
+    video_path.write_bytes(b"FRAMES")
+    os.utime(video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    pipeline.run({"video_path": str(video_path)})
+    assert len(calls) == 2
+
+
+def test_file_fingerprint(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"abc")
+    assert file_fingerprint(str(path)) == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+    assert file_fingerprint(str(tmp_path / "missing.mp4")) is None
+
+    # 업로드 파일은 이름의 SHA-256 사용
+    named = tmp_path / f"{'0' * 64}.mp4"
+    named.write_bytes(b"abc")
+    assert file_fingerprint(str(named)) == "0" * 64
+
+
+def test_stage_cache_eviction_and_ttl(tmp_path):
+    cache = StageCache(str(tmp_path / "cache"), max_items=2, ttl=3600)
+    for i in range(3):
+        cache.set("stage", {"i": i}, {"value": i})
+        time.sleep(0.01)
+    assert cache.get("stage", {"i": 0}) is None
+    assert cache.get("stage", {"i": 2}) == {"value": 2}
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+    # 다시 열면 기존 항목을 불러옴
+    assert StageCache(cache.cache_dir, max_items=2).get("stage", {"i": 1}) == {"value": 1}
+
+    expired = StageCache(str(tmp_path / "expired"), ttl=0)
+    expired.set("stage", {"i": 0}, {"value": 0})
+    assert expired.get("stage", {"i": 0}) is None
+
+    # 파일이 없는 경로 입력은 캐시하지 않음
+    cache.set("stage", {"video_path": str(tmp_path / "missing.mp4")}, {"value": 0})
+    assert cache.get("stage", {"video_path": str(tmp_path / "missing.mp4")}) is None
@@ -0,0 +1,76 @@
+"""
+검색 결과 가중 Reciprocal Rank Fusion 확인 (backend/search/ranking.py)
+
+실행 예시:
+    python -m pytest tests/test_ranking.py -q
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from search.ranking import (RRF_K, SAME_VIDEO_FACTOR, SOURCE_META, SOURCE_STT, SOURCE_VIDEO,
+                            base_video_id, importance_weights, rank_results)
+
+
+def query_result(ids, distances=None):
+    return {"ids": [ids], "distances": [distances or [0.1 * i for i in range(len(ids))]],
+            "metadatas": [[{"video_path": f"/videos/{base_video_id(id)}.mp4"} for id in ids]]}
+
+
+def rrf(rank, weight=1.0):
+    return weight / (RRF_K + rank + 1)
+
+
+@pytest.mark.parametrize("segment_id, expected", [
+    ("abc_1500-4000", "abc"), ("abc_12", "abc"), ("my_video_3", "my_video"), ("abc", "abc"), ("abc_x", "abc_x")
+])
+def test_base_video_id(segment_id, expected):
+    assert base_video_id(segment_id) == expected
+
+
+def test_importance_weights():
+    assert importance_weights() == {SOURCE_VIDEO: 1.0, SOURCE_STT: 1.0, SOURCE_META: 1.0}
+    weights = importance_weights({"video_field_importance": 5, "stt_field_importance": "x",
+                                  "unique_field_importance": -2})
+    assert weights == {SOURCE_VIDEO: 5.0, SOURCE_STT: 1.0, SOURCE_META: 0.0}
+
+
+def test_weighted_rrf_scores():
+    video = query_result(["a_0-1000", "b_0-1000"])
+    stt = query_result(["b_0-1000", "a_5000-6000"])
+    meta = [{"id": "a", "title": "A"}, {"id": "c", "title": "C"}]
+    weights = {SOURCE_VIDEO: 2.0, SOURCE_STT: 1.0, SOURCE_META: 0.5}
+
+    ranked = {r["video_id"]: r for r in rank_results(video, stt, meta, weights=weights)}
+    assert ranked["a_0-1000"]["score"] == pytest.approx(
+        rrf(0, 2.0) + rrf(1, 1.0) * SAME_VIDEO_FACTOR + rrf(0, 0.5))
+    assert ranked["b_0-1000"]["score"] == pytest.approx(rrf(1, 2.0) + rrf(0, 1.0))
+    assert ranked["a_5000-6000"]["score"] == pytest.approx(
+        rrf(0, 2.0) * SAME_VIDEO_FACTOR + rrf(1, 1.0) + rrf(0, 0.5))
+    assert ranked["b_0-1000"]["sources"] == [SOURCE_STT, SOURCE_VIDEO]
+
+    # 구간 결과가 없는 영상의 메타데이터 결과도 함께 정렬
+    assert ranked["c"]["metadata"] is None and ranked["c"]["title"] == "C"
+    assert ranked["c"]["score"] == pytest.approx(rrf(1, 0.5))
+    assert "a" not in ranked
+
+
+def test_order_and_limit():
+    video = query_result(["a_0-1000", "b_0-1000", "c_0-1000"])
+    ranked = rank_results(video, None, [], limit=2)
+    assert [r["video_id"] for r in ranked] == ["a_0-1000", "b_0-1000"]
+
+    # 점수가 같으면 거리가 가까운 구간 먼저
+    tied = {"ids": [["a_0-1000"], ["b_0-1000"]], "distances": [[0.5], [0.2]], "metadatas": [[{}], [{}]]}
+    assert [r["video_id"] for r in rank_results(tied, {}, None)] == ["b_0-1000", "a_0-1000"]
+
+
+def test_duplicate_segment_uses_best_rank():
+    video = {"ids": [["a_0-1000", "b_0-1000"], ["b_0-1000"]], "distances": [[0.1, 0.4], [0.3]],
+             "metadatas": [[{}, {}], [{}]]}
+    ranked = {r["video_id"]: r for r in rank_results(video, None, None)}
+    assert ranked["b_0-1000"]["score"] == pytest.approx(rrf(0))
+    assert ranked["b_0-1000"]["distance"] == pytest.approx(0.3)
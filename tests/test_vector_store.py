@@ -0,0 +1,97 @@
+"""
+인프로세스 벡터 컬렉션 확인 (backend/vectorDB/vector_store.py)
+  - upsert / get / query, where 조건, 삭제 후 압축, 다시 열었을 때 유지 여부
+
+실행 예시:
+    python -m pytest tests/test_vector_store.py -q
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "vectorDB"))
+
+from vector_store import LocalCollection, dequantize_int8, quantize_int8
+
+DIM = 8
+
+
+def unit_vectors(count, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(collection, count=20):
+    vectors = unit_vectors(count)
+    collection.upsert(
+        ids=[f"v{i % 4}_{i}" for i in range(count)],
+        embeddings=vectors.tolist(),
+        metadatas=[{"video_key": f"v{i % 4}", "start": float(i), "end": float(i + 1)} for i in range(count)]
+    )
+    return vectors
+
+
+@pytest.fixture(params=["float16", "int8"])
+def collection(request, tmp_path):
+    return LocalCollection("test", str(tmp_path / "collection"), dtype=request.param)
+
+
+def test_query_returns_nearest(collection):
+    vectors = fill(collection)
+    result = collection.query(vectors[[3, 7]], n_results=3)
+    assert [ids[0] for ids in result["ids"]] == ["v3_3", "v3_7"]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-2)
+    assert result["embeddings"] is None
+
+
+@pytest.mark.parametrize("where, expected", [
+    ({"video_key": "v1"}, {"v1_1", "v1_5", "v1_9", "v1_13", "v1_17"}),
+    ({"video_key": {"$in": ["v0", "v2"]}, "start": {"$lt": 5}}, {"v0_0", "v2_2", "v0_4"}),
+    ({"$and": [{"start": {"$gte": 10}}, {"end": {"$lte": 12}}]}, {"v2_10", "v3_11"}),
+    ({"$or": [{"start": {"$eq": 0.0}}, {"video_key": {"$eq": "v3"}, "start": {"$gt": 15}}]}, {"v0_0", "v3_19"}),
+    ({"video_key": {"$nin": ["v0", "v1", "v2"]}, "start": {"$ne": 3.0}}, {"v3_7", "v3_11", "v3_15", "v3_19"}),
+])
+def test_where_filters(collection, where, expected):
+    vectors = fill(collection)
+    assert set(collection.get(where=where)["ids"]) == expected
+    result = collection.query(vectors[:1], n_results=20, where=where)
+    assert set(result["ids"][0]) == expected
+
+
+def test_unsupported_where_operator(collection):
+    fill(collection)
+    with pytest.raises(ValueError):
+        collection.get(where={"start": {"$like": 1}})
+
+
+def test_compact_keeps_remaining_rows(collection, tmp_path):
+    vectors = fill(collection)
+    deleted = [f"v{i % 4}_{i}" for i in range(0, 20, 3)]
+    collection.delete(ids=deleted)
+    assert collection.compact() == len(deleted)
+    assert collection.compact() == 0
+
+    remaining = [i for i in range(20) if i % 3]
+    assert collection.count() == len(remaining)
+    assert collection.get(ids=deleted)["ids"] == []
+    stored = collection.get(ids=[f"v{i % 4}_{i}" for i in remaining], include=["embeddings", "metadatas"])
+    np.testing.assert_allclose(stored["embeddings"], vectors[remaining], atol=2e-2)
+    assert [m["start"] for m in stored["metadatas"]] == [float(i) for i in remaining]
+    assert set(collection.get(where={"video_key": "v1"})["ids"]) == {"v1_1", "v1_5", "v1_13", "v1_17"}
+    assert collection.query(vectors[[4]], n_results=1)["ids"] == [["v0_4"]]
+
+    # 압축 후 추가한 행과 다시 연 컬렉션에서도 같은 결과
+    collection.upsert(ids=["new"], embeddings=[vectors[0].tolist()], metadatas=[{"video_key": "new"}])
+    reopened = LocalCollection("test", collection.path)
+    assert reopened.count() == len(remaining) + 1
+    assert reopened.query(vectors[[5]], n_results=1)["ids"] == [["v1_5"]]
+    assert reopened.get(where={"video_key": "new"})["ids"] == ["new"]
+
+
+def test_int8_quantization_round_trip():
+    vectors = unit_vectors(10)
+    quantized, scales = quantize_int8(vectors)
+    assert quantized.dtype == np.int8
+    np.testing.assert_allclose(dequantize_int8(quantized, scales), vectors, atol=1e-2)
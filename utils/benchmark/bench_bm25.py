@@ -0,0 +1,89 @@
+"""
+캡션 BM25 색인(backend/vectorDB/lexical_index.py) 검색 벤치마크
+대사를 그대로 입력한 검색(구절 검색)의 지연 시간과 precision@k 측정
+precision@k는 질의 구절을 그대로 포함하는 캡션 수가 k보다 적으면 그 수를 기준으로 계산
+
+사용 예시:
+    python utils/benchmark/bench_bm25.py --captions 200000 --queries 200 --k 10
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "vectorDB"))
+from lexical_index import BM25Index, tokenize
+
+STOPWORDS = ("i", "you", "the", "a", "to", "it", "me", "what", "is", "that", "we", "do", "in", "and", "not")
+
+
+def make_captions(num_captions, vocab_size, seed=0):
+    """짧은 대사처럼 보이는 가짜 STT 캡션 생성 (단어 빈도는 Zipf 분포)"""
+    rng = random.Random(seed)
+    vocab = list(STOPWORDS) + [f"word{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    return [" ".join(rng.choices(vocab, weights, k=rng.randint(4, 14))) for _ in range(num_captions)]
+
+
+def make_queries(captions, num_queries, seed=1):
+    """캡션 일부를 그대로 잘라낸 구절 질의 생성"""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < num_queries:
+        tokens = tokenize(rng.choice(captions))
+        if len(tokens) < 4:
+            continue
+        length = rng.randint(3, min(6, len(tokens)))
+        start = rng.randint(0, len(tokens) - length)
+        queries.append(" ".join(tokens[start:start + length]))
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="캡션 BM25 색인 구절 검색 벤치마크")
+    parser.add_argument("--captions", type=int, default=200000)
+    parser.add_argument("--vocab", type=int, default=20000, help="가짜 캡션의 어휘 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    captions = make_captions(args.captions, args.vocab)
+    queries = make_queries(captions, args.queries)
+    ids = [f"video{i // 100}_{(i % 100) * 5000}-{(i % 100 + 1) * 5000}" for i in range(args.captions)]
+
+    index_dir = tempfile.mkdtemp(prefix="bench_bm25_")
+    try:
+        index = BM25Index(os.path.join(index_dir, "bench.db"))
+        started = time.perf_counter()
+        for start in range(0, args.captions, args.batch_size):
+            index.upsert(ids[start:start + args.batch_size], captions[start:start + args.batch_size])
+        print(f"=== 캡션 {args.captions}개, 질의 {args.queries}개, k={args.k} ===")
+        print(f"색인 생성: {time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        BM25Index(os.path.join(index_dir, "bench.db"))
+        print(f"색인 다시 불러오기: {time.perf_counter() - started:.2f}s")
+
+        # 정답: 구절을 그대로 포함하는 캡션 (전체 탐색)
+        padded = {id: f" {' '.join(tokenize(caption))} " for id, caption in zip(ids, captions)}
+        latencies = []
+        relevant = 0
+        expected = 0
+        for query in queries:
+            started = time.perf_counter()
+            hits = index.search(query, top_k=args.k)
+            latencies.append(time.perf_counter() - started)
+            phrase = f" {query} "
+            relevant += sum(phrase in padded[id] for id, _, _ in hits)
+            expected += min(args.k, sum(phrase in text for text in padded.values()))
+
+        latencies.sort()
+        mean = sum(latencies) / len(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f"구절 검색: {mean:.2f}ms/query (p95 {p95:.2f}ms), precision@{args.k} {relevant / max(expected, 1):.4f}")
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
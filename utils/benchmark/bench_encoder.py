@@ -0,0 +1,108 @@
+"""
+쿼리 인코더 백엔드(backend/vectorDB/encoder.py) 일치도 확인 + 지연 시간 / 처리량 벤치마크
+PyTorch fp32 임베딩을 기준으로 ONNX(fp32 / int8) 임베딩의 코사인 유사도와 검색 결과 일치율(top-k)을 확인하고
+쿼리 1개 인코딩 지연 시간과 배치 처리량을 비교
+
+일치도가 기준(--min-cosine)보다 낮으면 종료 코드 1로 끝남
+
+CI에서는 tests/test_encoder_parity.py가 같은 일치도 기준을 확인
+
+사용 예시:
+    python utils/benchmark/bench_encoder.py --backends onnx onnx-int8 --threads 1 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "vectorDB"))
+from encoder import create_encoder, ENCODER_BACKENDS
+
+QUERIES = [
+    "비 오는 날 우산을 쓰고 걷는 남자",
+    "a woman running on the beach at sunset",
+    "자동차 추격 장면",
+    "two people arguing in a kitchen",
+    "강아지가 공을 가지고 노는 장면",
+    "I'll be back",
+    "어두운 밤 골목길에서 누군가를 쫓아가는 장면",
+    "a crowd cheering in a stadium"
+]
+WORDS = ("a man", "a woman", "walks", "runs", "in the rain", "on the street", "holding an umbrella",
+         "at night", "talks to", "a friend", "near the river", "under the trees", "smiles", "cries",
+         "남자가", "여자가", "길을 걷는다", "비가 내린다", "웃고 있다", "차를 운전한다")
+
+
+def make_captions(num_captions, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) for _ in range(num_captions)]
+
+
+def latency(encoder, queries, repeats):
+    """쿼리 1개씩 인코딩하는 지연 시간 (ms)"""
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            encoder.encode([query], normalize_embeddings=True)
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    return np.mean(timings) * 1000, timings[int(len(timings) * 0.95) - 1] * 1000
+
+
+def throughput(encoder, captions, batch_size):
+    """배치 인코딩 처리량 (captions/sec)"""
+    started = time.perf_counter()
+    encoder.encode(captions, batch_size=batch_size, normalize_embeddings=True)
+    return len(captions) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="쿼리 인코더 백엔드 일치도 / 성능 비교")
+    parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    parser.add_argument("--backends", nargs="+", choices=ENCODER_BACKENDS, default=["onnx", "onnx-int8"])
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="인코더 스레드 수 (0: 기본값)")
+    parser.add_argument("--captions", type=int, default=1000, help="처리량 / 검색 일치율 측정용 캡션 수")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="기준 임베딩과의 최소 코사인 유사도")
+    args = parser.parse_args()
+
+    captions = make_captions(args.captions)
+    reference = create_encoder(args.model, backend="torch")
+    reference_queries = reference.encode(QUERIES, normalize_embeddings=True)
+    reference_captions = reference.encode(captions, batch_size=args.batch_size, normalize_embeddings=True)
+    reference_top = np.argsort(-(reference_queries @ reference_captions.T), axis=1)[:, :args.k]
+
+    print(f"=== {args.model}, 캡션 {args.captions}개, 배치 {args.batch_size} ===")
+    failed = False
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        for threads in args.threads:
+            encoder = create_encoder(args.model, backend=backend, threads=threads)
+            encoder.encode(["warm up"], normalize_embeddings=True)
+
+            # 일치도: 같은 텍스트의 임베딩 코사인 유사도 + 기준 캡션 임베딩에 대한 검색 결과 일치율
+            query_embeddings = encoder.encode(QUERIES, normalize_embeddings=True)
+            caption_embeddings = encoder.encode(captions[:200], batch_size=args.batch_size, normalize_embeddings=True)
+            cosines = np.concatenate([
+                (query_embeddings * reference_queries).sum(axis=1),
+                (caption_embeddings * reference_captions[:200]).sum(axis=1)
+            ])
+            top = np.argsort(-(query_embeddings @ reference_captions.T), axis=1)[:, :args.k]
+            overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, reference_top)])
+            if cosines.min() < args.min_cosine:
+                failed = True
+
+            mean, p95 = latency(encoder, QUERIES, args.repeats)
+            rate = throughput(encoder, captions, args.batch_size)
+            print(f"{backend:>10} (스레드 {threads or '기본'}): 쿼리 {mean:7.2f}ms (p95 {p95:.2f}ms), "
+                  f"배치 {rate:8.1f} captions/sec, 코사인 최소 {cosines.min():.4f} / 평균 {cosines.mean():.4f}, "
+                  f"top-{args.k} 일치 {overlap:.3f}")
+
+    if failed:
+        print(f"일치도 기준 미달: 코사인 유사도 < {args.min_cosine}")
+        sys.exit(1)
@@ -0,0 +1,86 @@
+"""
+캡션 임베딩 저장 처리량 벤치마크 (captions/sec)
+행 단위 인코딩(기존 방식)과 backend/vectorDB/embedding_ingest.py의 배치 + 파이프라인 방식을 비교
+
+사용 예시:
+    python utils/benchmark/bench_ingest.py --captions 2000 --batch-sizes 32 128 256 --add-latency 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "vectorDB"))
+from embedding_ingest import ingest_captions, iter_caption_rows
+
+WORDS = ("a man", "a woman", "walks", "runs", "in the rain", "on the street", "holding an umbrella",
+         "at night", "talks to", "a friend", "near the river", "under the trees", "smiles", "cries")
+
+
+class NullCollection:
+    """ChromaDB 대신 사용하는 빈 컬렉션 (add / upsert 지연 시간만 흉내냄)"""
+
+    def __init__(self, add_latency: float):
+        self.add_latency = add_latency
+        self.count = 0
+
+    def add(self, embeddings, ids, metadatas):
+        time.sleep(self.add_latency)
+        self.count += len(ids)
+
+    upsert = add
+
+    def get(self, ids=None, where=None, include=None):
+        return {"ids": [], "metadatas": []}
+
+
+def make_rows(num_captions, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(num_captions):
+        caption = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        records.append({
+            "video_path": f"/data/video{i // 50}.mp4",
+            "segments": {
+                "timestamps": {"start": (i % 50) * 5.0, "end": (i % 50 + 1) * 5.0},
+                "video_caption_eng": caption
+            }
+        })
+    return list(iter_caption_rows(records, "video_caption_eng"))
+
+
+def per_row_ingest(model, rows, collection, chunk_size=1024):
+    """기존 json_to_vectorDB 방식: 캡션마다 encode 호출 후 모두 끝나면 chunk 단위로 add"""
+    started = time.perf_counter()
+    embeddings = [model.encode(caption, normalize_embeddings=True).tolist() for _, caption, _ in rows]
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        collection.add(embeddings=embeddings[i:i + chunk_size],
+                       ids=[r[0] for r in chunk], metadatas=[r[2] for r in chunk])
+    wall_time = time.perf_counter() - started
+    return {"count": len(rows), "wall_time": round(wall_time, 3), "captions_per_sec": round(len(rows) / wall_time, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="캡션 임베딩 저장 처리량 벤치마크")
+    parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    parser.add_argument("--captions", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 128, 256])
+    parser.add_argument("--add-latency", type=float, default=0.05, help="배치 add 1회당 흉내낼 지연 시간 (초)")
+    parser.add_argument("--skip-per-row", action="store_true", help="행 단위 인코딩 측정 생략")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model)
+    rows = make_rows(args.captions)
+    model.encode(["warm up"], normalize_embeddings=True)
+
+    print(f"=== 캡션 {args.captions}개, add 지연 {args.add_latency}s ===")
+    if not args.skip_per_row:
+        stats = per_row_ingest(model, rows, NullCollection(args.add_latency))
+        print(f"{'per-row':>16}: {stats['captions_per_sec']:8.1f} captions/sec ({stats['wall_time']}s)")
+    for batch_size in args.batch_sizes:
+        stats = ingest_captions(model, rows, NullCollection(args.add_latency), batch_size=batch_size)
+        print(f"{f'batch {batch_size}':>16}: {stats['captions_per_sec']:8.1f} captions/sec "
+              f"({stats['wall_time']}s, encode {stats['encode_time']}s, write {stats['write_time']}s)")
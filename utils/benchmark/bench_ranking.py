@@ -0,0 +1,122 @@
+"""
+검색 결과 순위 결정 마이크로 벤치마크
+기존 중첩 루프 방식(rank_search_results)과 backend/search/ranking.py의 가중 RRF 방식을
+수천 개의 검색 결과에서 비교
+측정 전에 같은 영상의 구간들이 각자의 순위대로 정렬되는지 확인 (실패하면 종료 코드 1)
+
+사용 예시:
+    python utils/benchmark/bench_ranking.py --hits 5000 --videos 500 --repeat 5
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from search.ranking import rank_results, importance_weights, RRF_K, SAME_VIDEO_FACTOR
+
+
+def make_chroma_results(num_hits, num_videos, seed):
+    """ChromaDB query 결과 형식의 가짜 검색 결과 생성"""
+    rng = random.Random(seed)
+    ids, distances, metadatas = [], [], []
+    for rank in range(num_hits):
+        video = f"video{rng.randrange(num_videos):05d}"
+        segment_id = f"{video}_{rng.randrange(200)}"
+        ids.append(segment_id)
+        distances.append(rank / num_hits)
+        metadatas.append({
+            "captions": f"caption {segment_id}",
+            "video_path": f"/data/{video}.mp4",
+            "start": "00:00:00.000",
+            "end": "00:00:05.000"
+        })
+    return {"ids": [ids], "distances": [distances], "metadatas": [metadatas]}
+
+
+def make_meta_results(num_hits, num_videos, seed):
+    rng = random.Random(seed)
+    return [{"id": f"video{rng.randrange(num_videos):05d}", "title": "title"} for _ in range(num_hits)]
+
+
+def legacy_rank(video_results, stt_results, meta_results):
+    """기존 rank_search_results의 세 출처가 모두 있는 경우 재현 (겹치는 ID마다 전체 결과를 다시 순회)"""
+    def get_base_video_id(video_id):
+        return re.sub(r'_\d+$', '', str(video_id))
+
+    video_ids = {get_base_video_id(i) for id_list in video_results['ids'] for i in id_list}
+    stt_ids = {get_base_video_id(i) for id_list in stt_results['ids'] for i in id_list}
+    meta_ids = {r['id'] for r in meta_results}
+
+    triple = video_ids & stt_ids & meta_ids
+    video_meta = video_ids & meta_ids - triple
+    video_stt = video_ids & stt_ids - triple
+    stt_meta = stt_ids & meta_ids - triple
+
+    ranked = []
+    for group, results in ((triple, video_results), (video_meta | video_stt, video_results), (stt_meta, stt_results)):
+        for video_id in group:
+            for i, id_list in enumerate(results['ids']):
+                for j, vid in enumerate(id_list):
+                    if get_base_video_id(vid) == video_id:
+                        ranked.append({'video_id': vid, 'metadata': results['metadatas'][i][j]})
+    for video_id in meta_ids - triple - video_meta - stt_meta:
+        ranked.append([r for r in meta_results if r['id'] == video_id][0])
+    return ranked
+
+
+def check_segment_order():
+    """같은 영상의 구간은 각 구간 자신의 순위로 점수를 받아야 함 (영상 최고 순위를 공유하면 안 됨)"""
+    video_results = {"ids": [["abc_0-2000", "abc_2000-4000", "xyz_0-2000"]],
+                     "distances": [[0.1, 0.2, 0.3]], "metadatas": [[{}, {}, {}]]}
+    stt_results = {"ids": [["xyz_0-2000", "abc_2000-4000"]],
+                   "distances": [[0.1, 0.2]], "metadatas": [[{}, {}]]}
+    scores = {r["video_id"]: r["score"] for r in rank_results(video_results, stt_results, [], weights={})}
+    failures = []
+    # 비디오 0위 + STT(같은 영상의 다른 구간 1위) × SAME_VIDEO_FACTOR
+    if abs(scores["abc_0-2000"] - (1 / (RRF_K + 1) + SAME_VIDEO_FACTOR / (RRF_K + 2))) > 1e-12:
+        failures.append("abc_0-2000 점수")
+    # 비디오 1위 + STT 1위 (구간 자신의 순위)
+    if abs(scores["abc_2000-4000"] - (1 / (RRF_K + 2) + 1 / (RRF_K + 2))) > 1e-12:
+        failures.append("abc_2000-4000 점수")
+    if scores["abc_0-2000"] == scores["abc_2000-4000"]:
+        failures.append("같은 영상의 구간 점수가 모두 같음")
+    return failures
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), sum(timings) / len(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="검색 결과 순위 결정 벤치마크")
+    parser.add_argument("--hits", type=int, default=5000, help="비디오 / STT 검색 결과 수")
+    parser.add_argument("--meta-hits", type=int, default=200, help="메타데이터 검색 결과 수")
+    parser.add_argument("--videos", type=int, default=500, help="영상 수 (작을수록 겹치는 결과가 많아짐)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = check_segment_order()
+    if failures:
+        print(f"순위 검증 실패: {failures}")
+        sys.exit(1)
+
+    video_results = make_chroma_results(args.hits, args.videos, seed=1)
+    stt_results = make_chroma_results(args.hits, args.videos, seed=2)
+    meta_results = make_meta_results(args.meta_hits, args.videos, seed=3)
+    weights = importance_weights({"video_field_importance": 4, "stt_field_importance": 2, "unique_field_importance": 3})
+
+    print(f"=== 검색 결과 {args.hits}개 x 2 + 메타데이터 {args.meta_hits}개, 영상 {args.videos}개 ===")
+    for name, func in (
+        ("legacy nested loop", lambda: legacy_rank(video_results, stt_results, meta_results)),
+        ("weighted RRF", lambda: rank_results(video_results, stt_results, meta_results, weights=weights)),
+    ):
+        best, mean = measure(func, args.repeat)
+        print(f"{name:>20}: best {best * 1000:9.2f}ms, mean {mean * 1000:9.2f}ms")
@@ -0,0 +1,94 @@
+"""
+인프로세스 벡터 저장소(LocalVectorStore) 검색 벤치마크
+IVF 검색의 recall@k와 지연 시간을 같은 데이터에 대한 전체(exact) 검색과 비교
+
+사용 예시:
+    python utils/benchmark/bench_vector_store.py --rows 100000 --dim 768 --queries 200 --nprobe 4 8 16 32
+    python utils/benchmark/bench_vector_store.py --rows 100000 --dim 768 --dtype int8
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "vectorDB"))
+from vector_store import LocalVectorStore
+
+
+def make_vectors(centers, rows, seed=0):
+    """실제 캡션 임베딩처럼 군집을 이루는 정규화된 가짜 임베딩 생성"""
+    rng = np.random.default_rng(seed)
+    vectors = centers[rng.integers(len(centers), size=rows)]
+    vectors = vectors + 0.5 * rng.normal(size=vectors.shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_search(vectors, norms, query, k):
+    """메모리에 올린 float32 행렬 전체 검색 (정답 기준)"""
+    distances = norms - 2.0 * (vectors @ query)
+    return set(np.argpartition(distances, k - 1)[:k].tolist())
+
+
+def measure(search, queries, truth, k):
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append(time.perf_counter() - started)
+        hits += len(expected & found)
+    return np.mean(latencies) * 1000, np.percentile(latencies, 95) * 1000, hits / (k * len(queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="인프로세스 벡터 저장소 recall / 지연 시간 벤치마크")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=500, help="가짜 데이터의 군집 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--dtype", choices=["float16", "int8"], default="float16", help="저장소의 임베딩 저장 형식")
+    args = parser.parse_args()
+
+    # 데이터와 쿼리는 같은 군집에서 생성
+    centers = np.random.default_rng(0).normal(size=(args.clusters, args.dim)).astype(np.float32)
+    vectors = make_vectors(centers, args.rows)
+    queries = make_vectors(centers, args.queries, seed=1)
+    ids = [str(i) for i in range(args.rows)]
+
+    store_dir = tempfile.mkdtemp(prefix="bench_vector_store_")
+    try:
+        collection = LocalVectorStore(store_dir, dtype=args.dtype).get_or_create_collection("bench")
+        started = time.perf_counter()
+        for start in range(0, args.rows, args.batch_size):
+            collection.add(ids=ids[start:start + args.batch_size], embeddings=vectors[start:start + args.batch_size])
+        collection.build_index()
+        print(f"=== {args.rows}개 x {args.dim}차원, 쿼리 {args.queries}개, k={args.k} ===")
+        print(f"저장 + 인덱스 생성: {time.perf_counter() - started:.2f}s "
+              f"({args.dtype} 행렬 {collection.size * collection.dim * (1 if collection.int8 else 2) / 1024 ** 2:.1f}MB)")
+
+        norms = (vectors ** 2).sum(axis=1)
+        truth = [exact_search(vectors, norms, query, args.k) for query in queries]
+        num_lists = len(collection._centroids)
+
+        runs = [("exact (float32)", lambda q: exact_search(vectors, norms, q, args.k))]
+        runs.append((f"flat ({args.dtype})", lambda q: collection_search(q, num_lists)))
+        for nprobe in args.nprobe:
+            runs.append((f"ivf nprobe={nprobe}", lambda q, nprobe=nprobe: collection_search(q, nprobe)))
+
+        def collection_search(query, nprobe):
+            result = collection.query(query, n_results=args.k, nprobe=nprobe, include=["distances"])
+            return {int(id) for id in result["ids"][0]}
+
+        print(f"IVF 클러스터 {num_lists}개")
+        for name, search in runs:
+            mean, p95, recall = measure(search, queries, truth, args.k)
+            print(f"{name:>16}: {mean:8.2f}ms/query (p95 {p95:.2f}ms), recall@{args.k} {recall:.4f}")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)